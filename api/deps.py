@@ -1,5 +1,7 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from db.async_session import AsyncSessionLocal
 from db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 def get_db() -> Generator[Session, None, None]:
@@ -7,4 +9,8 @@ def get_db() -> Generator[Session, None, None]:
 	try:
 		yield db
 	finally:
-		db.close()
\ No newline at end of file
+		db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+	async with AsyncSessionLocal() as db:
+		yield db
\ No newline at end of file
@@ -0,0 +1,74 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import get_async_db
+from domains.forecast import services
+from domains.forecast.schemas import ForecastQuery
+from utils.exceptions import BadRequestException, NotFoundException
+from utils.export import MEDIA_TYPES, ExportFormat
+from utils.pagination import CountMode
+from utils.response import etag_response, success_response
+
+router = APIRouter(prefix="/forecast", tags=["forecast"])
+
+@router.get("")
+async def list_forecasts(
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	cursor: Optional[str] = None,
+	limit: int = Query(100, ge=1, le=1000),
+	count: CountMode = "none",
+	db: AsyncSession = Depends(get_async_db),
+):
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	page = await services.list_forecasts(db, product_id, category, start_date, end_date, cursor, limit, count)
+	return success_response(data=page.model_dump())
+
+# didaftarkan sebelum /{product_id} supaya 'export' tidak dibaca sebagai id
+@router.get("/export")
+async def export_forecasts(
+	fmt: ExportFormat = Query("ndjson", alias="format"),
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	stream = services.export_forecasts(fmt, product_id, category, start_date, end_date)
+	return StreamingResponse(
+		stream,
+		media_type=MEDIA_TYPES[fmt],
+		headers={"Content-Disposition": f'attachment; filename="forecast.{fmt}"'},
+	)
+
+@router.get("/{product_id}")
+async def get_forecast(
+	product_id: int,
+	request: Request,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	db: AsyncSession = Depends(get_async_db),
+):
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	entry = await services.get_product_forecast_async(db, product_id, start_date, end_date)
+	if entry.empty:
+		raise NotFoundException(f"Forecast produk {product_id} tidak ditemukan")
+
+	return etag_response(request, entry.etag, lambda: services.render_product(entry))
+
+@router.post("/query")
+async def query_forecast(query: ForecastQuery, request: Request, db: AsyncSession = Depends(get_async_db)):
+	entries = await services.get_cached_forecasts_async(db, query.product_ids, query.start_date, query.end_date)
+	return etag_response(request, services.combined_etag(entries), lambda: services.render_many(entries))
\ No newline at end of file
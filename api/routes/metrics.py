@@ -0,0 +1,26 @@
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from domains.forecast.services import forecast_cache
+from utils.metrics import metrics
+from utils.response import success_response
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _collect_cache_stats() -> None:
+	"""Gauge cache forecast diambil saat scrape, bukan di hot path request"""
+	stats = forecast_cache.stats()
+	metrics.set("forecast_cache_entries", stats["entries"], help="Entry di cache response forecast")
+	metrics.set("forecast_cache_hits", stats["hits"], help="Hit cache forecast sejak proses mulai")
+	metrics.set("forecast_cache_misses", stats["misses"], help="Miss cache forecast sejak proses mulai")
+
+@router.get("/metrics")
+async def get_metrics(fmt: Literal["prometheus", "json"] = Query("prometheus", alias="format")):
+	_collect_cache_stats()
+	if fmt == "json":
+		return success_response(data=metrics.snapshot())
+	return PlainTextResponse(metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,121 @@
+import datetime
+import tempfile
+from typing import List, Optional
+
+import psycopg2
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import get_async_db
+from domains.sales import services
+from domains.sales.repository import BulkFormat, ConflictMode, RollupGranularity
+from utils.exceptions import BadRequestException, ConflictException
+from utils.export import MEDIA_TYPES, ExportFormat
+from utils.pagination import CountMode
+from utils.response import success_response
+
+router = APIRouter(prefix="/sales", tags=["sales"])
+
+# body di atas ukuran ini di-spool ke disk
+BULK_SPOOL_BYTES = 64 * 1024 * 1024
+
+CONTENT_TYPE_FORMATS = {
+	"text/csv": "csv",
+	"application/x-ndjson": "ndjson",
+	"application/vnd.apache.parquet": "parquet",
+}
+
+@router.get("")
+async def list_sales(
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	cursor: Optional[str] = None,
+	limit: int = Query(100, ge=1, le=1000),
+	count: CountMode = "none",
+	db: AsyncSession = Depends(get_async_db),
+):
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	page = await services.list_sales(db, product_id, category, start_date, end_date, cursor, limit, count)
+	return success_response(data=page.model_dump())
+
+@router.get("/export")
+async def export_sales(
+	fmt: ExportFormat = Query("ndjson", alias="format"),
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	stream = services.export_sales(fmt, product_id, category, start_date, end_date)
+	return StreamingResponse(
+		stream,
+		media_type=MEDIA_TYPES[fmt],
+		headers={"Content-Disposition": f'attachment; filename="sales.{fmt}"'},
+	)
+
+@router.get("/rollups/category")
+async def category_rollups(
+	granularity: RollupGranularity = "day",
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	db: AsyncSession = Depends(get_async_db),
+):
+	"""Total sales per kategori per hari/minggu (rollup, produk tanpa kategori = '')"""
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	result = await services.category_sales(db, granularity, category, start_date, end_date)
+	return success_response(data=result.model_dump())
+
+@router.get("/rollups/product")
+async def product_rollups(
+	product_id: List[int] = Query(..., max_length=500),
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	db: AsyncSession = Depends(get_async_db),
+):
+	"""Total sales mingguan per produk, contoh: /sales/rollups/product?product_id=1&product_id=2"""
+	if start_date and end_date and start_date > end_date:
+		raise BadRequestException("start_date harus <= end_date")
+
+	result = await services.product_weekly_sales(db, product_id, start_date, end_date)
+	return success_response(data=result.model_dump())
+
+@router.post("/bulk")
+async def bulk_sales(
+	request: Request,
+	fmt: Optional[BulkFormat] = Query(None, alias="format"),
+	on_conflict: ConflictMode = "update",
+	chunk_size: int = Query(100_000, ge=1_000, le=1_000_000),
+):
+	"""
+	Body request = isi file mentah (CSV/NDJSON/Parquet), contoh:
+	curl -X POST --data-binary @sales.csv -H "Content-Type: text/csv" /sales/bulk
+	"""
+	content_type = request.headers.get("content-type", "").split(";")[0].strip()
+	fmt = fmt or CONTENT_TYPE_FORMATS.get(content_type, "csv")
+
+	with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES) as body:
+		async for chunk in request.stream():
+			body.write(chunk)
+		body.seek(0)
+
+		try:
+			# COPY psycopg2 blocking, jalan di threadpool
+			report = await run_in_threadpool(services.bulk_load_sales, body, fmt, on_conflict, chunk_size)
+		except ValueError as e:
+			raise BadRequestException(str(e))
+		except psycopg2.IntegrityError as e:
+			raise ConflictException(f"Baris sales sudah ada (on_conflict=error): {e.pgerror}")
+
+	return success_response(data=report.as_dict(), message=f"{report.rows_per_second:,.0f} rows/s")
\ No newline at end of file
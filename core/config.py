@@ -8,6 +8,21 @@ class Settings(BaseSettings):
 	POSTGRES_PASSWORD: str
 	POSTGRES_PORT: int = 5432
 
+	# pool koneksi, berlaku untuk engine sync (psycopg2) maupun async (asyncpg)
+	DB_POOL_SIZE: int = 5
+	DB_MAX_OVERFLOW: int = 10
+	DB_POOL_TIMEOUT: int = 30
+	DB_POOL_RECYCLE: int = 1800
+	# cache prepared statement asyncpg per koneksi, 0 kalau lewat pgbouncer (transaction mode)
+	DB_STATEMENT_CACHE_SIZE: int = 100
+
+	# sales & forecast di-partisi per bulan (dibaca model dan migrasi)
+	PARTITION_TIME_SERIES: bool = False
+
+	# cache response forecast API (di-invalidate lewat NOTIFY tiap forecast commit)
+	FORECAST_CACHE_TTL: int = 300
+	FORECAST_CACHE_SIZE: int = 4096
+
 	@computed_field
 	@property
 	def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -17,6 +32,38 @@ class Settings(BaseSettings):
 			f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 		)
 
+	@computed_field
+	@property
+	def ASYNC_DATABASE_URI(self) -> str:
+		return (
+			f"postgresql+asyncpg://{self.POSTGRES_USER}:"
+			f"{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:"
+			f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+		)
+
+	# event bus: memory (asyncio queue in-process) atau postgres (LISTEN/NOTIFY)
+	EVENT_BACKEND: str = "memory"
+	EVENT_CHANNEL: str = "events"
+	# refresh forecast dari SalesRecorded: tunggu produk "diam" DEBOUNCE detik,
+	# paling lama MAX_WAIT detik, lalu re-predict per BATCH produk
+	FORECAST_REFRESH_ENABLED: bool = True
+	FORECAST_REFRESH_DEBOUNCE: float = 10.0
+	FORECAST_REFRESH_MAX_WAIT: float = 120.0
+	FORECAST_REFRESH_BATCH: int = 50
+	# refresh forecast dari consumer di proses API (training di satu proses worker);
+	# false: refresh hanya di consumer terpisah (make consumer, butuh EVENT_BACKEND=postgres)
+	FORECAST_REFRESH_IN_PROCESS: bool = True
+	# refresh rollup sales dari SalesRecorded paling sering tiap INTERVAL detik;
+	# OVERLAP: mundur dari high-water mark, menangkap transaksi lama yang commit belakangan
+	ROLLUP_REFRESH_ENABLED: bool = True
+	ROLLUP_REFRESH_INTERVAL: float = 30.0
+	ROLLUP_OVERLAP_SECONDS: int = 600
+	# cache histori sales lokal (.npy memory-mapped) untuk run forecast/backtest/evaluasi;
+	# compaction otomatis kalau segment incremental lebih dari MAX_SEGMENTS
+	HISTORY_CACHE_DIR: str = "cache/history"
+	HISTORY_CACHE_MAX_SEGMENTS: int = 8
+	HISTORY_CACHE_OVERLAP_SECONDS: int = 600
+
 	class Config:
 		env_file = ".env"
 
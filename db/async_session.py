@@ -0,0 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from core.config import settings
+from db.session import POOL_OPTIONS
+
+# modul terpisah dari db.session supaya script batch tidak perlu asyncpg
+async_engine = create_async_engine(
+	settings.ASYNC_DATABASE_URI,
+	**POOL_OPTIONS,
+	connect_args={
+		"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+		# cache statement internal asyncpg disamakan (0 = mati, untuk pgbouncer)
+		"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+	},
+)
+
+# expire_on_commit=False: atribut tidak di-lazy-load lagi setelah commit (tidak bisa di async)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
\ No newline at end of file
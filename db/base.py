@@ -1,5 +1,8 @@
 from db.models.products import Product
 from db.models.sales import Sale
 from db.models.forecast import Forecast
+from db.models.forecast_watermark import ForecastWatermark
+from db.models.category_forecast import CategoryForecast
+from db.models.sales_rollup import RollupWatermark, SalesCategoryDay, SalesCategoryWeek, SalesProductWeek
 
 from db.session import Base
\ No newline at end of file
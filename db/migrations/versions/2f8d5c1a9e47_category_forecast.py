@@ -0,0 +1,41 @@
+"""category forecast (hierarchical reconciliation)
+
+Revision ID: 2f8d5c1a9e47
+Revises: 7a3c9e2d4b15
+Create Date: 2026-10-18 22:31:45.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8d5c1a9e47'
+down_revision: Union[str, Sequence[str], None] = '7a3c9e2d4b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_forecast',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('predicted_sales', sa.Float(), nullable=False),
+    sa.Column('method', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_category_forecast_id'), 'category_forecast', ['id'], unique=False)
+    op.create_index('uq_category_forecast_category_date', 'category_forecast', ['category', 'date'],
+                    unique=True, postgresql_include=['predicted_sales'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_category_forecast_category_date', table_name='category_forecast')
+    op.drop_index(op.f('ix_category_forecast_id'), table_name='category_forecast')
+    op.drop_table('category_forecast')
@@ -0,0 +1,36 @@
+"""forecast watermark
+
+Revision ID: 3e8a0f6c5d21
+Revises: b7d41c2e9f83
+Create Date: 2026-10-18 10:03:27.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a0f6c5d21'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c2e9f83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('forecast_watermark',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('last_sale_date', sa.Date(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('trained_rows', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('forecast_watermark')
@@ -0,0 +1,41 @@
+"""sales unique (product_id, date)
+
+Revision ID: 4d1f6a2b8c93
+Revises: 9c2b7e41f0a6
+Create Date: 2026-10-18 19:52:17.604381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d1f6a2b8c93'
+down_revision: Union[str, Sequence[str], None] = '9c2b7e41f0a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # satu baris sales per produk per hari, dibutuhkan ON CONFLICT bulk load
+    op.execute(
+        """
+        DELETE FROM sales older
+        USING sales newer
+        WHERE older.product_id = newer.product_id
+          AND older.date = newer.date
+          AND older.id < newer.id
+        """
+    )
+    op.drop_index('ix_sales_product_id_date', table_name='sales')
+    op.create_index('uq_sales_product_id_date', 'sales', ['product_id', 'date'],
+                    unique=True, postgresql_include=['sales'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_sales_product_id_date', table_name='sales')
+    op.create_index('ix_sales_product_id_date', 'sales', ['product_id', 'date'],
+                    unique=False, postgresql_include=['sales'])
@@ -0,0 +1,70 @@
+"""sales rollups (product-week, category-day, category-week)
+
+Revision ID: 7a3c9e2d4b15
+Revises: 4d1f6a2b8c93
+Create Date: 2026-10-18 21:14:06.218437
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c9e2d4b15'
+down_revision: Union[str, Sequence[str], None] = '4d1f6a2b8c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # high-water mark refresh rollup
+    op.create_index('ix_sales_created_at', 'sales', ['created_at'], unique=False)
+
+    op.create_table('sales_product_week',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('sales', sa.BigInteger(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'week_start')
+    )
+    op.create_table('sales_category_day',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('sales', sa.BigInteger(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'date')
+    )
+    op.create_index('ix_sales_category_day_date', 'sales_category_day', ['date'], unique=False)
+    op.create_table('sales_category_week',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('sales', sa.BigInteger(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'week_start')
+    )
+    op.create_index('ix_sales_category_week_week_start', 'sales_category_week', ['week_start'], unique=False)
+    # high_water NULL: refresh pertama membangun rollup penuh
+    op.create_table('rollup_watermark',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('high_water', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_watermark')
+    op.drop_index('ix_sales_category_week_week_start', table_name='sales_category_week')
+    op.drop_table('sales_category_week')
+    op.drop_index('ix_sales_category_day_date', table_name='sales_category_day')
+    op.drop_table('sales_category_day')
+    op.drop_table('sales_product_week')
+    op.drop_index('ix_sales_created_at', table_name='sales')
@@ -0,0 +1,127 @@
+"""composite (product_id, date) indexes, optional monthly partitioning
+
+Revision ID: 9c2b7e41f0a6
+Revises: 3e8a0f6c5d21
+Create Date: 2026-10-18 13:41:05.276113
+
+Partisi bulanan sales & forecast hanya dibuat kalau
+PARTITION_TIME_SERIES=true (sama dengan setting yang dibaca model).
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.config import settings
+from db.partitions import ensure_month_partitions, is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2b7e41f0a6'
+down_revision: Union[str, Sequence[str], None] = '3e8a0f6c5d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# partisi bulan depan yang langsung dibuat saat konversi
+MONTHS_AHEAD = 3
+
+COLUMNS = {
+    'sales': """
+        id integer NOT NULL DEFAULT nextval('sales_id_seq'::regclass),
+        product_id integer NOT NULL REFERENCES products (id),
+        date date NOT NULL,
+        sales integer NOT NULL,
+        created_at timestamp with time zone NOT NULL DEFAULT now()
+    """,
+    'forecast': """
+        id integer NOT NULL DEFAULT nextval('forecast_id_seq'::regclass),
+        product_id integer NOT NULL REFERENCES products (id),
+        date date NOT NULL,
+        predicted_sales double precision NOT NULL,
+        created_at timestamp with time zone NOT NULL DEFAULT now()
+    """,
+}
+
+# index setelah migrasi ini, sama untuk tabel biasa maupun partitioned
+INDEXES = {
+    'sales': {
+        'ix_sales_id': "CREATE INDEX ix_sales_id ON sales (id)",
+        'ix_sales_date': "CREATE INDEX ix_sales_date ON sales (date)",
+        'ix_sales_product_id_date': "CREATE INDEX ix_sales_product_id_date ON sales (product_id, date) INCLUDE (sales)",
+    },
+    'forecast': {
+        'ix_forecast_id': "CREATE INDEX ix_forecast_id ON forecast (id)",
+        'ix_forecast_date': "CREATE INDEX ix_forecast_date ON forecast (date)",
+        'uq_forecast_product_id_date': (
+            "CREATE UNIQUE INDEX uq_forecast_product_id_date ON forecast (product_id, date) INCLUDE (predicted_sales)"
+        ),
+    },
+}
+
+
+def _rebuild(table, partitioned):
+    """Pindah data ke tabel baru (partitioned by month / biasa) dengan nama & index yang sama"""
+    bind = op.get_bind()
+    old = f"{table}_old"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    for name in INDEXES[table]:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    if partitioned:
+        # PK tabel partitioned wajib memuat kolom partisi
+        op.execute(
+            f"CREATE TABLE {table} ({COLUMNS[table]}, CONSTRAINT {table}_pkey PRIMARY KEY (id, date)) "
+            f"PARTITION BY RANGE (date)"
+        )
+        min_date, max_date = bind.execute(sa.text(f"SELECT min(date), max(date) FROM {old}")).one()
+        today = datetime.date.today()
+        start = min(min_date or today, today)
+        end = max(max_date or today, today) + datetime.timedelta(days=31 * MONTHS_AHEAD)
+        ensure_month_partitions(bind, table, start, end)
+    else:
+        op.execute(f"CREATE TABLE {table} ({COLUMNS[table]}, CONSTRAINT {table}_pkey PRIMARY KEY (id))")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    # sequence id ikut tabel baru supaya tidak ke-drop bareng tabel lama
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {old}")
+
+    for sql in INDEXES[table].values():
+        op.execute(sql)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # filter product lalu date: composite + INCLUDE untuk index-only scan,
+    # index product_id tunggal jadi redundant
+    op.create_index('ix_sales_product_id_date', 'sales', ['product_id', 'date'],
+                    unique=False, postgresql_include=['sales'])
+    op.drop_index(op.f('ix_sales_product_id'), table_name='sales')
+
+    op.drop_constraint('uq_forecast_product_id_date', 'forecast', type_='unique')
+    op.create_index('uq_forecast_product_id_date', 'forecast', ['product_id', 'date'],
+                    unique=True, postgresql_include=['predicted_sales'])
+    op.drop_index(op.f('ix_forecast_product_id'), table_name='forecast')
+
+    if settings.PARTITION_TIME_SERIES:
+        for table in ('sales', 'forecast'):
+            if not is_partitioned(op.get_bind(), table):
+                _rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('sales', 'forecast'):
+        if is_partitioned(op.get_bind(), table):
+            _rebuild(table, partitioned=False)
+
+    op.create_index(op.f('ix_forecast_product_id'), 'forecast', ['product_id'], unique=False)
+    op.drop_index('uq_forecast_product_id_date', table_name='forecast')
+    op.create_unique_constraint('uq_forecast_product_id_date', 'forecast', ['product_id', 'date'])
+
+    op.create_index(op.f('ix_sales_product_id'), 'sales', ['product_id'], unique=False)
+    op.drop_index('ix_sales_product_id_date', table_name='sales')
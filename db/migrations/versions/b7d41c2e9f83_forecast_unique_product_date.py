@@ -0,0 +1,37 @@
+"""forecast unique (product_id, date)
+
+Revision ID: b7d41c2e9f83
+Revises: 5212a0dbe130
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c2e9f83'
+down_revision: Union[str, Sequence[str], None] = '5212a0dbe130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rerun forecast lama menghasilkan baris dobel, simpan yang paling baru
+    op.execute(
+        """
+        DELETE FROM forecast older
+        USING forecast newer
+        WHERE older.product_id = newer.product_id
+          AND older.date = newer.date
+          AND older.id < newer.id
+        """
+    )
+    op.create_unique_constraint('uq_forecast_product_id_date', 'forecast', ['product_id', 'date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_forecast_product_id_date', 'forecast', type_='unique')
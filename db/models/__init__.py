@@ -1,22 +1,12 @@
-import pkgutil
-import importlib
-from .sales import Sale
+# daftar eksplisit: import murah dan jelas, model baru wajib ditambahkan di sini
 from .products import Product
+from .sales import Sale
 from .forecast import Forecast
-
-__all__ = []
-
-for loader, module_name, is_pkg in pkgutil.walk_packages(__path__):
-    # skip __init__.py
-    if module_name == "__init__":
-        continue
-
-    # import modulnya
-    module = importlib.import_module(f"{__name__}.{module_name}")
-
-    # ambil semua atribut yg huruf awalnya kapital (class)
-    for attr_name in dir(module):
-        attr = getattr(module, attr_name)
-        if isinstance(attr, type):
-            globals()[attr_name] = attr
-            __all__.append(attr_name)
\ No newline at end of file
+from .forecast_watermark import ForecastWatermark
+from .category_forecast import CategoryForecast
+from .sales_rollup import RollupWatermark, SalesCategoryDay, SalesCategoryWeek, SalesProductWeek
+
+__all__ = [
+	"Product", "Sale", "Forecast", "ForecastWatermark", "CategoryForecast",
+	"SalesProductWeek", "SalesCategoryDay", "SalesCategoryWeek", "RollupWatermark",
+]
\ No newline at end of file
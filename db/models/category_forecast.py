@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, Index, String
+from sqlalchemy.sql import func
+from db.session import Base
+
+class CategoryForecast(Base):
+	__tablename__ = "category_forecast"
+	__table_args__ = (
+		Index(
+			"uq_category_forecast_category_date", "category", "date",
+			unique=True, postgresql_include=["predicted_sales"],
+		),
+	)
+
+	id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+	# produk tanpa kategori masuk category ''
+	category = Column(String, nullable=False)
+	date = Column(Date, nullable=False)
+	predicted_sales = Column(Float, nullable=False)
+	# metode rekonsiliasi: bottom_up / top_down / mint
+	method = Column(String, nullable=False)
+
+	created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
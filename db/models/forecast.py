@@ -1,14 +1,23 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, Date, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from core.config import settings
 from db.session import Base
 
 class Forecast(Base):
 	__tablename__ = "forecast"
+	__table_args__ = (
+		Index(
+			"uq_forecast_product_id_date", "product_id", "date",
+			unique=True, postgresql_include=["predicted_sales"],
+		),
+		{"postgresql_partition_by": "RANGE (date)"} if settings.PARTITION_TIME_SERIES else {},
+	)
 
-	id = Column(Integer, primary_key=True, index=True)
-	product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
-	date = Column(Date, nullable=False, index=True)
+	id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+	product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+	# tabel partitioned: PK wajib memuat kolom partisi
+	date = Column(Date, nullable=False, index=True, primary_key=settings.PARTITION_TIME_SERIES)
 	predicted_sales = Column(Float, nullable=False)
 
 	created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime
+from sqlalchemy.sql import func
+from db.session import Base
+
+class ForecastWatermark(Base):
+	__tablename__ = "forecast_watermark"
+
+	product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+	# posisi data sales yang sudah dipakai model tersimpan
+	last_sale_date = Column(Date, nullable=False)
+	row_count = Column(Integer, nullable=False)
+	# jumlah baris saat full retrain terakhir (basis hitung drift)
+	trained_rows = Column(Integer, nullable=False)
+
+	updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
@@ -0,0 +1,56 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+from db.session import Base
+
+# rollup sales, di-refresh incremental dari high-water mark sales.created_at
+# (domains.sales.repository.refresh_sales_rollups). Produk tanpa kategori masuk category ''.
+
+class SalesProductWeek(Base):
+	__tablename__ = "sales_product_week"
+
+	product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+	# senin awal minggu (date_trunc('week'))
+	week_start = Column(Date, primary_key=True)
+	sales = Column(BigInteger, nullable=False)
+	# jumlah baris sales (hari) di minggu ini
+	row_count = Column(Integer, nullable=False)
+
+	updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
+
+class SalesCategoryDay(Base):
+	__tablename__ = "sales_category_day"
+	__table_args__ = (
+		# chart semua kategori per rentang tanggal
+		Index("ix_sales_category_day_date", "date"),
+	)
+
+	category = Column(String, primary_key=True)
+	date = Column(Date, primary_key=True)
+	sales = Column(BigInteger, nullable=False)
+	# jumlah baris sales (produk) di hari ini
+	row_count = Column(Integer, nullable=False)
+
+	updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
+
+class SalesCategoryWeek(Base):
+	__tablename__ = "sales_category_week"
+	__table_args__ = (
+		Index("ix_sales_category_week_week_start", "week_start"),
+	)
+
+	category = Column(String, primary_key=True)
+	week_start = Column(Date, primary_key=True)
+	sales = Column(BigInteger, nullable=False)
+	# jumlah baris sales (produk x hari) di minggu ini
+	row_count = Column(Integer, nullable=False)
+
+	updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
+
+class RollupWatermark(Base):
+	__tablename__ = "rollup_watermark"
+
+	name = Column(String, primary_key=True)
+	# created_at sales terbesar yang sudah masuk rollup
+	high_water = Column(DateTime(timezone=True), nullable=True)
+
+	updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), nullable=False)
@@ -0,0 +1,41 @@
+import datetime
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+def month_starts(start: datetime.date, end: datetime.date) -> Iterator[datetime.date]:
+	"""Tanggal 1 tiap bulan dari bulan `start` sampai bulan `end` (inklusif)"""
+	month = start.replace(day=1)
+	while month <= end:
+		yield month
+		month = (month + datetime.timedelta(days=32)).replace(day=1)
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+	return bool(conn.execute(
+		text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+		{"table": table},
+	).scalar())
+
+def ensure_month_partitions(conn: Connection, table: str, start: datetime.date, end: datetime.date,
+							default: bool = True) -> List[str]:
+	"""
+	Buat partisi bulanan `<table>_pYYYY_MM` untuk rentang tanggal, plus
+	partisi DEFAULT untuk tanggal di luar rentang. Partisi yang sudah ada
+	dilewati. Catatan: bulan yang datanya sudah masuk DEFAULT tidak bisa
+	dibuatkan partisi lagi, jadi buat partisi bulan depan sebelum datanya datang.
+	"""
+	created = []
+	for month in month_starts(start, end):
+		name = f"{table}_p{month:%Y_%m}"
+		next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+		conn.execute(text(
+			f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+			f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+		))
+		created.append(name)
+
+	if default:
+		conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+	return created
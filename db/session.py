@@ -7,7 +7,15 @@ DATABASE_URL = (
 	f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+POOL_OPTIONS = dict(
+	pool_pre_ping=True,
+	pool_size=settings.DB_POOL_SIZE,
+	max_overflow=settings.DB_MAX_OVERFLOW,
+	pool_timeout=settings.DB_POOL_TIMEOUT,
+	pool_recycle=settings.DB_POOL_RECYCLE,
+)
+
+engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,248 @@
+import datetime
+import io
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models.category_forecast import CategoryForecast
+from db.models.forecast import Forecast
+from db.models.products import Product
+from db.models.forecast_watermark import ForecastWatermark
+
+STAGE_TABLE = "forecast_stage"
+
+# channel NOTIFY setelah forecast ter-commit, payload: product_id dipisah koma
+# (kosong = semua produk, kalau daftar id melebihi batas payload NOTIFY)
+FORECAST_CHANNEL = "forecast_committed"
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+CREATE_STAGE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (
+	seq bigserial,
+	product_id integer NOT NULL,
+	date date NOT NULL,
+	predicted_sales double precision NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# DISTINCT ON: kalau satu chunk berisi (product_id, date) dobel, ON CONFLICT
+# DO UPDATE akan error "cannot affect row a second time". Yang dipakai baris
+# terakhir di chunk (seq terbesar, COPY mengisi seq sesuai urutan baris)
+MERGE_SQL = f"""
+INSERT INTO forecast (product_id, date, predicted_sales)
+SELECT DISTINCT ON (product_id, date) product_id, date, predicted_sales
+FROM {STAGE_TABLE}
+ORDER BY product_id, date, seq DESC
+ON CONFLICT (product_id, date) DO UPDATE
+SET predicted_sales = EXCLUDED.predicted_sales,
+	created_at = now()
+"""
+
+def _copy_chunk(cursor, rows) -> None:
+	buf = io.StringIO()
+	for row in rows:
+		buf.write(f"{row['product_id']},{row['date'].isoformat()},{float(row['predicted_sales'])!r}\n")
+	buf.seek(0)
+	cursor.copy_expert(
+		f"COPY {STAGE_TABLE} (product_id, date, predicted_sales) FROM STDIN WITH (FORMAT csv)",
+		buf,
+	)
+
+def _dialect_insert(db: Session, table):
+	"""INSERT dengan ON CONFLICT sesuai dialect (SQLite dipakai benchmark / dev lokal)"""
+	dialect = db.get_bind().dialect.name
+	if dialect == "postgresql":
+		return postgresql.insert(table)
+	if dialect == "sqlite":
+		return sqlite.insert(table)
+	raise NotImplementedError(f"upsert belum didukung untuk dialect {dialect}")
+
+def notify_payload(product_ids: Iterable[int]) -> str:
+	payload = ",".join(str(pid) for pid in sorted(set(product_ids)))
+	return payload if len(payload) <= NOTIFY_PAYLOAD_LIMIT else ""
+
+def upsert_forecasts(db: Session, rows: Iterable[Mapping], chunk_size: int = 50_000) -> int:
+	"""
+	Simpan forecast lewat COPY ke temp table lalu merge ke `forecast`
+	dengan INSERT ... ON CONFLICT (product_id, date). Commit per chunk,
+	jadi run yang crash di tengah tetap menyimpan chunk yang sudah selesai,
+	dan rerun tidak bikin baris dobel. Tiap commit mengirim NOTIFY
+	FORECAST_CHANNEL supaya cache API membuang produk yang berubah.
+	rows: iterable dict {product_id, date, predicted_sales}
+	return: jumlah baris yang ditulis
+	"""
+	if db.get_bind().dialect.name != "postgresql":
+		return _upsert_forecasts_generic(db, rows, chunk_size)
+
+	total = 0
+	chunk = []
+
+	def flush():
+		nonlocal total
+		# koneksi bisa beda tiap transaksi (pool), temp table dibuat per koneksi
+		cursor = db.connection().connection.cursor()
+		try:
+			cursor.execute(CREATE_STAGE_SQL)
+			_copy_chunk(cursor, chunk)
+			cursor.execute(MERGE_SQL)
+			# NOTIFY baru terkirim saat commit
+			cursor.execute(
+				"SELECT pg_notify(%s, %s)",
+				(FORECAST_CHANNEL, notify_payload(row["product_id"] for row in chunk)),
+			)
+		finally:
+			cursor.close()
+		db.commit()
+		total += len(chunk)
+		chunk.clear()
+
+	for row in rows:
+		chunk.append(row)
+		if len(chunk) >= chunk_size:
+			flush()
+	if chunk:
+		flush()
+
+	return total
+
+def _upsert_forecasts_generic(db: Session, rows: Iterable[Mapping], chunk_size: int) -> int:
+	"""Fallback non-Postgres: executemany INSERT ... ON CONFLICT per chunk, tanpa NOTIFY"""
+	total = 0
+	chunk = []
+
+	def flush():
+		nonlocal total
+		# dedupe dalam chunk, baris terakhir menang (sama seperti DISTINCT ON di MERGE_SQL)
+		deduped = list({(row["product_id"], row["date"]): row for row in chunk}.values())
+		stmt = _dialect_insert(db, Forecast)
+		stmt = stmt.on_conflict_do_update(
+			index_elements=[Forecast.product_id, Forecast.date],
+			set_={"predicted_sales": stmt.excluded.predicted_sales, "created_at": func.now()},
+		)
+		db.execute(stmt, [
+			{"product_id": row["product_id"], "date": row["date"], "predicted_sales": float(row["predicted_sales"])}
+			for row in deduped
+		])
+		db.commit()
+		total += len(chunk)
+		chunk.clear()
+
+	for row in rows:
+		chunk.append(row)
+		if len(chunk) >= chunk_size:
+			flush()
+	if chunk:
+		flush()
+
+	return total
+
+def upsert_category_forecasts(db: Session, rows: List[Mapping]) -> int:
+	"""
+	Simpan forecast level kategori (hasil rekonsiliasi), satu commit.
+	rows: list dict {category, date, predicted_sales, method}
+	"""
+	if not rows:
+		return 0
+	stmt = _dialect_insert(db, CategoryForecast)
+	stmt = stmt.on_conflict_do_update(
+		index_elements=[CategoryForecast.category, CategoryForecast.date],
+		set_={
+			"predicted_sales": stmt.excluded.predicted_sales,
+			"method": stmt.excluded.method,
+			"created_at": func.now(),
+		},
+	)
+	db.execute(stmt, rows)
+	db.commit()
+	return len(rows)
+
+def _product_forecasts_select(product_ids, start_date=None, end_date=None):
+	stmt = (
+		select(Forecast.product_id, Forecast.date, Forecast.predicted_sales)
+		.where(Forecast.product_id.in_(product_ids))
+		.order_by(Forecast.product_id, Forecast.date)
+	)
+	if start_date is not None:
+		stmt = stmt.where(Forecast.date >= start_date)
+	if end_date is not None:
+		stmt = stmt.where(Forecast.date <= end_date)
+	return stmt
+
+def forecast_select(
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	"""Query baris forecast dengan filter opsional, tanpa ORDER BY (untuk listing/export)"""
+	stmt = select(Forecast.id, Forecast.product_id, Forecast.date, Forecast.predicted_sales)
+	if product_id is not None:
+		stmt = stmt.where(Forecast.product_id == product_id)
+	if category is not None:
+		stmt = stmt.join(Product, Product.id == Forecast.product_id).where(Product.category == category)
+	if start_date is not None:
+		stmt = stmt.where(Forecast.date >= start_date)
+	if end_date is not None:
+		stmt = stmt.where(Forecast.date <= end_date)
+	return stmt
+
+def _group_forecasts(product_ids, rows) -> Dict[int, List[tuple]]:
+	result = {pid: [] for pid in product_ids}
+	for product_id, date, predicted_sales in rows:
+		result[product_id].append((date, predicted_sales))
+	return result
+
+def get_forecasts(
+	db: Session,
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> Dict[int, List[tuple]]:
+	"""
+	Forecast beberapa produk dalam satu query (index-only scan di
+	uq_forecast_product_id_date). return: {product_id: [(date, predicted_sales), ...]}
+	"""
+	product_ids = list(product_ids)
+	rows = db.execute(_product_forecasts_select(product_ids, start_date, end_date))
+	return _group_forecasts(product_ids, rows)
+
+async def get_forecasts_async(
+	db: AsyncSession,
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> Dict[int, List[tuple]]:
+	"""Versi async get_forecasts untuk handler FastAPI"""
+	product_ids = list(product_ids)
+	rows = await db.execute(_product_forecasts_select(product_ids, start_date, end_date))
+	return _group_forecasts(product_ids, rows)
+
+def get_watermarks(db: Session, product_ids: Optional[Iterable[int]] = None) -> Dict[int, ForecastWatermark]:
+	"""Watermark training terakhir per produk, key product_id"""
+	query = db.query(ForecastWatermark)
+	if product_ids is not None:
+		query = query.filter(ForecastWatermark.product_id.in_(list(product_ids)))
+	return {wm.product_id: wm for wm in query.all()}
+
+def upsert_watermarks(db: Session, rows: List[Mapping]) -> None:
+	"""
+	Simpan watermark setelah forecast-nya ter-commit.
+	rows: list dict {product_id, last_sale_date, row_count, trained_rows}
+	"""
+	if not rows:
+		return
+	stmt = _dialect_insert(db, ForecastWatermark).values(rows)
+	stmt = stmt.on_conflict_do_update(
+		index_elements=[ForecastWatermark.product_id],
+		set_={
+			"last_sale_date": stmt.excluded.last_sale_date,
+			"row_count": stmt.excluded.row_count,
+			"trained_rows": stmt.excluded.trained_rows,
+			"updated_at": func.now(),
+		},
+	)
+	db.execute(stmt)
+	db.commit()
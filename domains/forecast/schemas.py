@@ -0,0 +1,27 @@
+import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_QUERY_PRODUCTS = 500
+
+class ForecastPoint(BaseModel):
+	date: datetime.date
+	predicted_sales: float
+
+class ProductForecast(BaseModel):
+	product_id: int
+	start_date: Optional[datetime.date] = None
+	end_date: Optional[datetime.date] = None
+	items: List[ForecastPoint]
+
+class ForecastQuery(BaseModel):
+	product_ids: List[int] = Field(..., min_length=1, max_length=MAX_QUERY_PRODUCTS)
+	start_date: Optional[datetime.date] = None
+	end_date: Optional[datetime.date] = None
+
+	@model_validator(mode="after")
+	def check_range(self) -> "ForecastQuery":
+		if self.start_date and self.end_date and self.start_date > self.end_date:
+			raise ValueError("start_date harus <= end_date")
+		return self
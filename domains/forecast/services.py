@@ -0,0 +1,224 @@
+import datetime
+import hashlib
+import select
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List, Optional
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.async_session import AsyncSessionLocal
+from db.session import engine
+from db.models.forecast import Forecast
+from domains.forecast.repository import FORECAST_CHANNEL, forecast_select, get_forecasts, get_forecasts_async
+from domains.forecast.schemas import ForecastPoint, ProductForecast
+from utils.cache import TTLCache
+from utils.export import ExportFormat, stream_export
+from utils.logger import get_logger
+from utils.pagination import CountMode, CursorPage, paginate
+
+logger = get_logger(__name__)
+
+# key: (product_id, start_date, end_date)
+forecast_cache = TTLCache(max_entries=settings.FORECAST_CACHE_SIZE, ttl=settings.FORECAST_CACHE_TTL)
+
+# bentuk sama dengan utils.response.success_response, dirakit dari bytes
+# supaya JSON yang sudah di-cache tidak di-serialize ulang
+ENVELOPE_PREFIX = b'{"status":"success","message":"Success","data":'
+ENVELOPE_SUFFIX = b"}"
+
+@dataclass(frozen=True)
+class CachedForecast:
+	product_id: int
+	body: bytes  # JSON ProductForecast
+	etag: str
+	empty: bool
+
+def _etag(data: bytes) -> str:
+	return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+def _build_entry(product_id, start_date, end_date, rows) -> CachedForecast:
+	body = ProductForecast(
+		product_id=product_id,
+		start_date=start_date,
+		end_date=end_date,
+		items=[ForecastPoint(date=date, predicted_sales=value) for date, value in rows],
+	).model_dump_json().encode()
+	return CachedForecast(product_id=product_id, body=body, etag=_etag(body), empty=not rows)
+
+def _lookup(product_ids, start_date, end_date):
+	entries = {}
+	missing = []
+	for product_id in product_ids:
+		entry = forecast_cache.get((product_id, start_date, end_date))
+		if entry is None:
+			missing.append(product_id)
+		else:
+			entries[product_id] = entry
+	return entries, missing
+
+def _fill(entries, rows, start_date, end_date, generation) -> None:
+	for product_id, product_rows in rows.items():
+		entry = _build_entry(product_id, start_date, end_date, product_rows)
+		forecast_cache.set((product_id, start_date, end_date), entry, generation=generation)
+		entries[product_id] = entry
+
+def get_cached_forecasts(
+	db: Session,
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> List[CachedForecast]:
+	"""Forecast per produk dari cache; produk yang miss diambil sekaligus dalam satu query"""
+	product_ids = list(dict.fromkeys(product_ids))
+	entries, missing = _lookup(product_ids, start_date, end_date)
+	if missing:
+		generation = forecast_cache.generation
+		_fill(entries, get_forecasts(db, missing, start_date, end_date), start_date, end_date, generation)
+	return [entries[product_id] for product_id in product_ids]
+
+async def get_cached_forecasts_async(
+	db: AsyncSession,
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> List[CachedForecast]:
+	"""Versi async get_cached_forecasts, cache yang dipakai sama"""
+	product_ids = list(dict.fromkeys(product_ids))
+	entries, missing = _lookup(product_ids, start_date, end_date)
+	if missing:
+		generation = forecast_cache.generation
+		rows = await get_forecasts_async(db, missing, start_date, end_date)
+		_fill(entries, rows, start_date, end_date, generation)
+	return [entries[product_id] for product_id in product_ids]
+
+def get_product_forecast(
+	db: Session,
+	product_id: int,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> CachedForecast:
+	return get_cached_forecasts(db, [product_id], start_date, end_date)[0]
+
+async def get_product_forecast_async(
+	db: AsyncSession,
+	product_id: int,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> CachedForecast:
+	return (await get_cached_forecasts_async(db, [product_id], start_date, end_date))[0]
+
+def combined_etag(entries: List[CachedForecast]) -> str:
+	return _etag(",".join(entry.etag for entry in entries).encode())
+
+def render_product(entry: CachedForecast) -> bytes:
+	return ENVELOPE_PREFIX + entry.body + ENVELOPE_SUFFIX
+
+def render_many(entries: List[CachedForecast]) -> bytes:
+	return ENVELOPE_PREFIX + b"[" + b",".join(entry.body for entry in entries) + b"]" + ENVELOPE_SUFFIX
+
+# urutan keyset listing, sama dengan index uq_forecast_product_id_date (+ id)
+FORECAST_KEYS = (Forecast.product_id, Forecast.date, Forecast.id)
+
+async def list_forecasts(
+	db: AsyncSession,
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	cursor: Optional[str] = None,
+	limit: int = 100,
+	count: CountMode = "none",
+) -> CursorPage:
+	stmt = forecast_select(product_id, category, start_date, end_date)
+	return await paginate(db, stmt, FORECAST_KEYS, cursor, limit, count)
+
+def _arrow_schema():
+	import pyarrow as pa
+
+	return pa.schema([
+		("id", pa.int32()),
+		("product_id", pa.int32()),
+		("date", pa.date32()),
+		("predicted_sales", pa.float64()),
+	])
+
+def export_forecasts(
+	fmt: ExportFormat = "ndjson",
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	chunk_size: int = 10_000,
+) -> AsyncIterator[bytes]:
+	"""Stream semua baris forecast yang cocok filter, urut (product_id, date)"""
+	stmt = forecast_select(product_id, category, start_date, end_date).order_by(*FORECAST_KEYS)
+	schema = _arrow_schema() if fmt == "arrow" else None
+	return stream_export(AsyncSessionLocal, stmt, fmt, schema, chunk_size)
+
+def invalidate_payload(payload: str, cache: TTLCache = forecast_cache) -> None:
+	"""Payload NOTIFY dari upsert_forecasts: product_id dipisah koma, kosong = semua"""
+	if not payload:
+		cache.clear()
+		return
+	product_ids = {int(pid) for pid in payload.split(",")}
+	cache.invalidate(lambda key: key[0] in product_ids)
+
+class ForecastCacheListener:
+	"""
+	LISTEN FORECAST_CHANNEL di thread terpisah dan buang entry cache produk
+	yang forecast-nya baru di-commit (run forecast jalan di proses lain).
+	Kalau koneksi putus, cache dikosongkan karena notifikasi bisa terlewat.
+	"""
+
+	def __init__(self, cache: TTLCache = forecast_cache, retry_seconds: float = 5.0):
+		self.cache = cache
+		self.retry_seconds = retry_seconds
+		self.dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self) -> None:
+		if self._thread and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name="forecast-cache-listener", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		if self._thread:
+			self._thread.join(timeout=5)
+
+	def _listen(self) -> None:
+		conn = psycopg2.connect(self.dsn)
+		try:
+			conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+			with conn.cursor() as cursor:
+				cursor.execute(f"LISTEN {FORECAST_CHANNEL}")
+			self.cache.clear()
+			logger.info(f"Listening {FORECAST_CHANNEL}")
+
+			while not self._stop.is_set():
+				if select.select([conn], [], [], 1.0) == ([], [], []):
+					continue
+				conn.poll()
+				while conn.notifies:
+					invalidate_payload(conn.notifies.pop(0).payload, self.cache)
+		finally:
+			conn.close()
+
+	def _run(self) -> None:
+		while not self._stop.is_set():
+			try:
+				self._listen()
+			except psycopg2.Error as e:
+				logger.warning(f"Forecast cache listener error: {e}")
+				self.cache.clear()
+				self._stop.wait(self.retry_seconds)
+
+cache_listener = ForecastCacheListener()
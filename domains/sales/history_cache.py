@@ -0,0 +1,240 @@
+"""
+Cache histori sales lokal untuk run training/backtest/evaluasi: layout
+SalesHistory (product_ids, offsets, dates, sales) disimpan sebagai file .npy
+per segment, dibaca memory-mapped read-only. Worker paralel yang membuka
+cache yang sama berbagi page cache OS, tanpa copy dan tanpa query database.
+
+	<dir>/manifest.json          segment aktif + high-water mark sales.created_at
+	<dir>/seg-000001.<kolom>.npy  satu file per kolom SalesHistory per segment
+
+Sync incremental hanya mengambil baris dengan created_at > high-water - overlap
+(upsert sales ikut memperbarui created_at) dan menulisnya sebagai segment
+baru. Baris (product_id, date) yang sama di segment lebih baru menimpa yang
+lama. Compaction menggabung semua segment jadi satu; hanya cache satu segment
+yang dibaca zero-copy, beberapa segment digabung ke memori saat dibuka.
+Sales yang dihapus dari database tidak terdeteksi, perlu rebuild (full).
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import datetime
+import fcntl
+import json
+import os
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.models.sales import Sale
+from domains.sales.repository import SalesHistory, load_sales_history
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+COLUMNS = ("product_ids", "offsets", "dates", "sales")
+FORMAT_VERSION = 1
+
+@dataclass
+class HistorySyncReport:
+	full: bool
+	rows: int = 0
+	segments: int = 0
+	compacted: bool = False
+	since: Optional[datetime.datetime] = None
+	high_water: Optional[datetime.datetime] = None
+	seconds: float = 0.0
+
+	def as_dict(self) -> Dict:
+		return {
+			"mode": "full" if self.full else "incremental",
+			"rows": self.rows,
+			"segments": self.segments,
+			"compacted": self.compacted,
+			"since": self.since.isoformat() if self.since else None,
+			"high_water": self.high_water.isoformat() if self.high_water else None,
+			"seconds": round(self.seconds, 3),
+		}
+
+class HistoryCache:
+	def __init__(self, path: str):
+		self.path = path
+
+	def _file(self, name: str) -> str:
+		return os.path.join(self.path, name)
+
+	def _segment_file(self, segment: str, column: str) -> str:
+		return self._file(f"{segment}.{column}.npy")
+
+	def exists(self) -> bool:
+		return os.path.isfile(self._file(MANIFEST))
+
+	def manifest(self) -> Dict:
+		if not self.exists():
+			return {"version": FORMAT_VERSION, "high_water": None, "next_segment": 1, "segments": []}
+		with open(self._file(MANIFEST)) as f:
+			manifest = json.load(f)
+		if manifest.get("version") != FORMAT_VERSION:
+			raise ValueError(f"format history cache {self.path} tidak dikenal: {manifest.get('version')}")
+		return manifest
+
+	def high_water(self) -> Optional[datetime.datetime]:
+		value = self.manifest()["high_water"]
+		return datetime.datetime.fromisoformat(value) if value else None
+
+	# baca
+	def _load_segment(self, segment: str) -> SalesHistory:
+		arrays = {column: np.load(self._segment_file(segment, column), mmap_mode="r") for column in COLUMNS}
+		return SalesHistory(**arrays)
+
+	def open(self) -> SalesHistory:
+		"""
+		SalesHistory dari cache. Satu segment: array memmap read-only (zero-copy),
+		beberapa segment: digabung ke memori (baris segment terbaru menang).
+		"""
+		segments = [self._load_segment(s["name"]) for s in self.manifest()["segments"]]
+		if not segments:
+			return SalesHistory.from_arrays([], [], [])
+		if len(segments) == 1:
+			return segments[0]
+		return merge_histories(segments)
+
+	# tulis
+	def _write_segment(self, segment: str, history: SalesHistory) -> None:
+		for column in COLUMNS:
+			tmp = self._segment_file(segment, column) + ".tmp"
+			with open(tmp, "wb") as f:
+				np.save(f, np.ascontiguousarray(getattr(history, column)))
+			os.replace(tmp, self._segment_file(segment, column))
+
+	def _write_manifest(self, manifest: Dict) -> None:
+		# replace atomik: pembaca selalu melihat manifest lama atau baru, tidak setengah
+		tmp = self._file(MANIFEST + ".tmp")
+		with open(tmp, "w") as f:
+			json.dump(manifest, f, indent=2)
+		os.replace(tmp, self._file(MANIFEST))
+
+	def _remove_segments(self, names: List[str]) -> None:
+		# file yang masih di-mmap pembaca lain tetap valid sampai ditutup (unlink POSIX)
+		for name in names:
+			for column in COLUMNS:
+				try:
+					os.remove(self._segment_file(name, column))
+				except FileNotFoundError:
+					pass
+
+	def _lock(self):
+		os.makedirs(self.path, exist_ok=True)
+		lock = open(self._file(LOCK_FILE), "w")
+		fcntl.flock(lock, fcntl.LOCK_EX)
+		return lock
+
+	def _append(self, manifest: Dict, history: SalesHistory, replace: bool = False) -> List[str]:
+		"""Tulis segment baru; replace: segment lama dibuang dari manifest. return nama segment lama yang dibuang"""
+		name = f"seg-{manifest['next_segment']:06d}"
+		self._write_segment(name, history)
+		removed = [s["name"] for s in manifest["segments"]] if replace else []
+		if replace:
+			manifest["segments"] = []
+		manifest["segments"].append({"name": name, "rows": len(history.sales), "products": len(history)})
+		manifest["next_segment"] += 1
+		return removed
+
+	def sync(
+		self,
+		db: Session,
+		full: bool = False,
+		overlap: datetime.timedelta = datetime.timedelta(minutes=10),
+		max_segments: int = 8,
+	) -> HistorySyncReport:
+		"""
+		Tarik baris sales baru dari database ke cache. Cache belum ada atau
+		full=True: bangun ulang dari semua sales. Compaction otomatis kalau
+		jumlah segment melebihi max_segments.
+		"""
+		start = time.perf_counter()
+		with self._lock():
+			manifest = self.manifest()
+			high_water = self.high_water()
+			report = HistorySyncReport(full=full or high_water is None)
+
+			# high-water diambil sebelum baris dibaca: baris yang commit di antaranya ikut run berikutnya
+			new_high_water = db.execute(select(func.max(Sale.created_at))).scalar()
+			if not report.full:
+				report.since = high_water - overlap
+			history = load_sales_history(db, created_after=report.since)
+			if not report.full:
+				history = _changed_rows(self.open(), history)
+
+			removed = []
+			if report.full or len(history.sales):
+				removed = self._append(manifest, history, replace=report.full)
+			report.rows = len(history.sales)
+
+			if len(manifest["segments"]) > max_segments:
+				removed += self._compact(manifest)
+				report.compacted = True
+
+			report.high_water = max(filter(None, [high_water, new_high_water]), default=None)
+			manifest["high_water"] = report.high_water.isoformat() if report.high_water else None
+			self._write_manifest(manifest)
+			self._remove_segments(removed)
+
+			report.segments = len(manifest["segments"])
+		report.seconds = time.perf_counter() - start
+		return report
+
+	def _compact(self, manifest: Dict) -> List[str]:
+		segments = [self._load_segment(s["name"]) for s in manifest["segments"]]
+		return self._append(manifest, merge_histories(segments), replace=True)
+
+	def compact(self) -> int:
+		"""Gabung semua segment jadi satu (tanpa database). return jumlah baris hasil"""
+		with self._lock():
+			manifest = self.manifest()
+			if len(manifest["segments"]) > 1:
+				removed = self._compact(manifest)
+				self._write_manifest(manifest)
+				self._remove_segments(removed)
+			return sum(s["rows"] for s in manifest["segments"])
+
+def sync_history_cache(db: Session, path: Optional[str] = None, full: bool = False) -> HistoryCache:
+	"""Sync cache dengan setting dari config, cetak ringkasan. return HistoryCache siap dibuka"""
+	cache = HistoryCache(path or settings.HISTORY_CACHE_DIR)
+	report = cache.sync(
+		db, full=full,
+		overlap=datetime.timedelta(seconds=settings.HISTORY_CACHE_OVERLAP_SECONDS),
+		max_segments=settings.HISTORY_CACHE_MAX_SEGMENTS,
+	)
+	summary = report.as_dict()
+	print(f"   ✓ History cache {cache.path}: sync {summary['mode']} {report.rows} baris, "
+		  f"{report.segments} segment{' (compacted)' if report.compacted else ''}, "
+		  f"high-water {summary['high_water']} ({summary['seconds']} detik)")
+	return cache
+
+def _changed_rows(cached: SalesHistory, fetched: SalesHistory) -> SalesHistory:
+	"""Buang baris hasil overlap yang sudah ada di cache dengan nilai sama"""
+	product_ids = np.repeat(fetched.product_ids, np.diff(fetched.offsets))
+	found, sales = cached.lookup(product_ids, fetched.dates)
+	changed = ~found | (sales != fetched.sales)
+	if changed.all():
+		return fetched
+	return SalesHistory.from_sorted(product_ids[changed], fetched.dates[changed], fetched.sales[changed])
+
+def merge_histories(histories: List[SalesHistory]) -> SalesHistory:
+	"""
+	Gabung beberapa SalesHistory (urut lama -> baru). Untuk (product_id, date)
+	yang muncul lebih dari sekali, nilai dari history terakhir yang dipakai.
+	"""
+	product_ids = np.concatenate([np.repeat(h.product_ids, np.diff(h.offsets)) for h in histories])
+	dates = np.concatenate([h.dates for h in histories])
+	sales = np.concatenate([h.sales for h in histories])
+	generation = np.concatenate([np.full(len(h.sales), -i, dtype=np.int64) for i, h in enumerate(histories)])
+
+	# urut (product_id, date, terbaru dulu), ambil baris pertama tiap (product_id, date)
+	order = np.lexsort((generation, dates, product_ids))
+	product_ids, dates, sales = product_ids[order], dates[order], sales[order]
+	keep = np.ones(len(order), dtype=bool)
+	keep[1:] = (product_ids[1:] != product_ids[:-1]) | (dates[1:] != dates[:-1])
+
+	return SalesHistory.from_sorted(product_ids[keep], dates[keep], sales[keep])
@@ -0,0 +1,545 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Iterable, Iterator, Literal, Optional, Tuple, Union
+import datetime
+import io
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from db.models.products import Product
+from db.models.sales import Sale
+from db.models.sales_rollup import RollupWatermark, SalesCategoryDay, SalesCategoryWeek, SalesProductWeek
+
+@dataclass
+class SalesHistory:
+	"""
+	Histori sales banyak produk dalam array kontigu.
+	Data produk ke-i ada di dates/sales[offsets[i]:offsets[i + 1]], urut tanggal.
+	"""
+	product_ids: np.ndarray  # (P,) int64, urut naik
+	offsets: np.ndarray      # (P + 1,) int64
+	dates: np.ndarray        # (N,) datetime64[D]
+	sales: np.ndarray        # (N,) float64
+
+	def __len__(self) -> int:
+		return len(self.product_ids)
+
+	def __contains__(self, product_id: int) -> bool:
+		return self._index(product_id) is not None
+
+	def _index(self, product_id: int) -> Optional[int]:
+		idx = int(np.searchsorted(self.product_ids, product_id))
+		if idx < len(self.product_ids) and self.product_ids[idx] == product_id:
+			return idx
+		return None
+
+	def get(self, product_id: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""Return (dates, sales) satu produk sebagai view (tanpa copy)"""
+		idx = self._index(product_id)
+		if idx is None:
+			return self.dates[:0], self.sales[:0]
+		start, end = self.offsets[idx], self.offsets[idx + 1]
+		return self.dates[start:end], self.sales[start:end]
+
+	def count(self, product_id: int) -> int:
+		idx = self._index(product_id)
+		return 0 if idx is None else int(self.offsets[idx + 1] - self.offsets[idx])
+
+	def lookup(self, product_ids, dates) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Sales untuk banyak pasangan (product_id, date) sekaligus: binary search
+		vektor di rentang baris tiap produk, hanya elemen yang disentuh yang
+		terbaca (aman untuk memmap). return (found bool, sales; 0 kalau tidak ada)
+		"""
+		product_ids = np.asarray(product_ids, dtype=np.int64)
+		dates = np.asarray(dates, dtype="datetime64[D]")
+		if not len(self.dates):
+			return np.zeros(len(product_ids), dtype=bool), np.zeros(len(product_ids))
+
+		idx = np.minimum(np.searchsorted(self.product_ids, product_ids), len(self.product_ids) - 1)
+		found = self.product_ids[idx] == product_ids
+		lo = np.where(found, self.offsets[idx], 0)
+		end = np.where(found, self.offsets[idx + 1], 0)
+		hi = end.copy()
+		last = len(self.dates) - 1
+		while (lo < hi).any():
+			active = lo < hi
+			mid = (lo + hi) // 2
+			before = self.dates[np.minimum(mid, last)] < dates
+			lo = np.where(active & before, mid + 1, lo)
+			hi = np.where(active & ~before, mid, hi)
+
+		pos = np.minimum(lo, last)
+		found &= (lo < end) & (self.dates[pos] == dates)
+		return found, np.where(found, self.sales[pos], 0.0)
+
+	def items(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+		for idx, product_id in enumerate(self.product_ids):
+			start, end = self.offsets[idx], self.offsets[idx + 1]
+			yield int(product_id), self.dates[start:end], self.sales[start:end]
+
+	@classmethod
+	def from_arrays(cls, product_ids, dates, sales) -> "SalesHistory":
+		"""Susun array baris (urutan bebas) jadi layout per produk: satu sort + split offset"""
+		product_ids = np.asarray(product_ids, dtype=np.int64)
+		dates = np.asarray(dates, dtype="datetime64[D]")
+		sales = np.asarray(sales, dtype=np.float64)
+
+		order = np.lexsort((dates, product_ids))
+		return cls.from_sorted(product_ids[order], dates[order], sales[order])
+
+	@classmethod
+	def from_sorted(cls, product_ids, dates, sales) -> "SalesHistory":
+		"""Array baris yang sudah urut (product_id, date): tanpa sort/copy, boleh memmap"""
+		# batas antar produk: posisi di mana product_id berubah
+		if len(product_ids):
+			starts = np.flatnonzero(np.diff(product_ids)) + 1
+			offsets = np.concatenate(([0], starts, [len(product_ids)])).astype(np.int64)
+		else:
+			offsets = np.zeros(1, dtype=np.int64)
+		unique_ids = product_ids[offsets[:-1]]
+
+		return cls(product_ids=unique_ids, offsets=offsets, dates=dates, sales=sales)
+
+def sales_select(
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	"""Query baris sales dengan filter opsional, tanpa ORDER BY (untuk listing/export)"""
+	stmt = select(Sale.id, Sale.product_id, Sale.date, Sale.sales)
+	if product_id is not None:
+		stmt = stmt.where(Sale.product_id == product_id)
+	if category is not None:
+		stmt = stmt.join(Product, Product.id == Sale.product_id).where(Product.category == category)
+	if start_date is not None:
+		stmt = stmt.where(Sale.date >= start_date)
+	if end_date is not None:
+		stmt = stmt.where(Sale.date <= end_date)
+	return stmt
+
+def load_sales_history(
+	db: Session,
+	product_ids: Optional[Iterable[int]] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	chunk_size: int = 100_000,
+	created_after: Optional[datetime.datetime] = None,
+) -> SalesHistory:
+	"""
+	Ambil (product_id, date, sales) dalam satu query streaming (server-side
+	cursor), hanya kolom yang dibutuhkan, tanpa bikin objek ORM per baris.
+	created_after: hanya baris yang masuk/diupdate setelahnya (sync incremental)
+	"""
+	stmt = select(Sale.product_id, Sale.date, Sale.sales)
+	if product_ids is not None:
+		stmt = stmt.where(Sale.product_id.in_(list(product_ids)))
+	if start_date is not None:
+		stmt = stmt.where(Sale.date >= start_date)
+	if end_date is not None:
+		stmt = stmt.where(Sale.date <= end_date)
+	if created_after is not None:
+		stmt = stmt.where(Sale.created_at > created_after)
+
+	result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+
+	pid_chunks, date_chunks, sales_chunks = [], [], []
+	for rows in result.partitions():
+		pids, dates, sales = zip(*rows)
+		pid_chunks.append(np.fromiter(pids, dtype=np.int64, count=len(rows)))
+		date_chunks.append(np.array(dates, dtype="datetime64[D]"))
+		sales_chunks.append(np.fromiter(sales, dtype=np.float64, count=len(rows)))
+
+	if not pid_chunks:
+		return SalesHistory.from_arrays([], [], [])
+
+	return SalesHistory.from_arrays(
+		np.concatenate(pid_chunks),
+		np.concatenate(date_chunks),
+		np.concatenate(sales_chunks),
+	)
+
+
+SALES_COLUMNS = ["product_id", "date", "sales"]
+BulkFormat = Literal["csv", "ndjson", "parquet"]
+ConflictMode = Literal["error", "skip", "update"]
+
+SALES_STAGE_TABLE = "sales_stage"
+
+CREATE_SALES_STAGE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {SALES_STAGE_TABLE} (
+	seq bigserial,
+	product_id integer NOT NULL,
+	date date NOT NULL,
+	sales integer NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+CONFLICT_SQL = {
+	"skip": "ON CONFLICT (product_id, date) DO NOTHING",
+	# created_at ikut diperbarui supaya perubahan terbaca proses incremental
+	"update": "ON CONFLICT (product_id, date) DO UPDATE SET sales = EXCLUDED.sales, created_at = now()",
+}
+
+# baris dobel di satu chunk: yang terakhir di file menang (seq terbesar)
+MERGE_SALES_SQL = f"""
+WITH merged AS (
+	INSERT INTO sales (product_id, date, sales)
+	SELECT DISTINCT ON (product_id, date) product_id, date, sales
+	FROM {SALES_STAGE_TABLE}
+	ORDER BY product_id, date, seq DESC
+	{{conflict}}
+	RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+"""
+
+@dataclass
+class BulkLoadReport:
+	received: int = 0
+	inserted: int = 0
+	updated: int = 0
+	skipped: int = 0
+	rejected: Counter = field(default_factory=Counter)
+	seconds: float = 0.0
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.received / self.seconds if self.seconds else 0.0
+
+	def as_dict(self) -> dict:
+		return {
+			"received": self.received,
+			"inserted": self.inserted,
+			"updated": self.updated,
+			"skipped": self.skipped,
+			"rejected": sum(self.rejected.values()),
+			"rejected_by_reason": dict(self.rejected),
+			"seconds": round(self.seconds, 3),
+			"rows_per_second": round(self.rows_per_second, 1),
+		}
+
+def read_sales_batches(
+	source: Union[str, BinaryIO],
+	fmt: BulkFormat = "csv",
+	chunk_size: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+	"""Baca file sales per batch DataFrame (kolom product_id, date, sales), tidak dimuat sekaligus"""
+	if fmt == "csv":
+		yield from pd.read_csv(source, usecols=SALES_COLUMNS, chunksize=chunk_size)
+	elif fmt == "ndjson":
+		for frame in pd.read_json(source, lines=True, chunksize=chunk_size):
+			yield frame
+	elif fmt == "parquet":
+		import pyarrow.parquet as pq
+
+		for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size, columns=SALES_COLUMNS):
+			yield batch.to_pandas()
+	else:
+		raise ValueError(f"Format tidak dikenal: {fmt}")
+
+def validate_sales_frame(frame: pd.DataFrame, known_product_ids: np.ndarray) -> Tuple[pd.DataFrame, Counter]:
+	"""
+	Validasi satu batch secara vectorized (tanpa model per baris).
+	return: (baris valid dengan tipe final, jumlah baris ditolak per alasan)
+	"""
+	missing = set(SALES_COLUMNS) - set(frame.columns)
+	if missing:
+		raise ValueError(f"Kolom wajib tidak ada: {sorted(missing)}")
+
+	product_id = pd.to_numeric(frame["product_id"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+	dates = pd.to_datetime(frame["date"], errors="coerce", format="ISO8601")
+	sales = pd.to_numeric(frame["sales"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+	# urutan penting: tiap baris dihitung di alasan pertama yang gagal
+	checks = [
+		("invalid_product_id", np.isnan(product_id) | (product_id % 1 != 0)),
+		("unknown_product", ~np.isin(product_id, known_product_ids)),
+		("invalid_date", dates.isna().to_numpy()),
+		("invalid_sales", ~np.isfinite(sales) | (sales < 0)),
+	]
+	rejected = Counter()
+	bad = np.zeros(len(frame), dtype=bool)
+	for reason, mask in checks:
+		count = int((mask & ~bad).sum())
+		if count:
+			rejected[reason] = count
+		bad |= mask
+
+	good = ~bad
+	valid = pd.DataFrame({
+		"product_id": product_id[good].astype(np.int64),
+		# datetime64[D]: to_csv menulisnya sebagai YYYY-MM-DD, tanpa strftime per baris
+		"date": dates[good].to_numpy().astype("datetime64[D]"),
+		"sales": np.rint(sales[good]).astype(np.int64),
+	})
+	return valid, rejected
+
+def _copy_frame(cursor, table: str, frame: pd.DataFrame) -> None:
+	buf = io.StringIO()
+	frame.to_csv(buf, header=False, index=False)
+	buf.seek(0)
+	cursor.copy_expert(f"COPY {table} (product_id, date, sales) FROM STDIN WITH (FORMAT csv)", buf)
+
+def copy_sales(
+	db: Session,
+	batches: Iterable[pd.DataFrame],
+	on_conflict: ConflictMode = "update",
+	on_commit: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> BulkLoadReport:
+	"""
+	Validasi tiap batch lalu COPY ke Postgres, commit per batch.
+	on_conflict: error = COPY langsung ke sales (paling cepat, gagal kalau ada
+	(product_id, date) yang sudah ada), skip = baris lama dipertahankan,
+	update = sales ditimpa. Batch yang sudah ter-commit tetap tersimpan
+	walaupun batch berikutnya gagal.
+	on_commit: dipanggil dengan baris valid tiap batch setelah ter-commit
+	"""
+	if on_conflict not in ("error", *CONFLICT_SQL):
+		raise ValueError(f"on_conflict tidak dikenal: {on_conflict}")
+
+	known_product_ids = np.fromiter((pid for (pid,) in db.query(Product.id)), dtype=np.int64)
+	report = BulkLoadReport()
+	start = time.perf_counter()
+
+	for frame in batches:
+		report.received += len(frame)
+		valid, rejected = validate_sales_frame(frame, known_product_ids)
+		report.rejected.update(rejected)
+		if valid.empty:
+			continue
+
+		# koneksi bisa beda tiap transaksi (pool), temp table dibuat per koneksi
+		cursor = db.connection().connection.cursor()
+		try:
+			if on_conflict == "error":
+				_copy_frame(cursor, "sales", valid)
+				inserted, updated = len(valid), 0
+			else:
+				cursor.execute(CREATE_SALES_STAGE_SQL)
+				_copy_frame(cursor, SALES_STAGE_TABLE, valid)
+				cursor.execute(MERGE_SALES_SQL.format(conflict=CONFLICT_SQL[on_conflict]))
+				inserted, updated = cursor.fetchone()
+		except Exception:
+			db.rollback()
+			raise
+		finally:
+			cursor.close()
+		db.commit()
+
+		report.inserted += inserted
+		report.updated += updated
+		report.skipped += len(valid) - inserted - updated
+		if on_commit is not None:
+			on_commit(valid)
+
+	report.seconds = time.perf_counter() - start
+	return report
+
+
+# Rollup sales: sales_product_week, sales_category_day, sales_category_week
+ROLLUP_NAME = "sales"
+ROLLUP_TOUCHED_TABLE = "rollup_touched"
+RollupGranularity = Literal["day", "week"]
+
+# (product_id, date) yang berubah sejak high-water mark, plus kategori produknya
+CREATE_TOUCHED_SQL = f"""
+CREATE TEMP TABLE {ROLLUP_TOUCHED_TABLE} ON COMMIT DROP AS
+SELECT s.product_id, s.date, coalesce(p.category, '') AS category, max(s.created_at) AS created_at
+FROM sales s
+JOIN products p ON p.id = s.product_id
+WHERE s.created_at > :since
+GROUP BY s.product_id, s.date, p.category
+"""
+
+# bucket yang tersentuh dihitung ulang penuh dari sumbernya (bukan ditambah delta),
+# jadi benar untuk sales yang di-update dan aman dijalankan ulang (overlap)
+PRODUCT_WEEK_SQL = f"""
+INSERT INTO sales_product_week (product_id, week_start, sales, row_count)
+SELECT s.product_id, w.week_start, sum(s.sales), count(*)
+FROM (
+	SELECT DISTINCT product_id, date_trunc('week', date)::date AS week_start
+	FROM {ROLLUP_TOUCHED_TABLE}
+) w
+JOIN sales s ON s.product_id = w.product_id AND s.date >= w.week_start AND s.date < w.week_start + 7
+GROUP BY s.product_id, w.week_start
+ON CONFLICT (product_id, week_start) DO UPDATE
+SET sales = EXCLUDED.sales, row_count = EXCLUDED.row_count, updated_at = now()
+"""
+
+CATEGORY_DAY_SQL = f"""
+INSERT INTO sales_category_day (category, date, sales, row_count)
+SELECT d.category, d.date, sum(s.sales), count(*)
+FROM (SELECT DISTINCT category, date FROM {ROLLUP_TOUCHED_TABLE}) d
+JOIN products p ON coalesce(p.category, '') = d.category
+JOIN sales s ON s.product_id = p.id AND s.date = d.date
+GROUP BY d.category, d.date
+ON CONFLICT (category, date) DO UPDATE
+SET sales = EXCLUDED.sales, row_count = EXCLUDED.row_count, updated_at = now()
+"""
+
+# minggu kategori dijumlah dari sales_category_day yang baru di-refresh, bukan dari sales
+CATEGORY_WEEK_SQL = f"""
+INSERT INTO sales_category_week (category, week_start, sales, row_count)
+SELECT w.category, w.week_start, sum(d.sales), sum(d.row_count)
+FROM (
+	SELECT DISTINCT category, date_trunc('week', date)::date AS week_start
+	FROM {ROLLUP_TOUCHED_TABLE}
+) w
+JOIN sales_category_day d ON d.category = w.category AND d.date >= w.week_start AND d.date < w.week_start + 7
+GROUP BY w.category, w.week_start
+ON CONFLICT (category, week_start) DO UPDATE
+SET sales = EXCLUDED.sales, row_count = EXCLUDED.row_count, updated_at = now()
+"""
+
+# rebuild penuh: refresh pertama, atau setelah produk pindah kategori / sales dihapus
+REBUILD_SQL = {
+	"product_weeks": """
+		INSERT INTO sales_product_week (product_id, week_start, sales, row_count)
+		SELECT product_id, date_trunc('week', date)::date, sum(sales), count(*)
+		FROM sales GROUP BY 1, 2
+	""",
+	"category_days": """
+		INSERT INTO sales_category_day (category, date, sales, row_count)
+		SELECT coalesce(p.category, ''), s.date, sum(s.sales), count(*)
+		FROM sales s JOIN products p ON p.id = s.product_id GROUP BY 1, 2
+	""",
+	"category_weeks": """
+		INSERT INTO sales_category_week (category, week_start, sales, row_count)
+		SELECT category, date_trunc('week', date)::date, sum(sales), sum(row_count)
+		FROM sales_category_day GROUP BY 1, 2
+	""",
+}
+
+@dataclass
+class RollupRefreshReport:
+	full: bool = False
+	since: Optional[datetime.datetime] = None
+	high_water: Optional[datetime.datetime] = None
+	touched: int = 0  # (product_id, date) yang berubah, incremental saja
+	product_weeks: int = 0
+	category_days: int = 0
+	category_weeks: int = 0
+	seconds: float = 0.0
+
+	def as_dict(self) -> dict:
+		return {
+			"mode": "full" if self.full else "incremental",
+			"since": self.since.isoformat() if self.since else None,
+			"high_water": self.high_water.isoformat() if self.high_water else None,
+			"touched": self.touched,
+			"product_weeks": self.product_weeks,
+			"category_days": self.category_days,
+			"category_weeks": self.category_weeks,
+			"seconds": round(self.seconds, 3),
+		}
+
+def refresh_sales_rollups(
+	db: Session,
+	full: bool = False,
+	overlap: datetime.timedelta = datetime.timedelta(minutes=10),
+) -> RollupRefreshReport:
+	"""
+	Update rollup dari baris sales dengan created_at > high-water mark - overlap.
+	created_at diisi saat transaksi mulai, jadi transaksi lama yang commit
+	belakangan bisa punya created_at di bawah high-water mark; overlap menangkap
+	baris itu (bucket dihitung ulang, jadi diproses dua kali pun hasilnya sama).
+	Sales yang dihapus / produk pindah kategori hanya ikut lewat full=True.
+	Satu refresh dalam satu waktu (advisory lock), commit sekali di akhir.
+	"""
+	start = time.perf_counter()
+	params = {"name": ROLLUP_NAME}
+	db.execute(text("SELECT pg_advisory_xact_lock(hashtext('rollup:' || :name))"), params)
+	db.execute(text("INSERT INTO rollup_watermark (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"), params)
+	high_water = db.execute(rollup_high_water_select()).scalar()
+
+	report = RollupRefreshReport(full=full or high_water is None)
+	try:
+		if report.full:
+			# dibaca sebelum rebuild: baris yang masuk selama rebuild diproses ulang refresh berikutnya
+			report.high_water = db.execute(text("SELECT max(created_at) FROM sales")).scalar()
+			db.execute(text("DELETE FROM sales_category_week"))
+			db.execute(text("DELETE FROM sales_category_day"))
+			db.execute(text("DELETE FROM sales_product_week"))
+			for field_name, sql in REBUILD_SQL.items():
+				setattr(report, field_name, db.execute(text(sql)).rowcount)
+		else:
+			report.since = high_water - overlap
+			db.execute(text(CREATE_TOUCHED_SQL), {"since": report.since})
+			report.touched, report.high_water = db.execute(
+				text(f"SELECT count(*), max(created_at) FROM {ROLLUP_TOUCHED_TABLE}")
+			).one()
+			if report.touched:
+				report.product_weeks = db.execute(text(PRODUCT_WEEK_SQL)).rowcount
+				report.category_days = db.execute(text(CATEGORY_DAY_SQL)).rowcount
+				report.category_weeks = db.execute(text(CATEGORY_WEEK_SQL)).rowcount
+
+		if report.high_water is not None:
+			# greatest: refresh yang membaca snapshot lebih lama tidak memundurkan watermark
+			db.execute(
+				text(
+					"UPDATE rollup_watermark SET high_water = greatest(high_water, :high_water), "
+					"updated_at = now() WHERE name = :name"
+				),
+				{**params, "high_water": report.high_water},
+			)
+		db.commit()
+	except Exception:
+		db.rollback()
+		raise
+
+	report.seconds = time.perf_counter() - start
+	return report
+
+def week_start(date: datetime.date) -> datetime.date:
+	"""Senin awal minggu, sama dengan date_trunc('week') Postgres"""
+	return date - datetime.timedelta(days=date.weekday())
+
+def category_rollup_select(
+	granularity: RollupGranularity = "day",
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	"""
+	Query rollup kategori urut (category, periode). Granularity week: minggu
+	yang memuat start_date ikut (periode = senin awal minggu).
+	"""
+	if granularity == "day":
+		table, period = SalesCategoryDay, SalesCategoryDay.date
+	else:
+		table, period = SalesCategoryWeek, SalesCategoryWeek.week_start
+		start_date = week_start(start_date) if start_date is not None else None
+
+	stmt = select(table.category, period, table.sales, table.row_count).order_by(table.category, period)
+	if category is not None:
+		stmt = stmt.where(table.category == category)
+	if start_date is not None:
+		stmt = stmt.where(period >= start_date)
+	if end_date is not None:
+		stmt = stmt.where(period <= end_date)
+	return stmt
+
+def product_week_select(
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+):
+	stmt = (
+		select(SalesProductWeek.product_id, SalesProductWeek.week_start, SalesProductWeek.sales, SalesProductWeek.row_count)
+		.where(SalesProductWeek.product_id.in_(list(product_ids)))
+		.order_by(SalesProductWeek.product_id, SalesProductWeek.week_start)
+	)
+	if start_date is not None:
+		stmt = stmt.where(SalesProductWeek.week_start >= week_start(start_date))
+	if end_date is not None:
+		stmt = stmt.where(SalesProductWeek.week_start <= end_date)
+	return stmt
+
+def rollup_high_water_select():
+	return select(RollupWatermark.high_water).where(RollupWatermark.name == ROLLUP_NAME)
\ No newline at end of file
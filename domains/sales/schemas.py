@@ -0,0 +1,24 @@
+import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+class RollupPoint(BaseModel):
+	# tanggal (granularity day) atau senin awal minggu (week)
+	period: datetime.date
+	sales: int
+	row_count: int
+
+class CategorySeries(BaseModel):
+	category: str
+	items: List[RollupPoint]
+
+class ProductSeries(BaseModel):
+	product_id: int
+	items: List[RollupPoint]
+
+class RollupResult(BaseModel):
+	granularity: Literal["day", "week"]
+	# rollup mencakup sales dengan created_at sampai titik ini (None: belum pernah di-refresh)
+	as_of: Optional[datetime.datetime] = None
+	series: List[CategorySeries] | List[ProductSeries]
@@ -0,0 +1,141 @@
+import datetime
+from itertools import groupby
+from typing import AsyncIterator, BinaryIO, Iterable, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+
+from db.async_session import AsyncSessionLocal
+from db.models.sales import Sale
+from db.session import SessionLocal
+from events.publisher import publish_sales_recorded
+from domains.sales.repository import (
+	BulkFormat,
+	BulkLoadReport,
+	ConflictMode,
+	RollupGranularity,
+	RollupRefreshReport,
+	category_rollup_select,
+	copy_sales,
+	product_week_select,
+	read_sales_batches,
+	refresh_sales_rollups,
+	rollup_high_water_select,
+	sales_select,
+)
+from domains.sales.schemas import CategorySeries, ProductSeries, RollupPoint, RollupResult
+from utils.export import ExportFormat, stream_export
+from utils.pagination import CountMode, CursorPage, paginate
+
+# urutan keyset listing, sama dengan index uq_sales_product_id_date (+ id)
+SALES_KEYS = (Sale.product_id, Sale.date, Sale.id)
+
+async def list_sales(
+	db: AsyncSession,
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	cursor: Optional[str] = None,
+	limit: int = 100,
+	count: CountMode = "none",
+) -> CursorPage:
+	stmt = sales_select(product_id, category, start_date, end_date)
+	return await paginate(db, stmt, SALES_KEYS, cursor, limit, count)
+
+def _arrow_schema():
+	import pyarrow as pa
+
+	return pa.schema([
+		("id", pa.int32()),
+		("product_id", pa.int32()),
+		("date", pa.date32()),
+		("sales", pa.int32()),
+	])
+
+def export_sales(
+	fmt: ExportFormat = "ndjson",
+	product_id: Optional[int] = None,
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	chunk_size: int = 10_000,
+) -> AsyncIterator[bytes]:
+	"""Stream semua baris sales yang cocok filter, urut (product_id, date)"""
+	stmt = sales_select(product_id, category, start_date, end_date).order_by(*SALES_KEYS)
+	schema = _arrow_schema() if fmt == "arrow" else None
+	return stream_export(AsyncSessionLocal, stmt, fmt, schema, chunk_size)
+
+def bulk_load_sales(
+	source: Union[str, BinaryIO],
+	fmt: BulkFormat = "csv",
+	on_conflict: ConflictMode = "update",
+	chunk_size: int = 100_000,
+) -> BulkLoadReport:
+	"""
+	Load file sales (path / file object) lewat COPY, dipakai endpoint bulk dan CLI.
+	Tiap batch yang ter-commit mengirim SalesRecorded untuk produk di batch itu.
+	"""
+	def on_commit(valid):
+		publish_sales_recorded(
+			valid["product_id"].unique(),
+			rows=len(valid),
+			start_date=valid["date"].min().date(),
+			end_date=valid["date"].max().date(),
+		)
+
+	db = SessionLocal()
+	try:
+		return copy_sales(db, read_sales_batches(source, fmt, chunk_size), on_conflict, on_commit)
+	finally:
+		db.close()
+
+
+def refresh_rollups(full: bool = False) -> RollupRefreshReport:
+	"""Refresh rollup sales (blocking), dipakai handler SalesRecorded dan CLI"""
+	db = SessionLocal()
+	try:
+		return refresh_sales_rollups(
+			db, full=full, overlap=datetime.timedelta(seconds=settings.ROLLUP_OVERLAP_SECONDS),
+		)
+	finally:
+		db.close()
+
+def _series(rows):
+	"""Baris (key, periode, sales, row_count) urut key -> list series per key"""
+	return [
+		(value, [RollupPoint(period=period, sales=sales, row_count=row_count) for _, period, sales, row_count in group])
+		for value, group in groupby(rows, key=lambda row: row[0])
+	]
+
+async def category_sales(
+	db: AsyncSession,
+	granularity: RollupGranularity = "day",
+	category: Optional[str] = None,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> RollupResult:
+	"""Total sales per kategori per hari/minggu dari rollup, tanpa scan tabel sales"""
+	rows = await db.execute(category_rollup_select(granularity, category, start_date, end_date))
+	as_of = (await db.execute(rollup_high_water_select())).scalar()
+	return RollupResult(
+		granularity=granularity,
+		as_of=as_of,
+		series=[CategorySeries(category=c, items=items) for c, items in _series(rows)],
+	)
+
+async def product_weekly_sales(
+	db: AsyncSession,
+	product_ids: Iterable[int],
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> RollupResult:
+	"""Total sales mingguan beberapa produk dari sales_product_week"""
+	rows = await db.execute(product_week_select(product_ids, start_date, end_date))
+	as_of = (await db.execute(rollup_high_water_select())).scalar()
+	return RollupResult(
+		granularity="week",
+		as_of=as_of,
+		series=[ProductSeries(product_id=pid, items=items) for pid, items in _series(rows)],
+	)
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, ClassVar, Dict, Optional, Tuple, Type
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EVENT_TYPES: Dict[str, Type["Event"]] = {}
+
+@dataclass(frozen=True)
+class Event:
+	"""Base event, subclass otomatis terdaftar (by nama class) untuk deserialisasi"""
+	name: ClassVar[str] = "Event"
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+		cls.name = cls.__name__
+		EVENT_TYPES[cls.name] = cls
+
+	def to_payload(self) -> str:
+		data = {
+			key: value.isoformat() if isinstance(value, datetime.date) else value
+			for key, value in asdict(self).items()
+		}
+		return json.dumps({"type": self.name, "data": data})
+
+	@classmethod
+	def from_dict(cls, data: dict) -> "Event":
+		return cls(**data)
+
+	@staticmethod
+	def from_payload(payload: str) -> "Event":
+		message = json.loads(payload)
+		return EVENT_TYPES[message["type"]].from_dict(message["data"])
+
+@dataclass(frozen=True)
+class SalesRecorded(Event):
+	"""Baris sales baru / berubah sudah ter-commit untuk produk-produk ini"""
+	product_ids: Tuple[int, ...]
+	rows: int = 0
+	start_date: Optional[datetime.date] = None
+	end_date: Optional[datetime.date] = None
+
+	@classmethod
+	def from_dict(cls, data: dict) -> "SalesRecorded":
+		return cls(
+			product_ids=tuple(data["product_ids"]),
+			rows=data.get("rows", 0),
+			start_date=datetime.date.fromisoformat(data["start_date"]) if data.get("start_date") else None,
+			end_date=datetime.date.fromisoformat(data["end_date"]) if data.get("end_date") else None,
+		)
+
+class EventBackend(ABC):
+	"""
+	Transport event. publish() sinkron dan thread-safe (dipanggil dari
+	threadpool / script), listen() async iterator di event loop consumer.
+	"""
+
+	@abstractmethod
+	def publish(self, event: Event) -> None:
+		...
+
+	@abstractmethod
+	def listen(self) -> AsyncIterator[Event]:
+		...
+
+class InProcessBackend(EventBackend):
+	"""
+	asyncio.Queue di proses yang sama (default). Event dari proses lain
+	(mis. CLI load_sales) tidak sampai, pakai backend postgres untuk itu.
+	"""
+
+	def __init__(self):
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._queue: Optional[asyncio.Queue] = None
+
+	def publish(self, event: Event) -> None:
+		if self._loop is None or self._loop.is_closed():
+			logger.info(f"Event {event.name} diabaikan, tidak ada consumer in-process")
+			return
+		self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+	async def listen(self) -> AsyncIterator[Event]:
+		self._loop = asyncio.get_running_loop()
+		self._queue = asyncio.Queue()
+		try:
+			while True:
+				yield await self._queue.get()
+		finally:
+			self._loop = None
+
+class PostgresBackend(EventBackend):
+	"""
+	LISTEN/NOTIFY: publish lewat engine sync (psycopg2), listen lewat koneksi
+	asyncpg khusus. Payload NOTIFY maksimal ~8000 byte, event dipecah oleh publisher.
+	"""
+
+	def __init__(self, channel: str, retry_seconds: float = 5.0):
+		from db.session import engine
+
+		self.channel = channel
+		self.retry_seconds = retry_seconds
+		self._engine = engine
+		self._dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+	def publish(self, event: Event) -> None:
+		from sqlalchemy import text
+
+		with self._engine.begin() as conn:
+			conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": event.to_payload()})
+
+	async def listen(self) -> AsyncIterator[Event]:
+		import asyncpg
+
+		queue: asyncio.Queue = asyncio.Queue()
+		while True:
+			try:
+				conn = await asyncpg.connect(self._dsn)
+			except (OSError, asyncpg.PostgresError) as e:
+				logger.warning(f"Event listener gagal connect: {e}")
+				await asyncio.sleep(self.retry_seconds)
+				continue
+
+			await conn.add_listener(self.channel, lambda *args: queue.put_nowait(args[-1]))
+			logger.info(f"Listening event channel {self.channel}")
+			try:
+				while not conn.is_closed():
+					try:
+						payload = await asyncio.wait_for(queue.get(), timeout=self.retry_seconds)
+					except asyncio.TimeoutError:
+						continue
+					yield Event.from_payload(payload)
+			finally:
+				await conn.close()
@@ -0,0 +1,84 @@
+"""
+Consumer event: baca dari backend (events.publisher.backend) dan panggil
+handler yang terdaftar per tipe event. Jalan di lifespan FastAPI (default,
+refresh forecast di proses worker), atau sebagai proses terpisah dengan
+EVENT_BACKEND=postgres:
+	python events/consumer.py
+"""
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Type
+
+from events.base import Event, EventBackend, InProcessBackend
+from events.publisher import backend
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Handler = Callable[[Event], Awaitable[None]]
+
+class EventConsumer:
+	def __init__(self, backend: EventBackend):
+		self.backend = backend
+		self.handlers: Dict[Type[Event], List[Handler]] = defaultdict(list)
+		self._task: Optional[asyncio.Task] = None
+
+	def subscribe(self, event_type: Type[Event], handler: Handler) -> None:
+		self.handlers[event_type].append(handler)
+
+	async def dispatch(self, event: Event) -> None:
+		for handler in self.handlers.get(type(event), []):
+			try:
+				await handler(event)
+			except Exception:
+				# satu handler gagal tidak boleh mematikan consumer
+				logger.exception(f"Handler {handler} gagal untuk {event.name}")
+
+	async def run(self) -> None:
+		async for event in self.backend.listen():
+			await self.dispatch(event)
+
+	def start(self) -> None:
+		if self._task is None:
+			self._task = asyncio.create_task(self.run())
+
+	async def stop(self) -> None:
+		if self._task is not None:
+			self._task.cancel()
+			try:
+				await self._task
+			except asyncio.CancelledError:
+				pass
+			self._task = None
+
+consumer = EventConsumer(backend)
+
+async def start_consumer(in_process: bool = False) -> None:
+	"""
+	Daftarkan handler lalu mulai consumer + task background handler.
+	in_process: dipanggil dari lifespan API (handler berat dilewati, lihat forecast.register)
+	"""
+	from events.handlers import forecast, sales
+
+	forecast.register(consumer, in_process=in_process)
+	sales.register(consumer)
+	consumer.start()
+
+async def stop_consumer() -> None:
+	from events.handlers import forecast, sales
+
+	await consumer.stop()
+	await forecast.shutdown()
+	await sales.shutdown()
+
+async def main() -> None:
+	if isinstance(backend, InProcessBackend):
+		raise SystemExit("EVENT_BACKEND=memory: consumer terpisah tidak menerima event dari API, pakai EVENT_BACKEND=postgres")
+	await start_consumer()
+	try:
+		await asyncio.Event().wait()
+	finally:
+		await stop_consumer()
+
+if __name__ == "__main__":
+	asyncio.run(main())
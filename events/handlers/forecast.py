@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import settings
+from db.session import SessionLocal
+from events.base import SalesRecorded
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def refresh_forecasts(product_ids: List[int]) -> None:
+	"""Re-predict incremental untuk sebagian produk (blocking, dijalankan di thread/proses worker)"""
+	# pipeline + TensorFlow baru di-import saat ada refresh pertama
+	from scripts.lstm_forecast import run_forecast
+
+	db = SessionLocal()
+	try:
+		run_forecast(db, incremental=True, product_ids=product_ids)
+	finally:
+		db.close()
+
+def worker_pool() -> ProcessPoolExecutor:
+	"""Satu proses worker (spawn) untuk refresh, TensorFlow hanya di-import di sana"""
+	return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+class ForecastRefresher:
+	"""
+	Gabungkan SalesRecorded per produk lalu refresh forecast per micro-batch.
+	Produk siap di-refresh kalau tidak ada event baru selama `debounce` detik,
+	atau sudah menunggu `max_wait` detik sejak event pertama (feed yang terus
+	mengalir tetap di-refresh). Satu batch jalan dalam satu waktu, di luar event
+	loop: di `executor` kalau ada, selain itu di thread default.
+	"""
+
+	def __init__(
+		self,
+		debounce: float = settings.FORECAST_REFRESH_DEBOUNCE,
+		max_wait: float = settings.FORECAST_REFRESH_MAX_WAIT,
+		batch_size: int = settings.FORECAST_REFRESH_BATCH,
+		refresh: Callable[[List[int]], None] = refresh_forecasts,
+		clock: Callable[[], float] = time.monotonic,
+		executor: Optional[Executor] = None,
+	):
+		self.debounce = debounce
+		self.max_wait = max_wait
+		self.batch_size = batch_size
+		self._refresh = refresh
+		self._clock = clock
+		self.executor = executor
+		# product_id -> (event pertama, event terakhir) sejak refresh terakhir
+		self.pending: Dict[int, Tuple[float, float]] = {}
+		self._wake = asyncio.Event()
+		self._task: Optional[asyncio.Task] = None
+
+	def add(self, product_ids: Iterable[int]) -> None:
+		now = self._clock()
+		for product_id in product_ids:
+			first_seen, _ = self.pending.get(product_id, (now, now))
+			self.pending[product_id] = (first_seen, now)
+		self._wake.set()
+
+	async def handle(self, event: SalesRecorded) -> None:
+		self.add(event.product_ids)
+
+	def _due(self, product_id: int) -> float:
+		first_seen, last_seen = self.pending[product_id]
+		return min(last_seen + self.debounce, first_seen + self.max_wait)
+
+	def ready(self) -> List[int]:
+		"""Produk yang sudah lewat debounce/max_wait, yang paling lama menunggu duluan"""
+		now = self._clock()
+		ready = [pid for pid in self.pending if self._due(pid) <= now]
+		ready.sort(key=lambda pid: self.pending[pid][0])
+		return ready[:self.batch_size]
+
+	async def run(self) -> None:
+		while True:
+			if not self.pending:
+				self._wake.clear()
+				await self._wake.wait()
+				continue
+
+			batch = self.ready()
+			if not batch:
+				next_due = min(self._due(pid) for pid in self.pending)
+				self._wake.clear()
+				try:
+					await asyncio.wait_for(self._wake.wait(), timeout=max(next_due - self._clock(), 0.01))
+				except asyncio.TimeoutError:
+					pass
+				continue
+
+			# event yang datang selama refresh masuk pending lagi untuk batch berikutnya
+			for product_id in batch:
+				del self.pending[product_id]
+			start = time.perf_counter()
+			try:
+				await asyncio.get_running_loop().run_in_executor(self.executor, self._refresh, batch)
+				logger.info(f"Refresh forecast {len(batch)} produk dalam {time.perf_counter() - start:.1f}s")
+			except BrokenProcessPool:
+				# worker mati (mis. OOM): batch ini gagal, batch berikutnya pakai worker baru
+				logger.exception(f"Worker refresh forecast mati saat produk {batch}, dibuat ulang")
+				self.executor = worker_pool()
+			except Exception:
+				logger.exception(f"Refresh forecast gagal untuk produk {batch}")
+
+	def start(self) -> None:
+		if self._task is None:
+			self._task = asyncio.create_task(self.run())
+
+	async def stop(self) -> None:
+		if self._task is not None:
+			self._task.cancel()
+			try:
+				await self._task
+			except asyncio.CancelledError:
+				pass
+			self._task = None
+		if self.executor is not None:
+			self.executor.shutdown(wait=False, cancel_futures=True)
+			self.executor = None
+
+forecast_refresher = ForecastRefresher()
+
+def register(consumer, in_process: bool = False) -> None:
+	"""
+	in_process: consumer jalan di dalam proses API. Debounce/batching tetap di
+	event loop API, training jalan di satu proses worker (spawn) supaya
+	TensorFlow tidak masuk ke proses API. FORECAST_REFRESH_IN_PROCESS=false
+	menyerahkan refresh ke consumer terpisah, yang hanya bisa menerima event
+	lewat EVENT_BACKEND=postgres.
+	"""
+	if not settings.FORECAST_REFRESH_ENABLED or forecast_refresher.handle in consumer.handlers[SalesRecorded]:
+		return
+	if in_process and not settings.FORECAST_REFRESH_IN_PROCESS:
+		if settings.EVENT_BACKEND == "memory":
+			raise RuntimeError(
+				"SalesRecorded tidak akan me-refresh forecast: FORECAST_REFRESH_IN_PROCESS=false "
+				"dengan EVENT_BACKEND=memory (consumer terpisah tidak menerima event in-memory). "
+				"Set FORECAST_REFRESH_IN_PROCESS=true, EVENT_BACKEND=postgres + make consumer, "
+				"atau FORECAST_REFRESH_ENABLED=false"
+			)
+		logger.info("Refresh forecast jalan di consumer terpisah (make consumer)")
+		return
+	if in_process and forecast_refresher.executor is None:
+		forecast_refresher.executor = worker_pool()
+	consumer.subscribe(SalesRecorded, forecast_refresher.handle)
+	forecast_refresher.start()
+
+async def shutdown() -> None:
+	await forecast_refresher.stop()
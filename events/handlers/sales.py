@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from core.config import settings
+from events.base import SalesRecorded
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def refresh_rollups() -> None:
+	from domains.sales.services import refresh_rollups as refresh
+
+	report = refresh()
+	logger.info(f"Refresh rollup sales: {report.as_dict()}")
+
+class RollupRefresher:
+	"""
+	Refresh rollup sales setelah SalesRecorded, paling sering tiap `interval`
+	detik. Event selama refresh jalan cukup menandai dirty: semua perubahan
+	ikut terbaca lewat high-water mark di refresh berikutnya.
+	"""
+
+	def __init__(
+		self,
+		interval: float = settings.ROLLUP_REFRESH_INTERVAL,
+		refresh: Callable[[], None] = refresh_rollups,
+		clock: Callable[[], float] = time.monotonic,
+	):
+		self.interval = interval
+		self._refresh = refresh
+		self._clock = clock
+		self._dirty = asyncio.Event()
+		self._last_run: Optional[float] = None
+		self._task: Optional[asyncio.Task] = None
+
+	async def handle(self, event: SalesRecorded) -> None:
+		self._dirty.set()
+
+	async def run(self) -> None:
+		while True:
+			await self._dirty.wait()
+			if self._last_run is not None:
+				await asyncio.sleep(max(self._last_run + self.interval - self._clock(), 0))
+			self._dirty.clear()
+			self._last_run = self._clock()
+			try:
+				await asyncio.to_thread(self._refresh)
+			except Exception:
+				logger.exception("Refresh rollup sales gagal")
+				# coba lagi di interval berikutnya
+				self._dirty.set()
+
+	def start(self) -> None:
+		if self._task is None:
+			self._task = asyncio.create_task(self.run())
+
+	async def stop(self) -> None:
+		if self._task is not None:
+			self._task.cancel()
+			try:
+				await self._task
+			except asyncio.CancelledError:
+				pass
+			self._task = None
+
+rollup_refresher = RollupRefresher()
+
+def register(consumer) -> None:
+	if not settings.ROLLUP_REFRESH_ENABLED or rollup_refresher.handle in consumer.handlers[SalesRecorded]:
+		return
+	consumer.subscribe(SalesRecorded, rollup_refresher.handle)
+	rollup_refresher.start()
+
+async def shutdown() -> None:
+	await rollup_refresher.stop()
@@ -0,0 +1,35 @@
+import datetime
+from typing import Iterable, Optional
+
+from core.config import settings
+from events.base import Event, EventBackend, InProcessBackend, PostgresBackend, SalesRecorded
+
+# batas product_id per SalesRecorded, supaya payload NOTIFY tetap di bawah 8000 byte
+MAX_EVENT_PRODUCTS = 500
+
+def create_backend(name: str = settings.EVENT_BACKEND) -> EventBackend:
+	if name == "memory":
+		return InProcessBackend()
+	if name == "postgres":
+		return PostgresBackend(settings.EVENT_CHANNEL)
+	raise ValueError(f"EVENT_BACKEND tidak dikenal: {name}")
+
+backend = create_backend()
+
+def publish(event: Event) -> None:
+	backend.publish(event)
+
+def publish_sales_recorded(
+	product_ids: Iterable[int],
+	rows: int = 0,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+) -> None:
+	product_ids = sorted(set(int(pid) for pid in product_ids))
+	for start in range(0, len(product_ids), MAX_EVENT_PRODUCTS):
+		publish(SalesRecorded(
+			product_ids=tuple(product_ids[start:start + MAX_EVENT_PRODUCTS]),
+			rows=rows,
+			start_date=start_date,
+			end_date=end_date,
+		))
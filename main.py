@@ -1,6 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-app = FastAPI(title="Stock Forecast App")
+from api.routes import forecast, metrics, sales
+from domains.forecast.services import cache_listener
+from events.consumer import start_consumer, stop_consumer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	cache_listener.start()
+	await start_consumer(in_process=True)
+	yield
+	await stop_consumer()
+	cache_listener.stop()
+
+app = FastAPI(title="Stock Forecast App", lifespan=lifespan)
+
+app.include_router(forecast.router)
+app.include_router(sales.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
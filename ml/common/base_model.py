@@ -0,0 +1,189 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+
+class BaseModelRegistry:
+    """
+    Registry model di disk, satu folder per versi:
+
+        <root>/<name>/v<version>/
+            metadata.json    versi, waktu simpan, shape weight, metadata bebas
+            config.json      arsitektur (format tergantung subclass)
+            weight_<i>.npy   satu file per tensor weight
+            extras.joblib    objek pendamping, mis. scaler
+
+    Subclass cukup mengubah model <-> (config, weights).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _model_dir(self, name: str) -> Path:
+        return self.root / name
+
+    def versions(self, name: str) -> List[int]:
+        model_dir = self._model_dir(name)
+        if not model_dir.is_dir():
+            return []
+        return sorted(
+            int(p.name[1:]) for p in model_dir.iterdir()
+            if p.is_dir() and p.name.startswith("v") and p.name[1:].isdigit()
+        )
+
+    def latest_version(self, name: str) -> Optional[int]:
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def exists(self, name: str) -> bool:
+        return self.latest_version(name) is not None
+
+    def save_artifact(self, name: str, config: str, weights: List[np.ndarray],
+                      extras: Any = None, metadata: Optional[Dict] = None) -> int:
+        """Simpan satu versi baru, return nomor versinya"""
+        model_dir = self._model_dir(name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        # tulis ke folder sementara lalu rename, jadi reader tidak pernah
+        # lihat versi setengah jadi
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=model_dir))
+        try:
+            for i, weight in enumerate(weights):
+                np.save(tmp_dir / f"weight_{i}.npy", np.ascontiguousarray(weight))
+            (tmp_dir / "config.json").write_text(config, encoding="utf-8")
+            if extras is not None:
+                joblib.dump(extras, tmp_dir / "extras.joblib")
+
+            with self._lock:
+                version = (self.latest_version(name) or 0) + 1
+                meta = {
+                    "name": name,
+                    "version": version,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "weights": [list(w.shape) for w in weights],
+                    "nbytes": int(sum(w.nbytes for w in weights)),
+                    **(metadata or {}),
+                }
+                (tmp_dir / "metadata.json").write_text(json.dumps(meta, default=str), encoding="utf-8")
+                os.replace(tmp_dir, model_dir / f"v{version}")
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        return version
+
+    def metadata(self, name: str, version: Optional[int] = None) -> Optional[Dict]:
+        version = version or self.latest_version(name)
+        if version is None:
+            return None
+        path = self._model_dir(name) / f"v{version}" / "metadata.json"
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def load_artifact(self, name: str, version: Optional[int] = None, mmap: bool = True
+                      ) -> Optional[Tuple[str, List[np.ndarray], Any, Dict]]:
+        """
+        Return (config, weights, extras, metadata), None kalau belum ada.
+        Dengan mmap=True weight dibuka read-only memory-mapped, jadi saat
+        disalin ke tujuan akhir (mis. variable TF) tidak ada copy antara di heap.
+        Setelah disalin, halaman file tidak perlu tetap di memori.
+        """
+        meta = self.metadata(name, version)
+        if meta is None:
+            return None
+        version_dir = self._model_dir(name) / f"v{meta['version']}"
+
+        weights = [
+            np.load(version_dir / f"weight_{i}.npy", mmap_mode="r" if mmap else None)
+            for i in range(len(meta["weights"]))
+        ]
+        config = (version_dir / "config.json").read_text(encoding="utf-8")
+        extras_path = version_dir / "extras.joblib"
+        extras = joblib.load(extras_path) if extras_path.is_file() else None
+
+        return config, weights, extras, meta
+
+    def prune(self, name: str, keep: int = 3) -> None:
+        """Hapus versi lama, sisakan `keep` versi terbaru"""
+        for version in self.versions(name)[:-keep]:
+            shutil.rmtree(self._model_dir(name) / f"v{version}", ignore_errors=True)
+
+
+class LRUModelCache:
+    """
+    Cache model di memori dengan budget byte. Model yang paling lama tidak
+    dipakai dibuang duluan saat total ukuran melewati `max_bytes`.
+    loader(key) -> (value, nbytes), atau None kalau model tidak ada.
+    """
+
+    def __init__(self, loader: Callable[[Hashable], Optional[Tuple[Any, int]]], max_bytes: int):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+
+        # load di luar lock supaya request lain tidak ikut nunggu
+        loaded = self.loader(key)
+        if loaded is None:
+            return None
+        value, nbytes = loaded
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = (value, nbytes)
+                self._bytes += nbytes
+                self._evict()
+            return value
+
+    def _evict(self) -> None:
+        # item terbaru tetap disimpan walau sendirian melebihi budget
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, nbytes) = self._items.popitem(last=False)
+            self._bytes -= nbytes
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Buang semua key yang cocok, mis. semua versi lama satu model"""
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                self._bytes -= self._items.pop(key)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
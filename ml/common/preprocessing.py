@@ -0,0 +1,104 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SeriesMinMaxScaler:
+    """
+    MinMax scaling per series (per produk), versi vektor dari
+    sklearn MinMaxScaler. Dipakai model global supaya produk dengan volume
+    besar tidak mendominasi loss.
+    """
+
+    def fit(self, series_list):
+        self.min_ = np.array([np.min(s) for s in series_list], dtype=np.float64)
+        self.max_ = np.array([np.max(s) for s in series_list], dtype=np.float64)
+        # series konstan: samakan dengan sklearn (scale = 1)
+        data_range = self.max_ - self.min_
+        self.range_ = np.where(data_range == 0, 1.0, data_range)
+        return self
+
+    def transform(self, idx, values):
+        """Scale series milik index `idx`"""
+        return (np.asarray(values, dtype=np.float64) - self.min_[idx]) / self.range_[idx]
+
+    def inverse_transform(self, values, idx=None):
+        """
+        values: array (n, steps) hasil prediksi
+        idx: index series untuk tiap baris (default: semua series urut)
+        """
+        idx = np.arange(len(self.min_)) if idx is None else np.asarray(idx)
+        return np.asarray(values) * self.range_[idx, None] + self.min_[idx, None]
+
+
+def sliding_windows(series, timesteps: int = 30, stride: int = 1, dtype=np.float32):
+    """
+    Window (X, y) dari series 1-D tanpa copy: X[i] = series[i*stride : i*stride + timesteps],
+    y[i] = nilai setelahnya. X dan y adalah view ke series (copy hanya kalau
+    dtype series beda dengan `dtype`).
+    return: X (n, timesteps), y (n,)
+    """
+    series = np.asarray(series, dtype=dtype).reshape(-1)
+    if len(series) <= timesteps:
+        return np.empty((0, timesteps), dtype=dtype), np.empty(0, dtype=dtype)
+
+    X = sliding_window_view(series[:-1], timesteps)[::stride]
+    y = series[timesteps::stride]
+
+    return X, y
+
+
+def window_index(lengths, timesteps: int = 30, stride: int = 1):
+    """
+    Posisi awal semua window di array gabungan beberapa series, plus index
+    series pemilik tiap window. Dihitung vektor, tanpa loop per window.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    counts = np.maximum(0, (lengths - timesteps + stride - 1) // stride)
+
+    series_idx = np.repeat(np.arange(len(lengths)), counts)
+    # urutan window di dalam series-nya: 0, 1, 2, ...
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    k = np.arange(int(counts.sum())) - first
+    starts = offsets[series_idx] + k * stride
+
+    return starts, series_idx
+
+
+def window_dataset(series_list, timesteps: int = 30, batch_size: int = 256, stride: int = 1,
+                   static_inputs=None, shuffle: bool = True, seed=None, dtype=np.float32):
+    """
+    tf.data pipeline window training dari satu atau banyak series.
+    Yang disimpan cuma series gabungan + index awal window, window dibentuk
+    per batch dengan gather, jadi semua window tidak pernah dimaterialisasi
+    sekaligus.
+    static_inputs: list array per series (mis. index produk/kategori),
+        ikut jadi input tambahan tiap window
+    """
+    import tensorflow as tf
+
+    flat = np.concatenate(
+        [np.asarray(s, dtype=dtype).reshape(-1) for s in series_list]
+    ) if len(series_list) else np.empty(0, dtype=dtype)
+    starts, series_idx = window_index([len(s) for s in series_list], timesteps, stride)
+
+    flat = tf.constant(flat)
+    statics = [tf.constant(np.asarray(x)) for x in (static_inputs or [])]
+    positions = tf.range(timesteps, dtype=tf.int64)
+
+    def to_batch(start, sidx):
+        X = tf.gather(flat, start[:, None] + positions)[..., None]
+        y = tf.gather(flat, start + timesteps)
+        if statics:
+            return (X, *[tf.gather(s, sidx) for s in statics]), y
+        return X, y
+
+    ds = tf.data.Dataset.from_tensor_slices((starts, series_idx))
+    if shuffle:
+        ds = ds.shuffle(len(starts), seed=seed, reshuffle_each_iteration=True)
+
+    return (
+        ds.batch(batch_size)
+        .map(to_batch, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
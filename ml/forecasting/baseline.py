@@ -0,0 +1,158 @@
+"""
+Baseline statistik tervektorisasi: semua produk di-fit sekaligus dari matrix
+(n_products, n_days) kalender bersama (hierarchy.daily_matrix). Loop hanya
+di sumbu waktu (Holt-Winters), tiap langkah operasi array untuk semua produk
+dan semua kombinasi parameter grid.
+"""
+import itertools
+
+import numpy as np
+
+SEASONAL_NAIVE = "seasonal_naive"
+MOVING_AVERAGE = "moving_average"
+HOLT_WINTERS = "holt_winters"
+METHODS = (SEASONAL_NAIVE, MOVING_AVERAGE, HOLT_WINTERS)
+
+# grid parameter Holt-Winters (alpha, beta, gamma), dipilih per produk dari SSE in-sample
+HW_ALPHAS = (0.1, 0.3, 0.6)
+HW_BETAS = (0.0, 0.05)
+HW_GAMMAS = (0.05, 0.2)
+
+
+def available_days(matrix, first_idx):
+    return np.maximum(matrix.shape[1] - first_idx, 0)
+
+
+def moving_average(matrix, first_idx, steps, window=28):
+    """Rata-rata `window` hari terakhir (atau sejak sales pertama kalau lebih pendek)"""
+    n_days = matrix.shape[1]
+    window = min(window, n_days)
+    recent = matrix[:, n_days - window:]
+    count = np.minimum(available_days(matrix, first_idx), window)
+    mean = np.divide(recent.sum(axis=1), count, out=np.zeros(len(matrix)), where=count > 0)
+    return np.repeat(mean[:, np.newaxis], steps, axis=1)
+
+
+def seasonal_naive(matrix, first_idx, steps, season=7):
+    """Ulang `season` hari terakhir; produk dengan histori < season memakai moving average"""
+    n_days = matrix.shape[1]
+    if n_days < season:
+        return moving_average(matrix, first_idx, steps)
+    cols = n_days - season + np.arange(steps) % season
+    forecast = matrix[:, cols]
+    short = available_days(matrix, first_idx) < season
+    forecast[short] = moving_average(matrix[short], first_idx[short], steps)
+    return forecast
+
+
+def holt_winters(matrix, first_idx, steps, season=7, phi=0.98,
+                 alphas=HW_ALPHAS, betas=HW_BETAS, gammas=HW_GAMMAS):
+    """
+    Holt-Winters aditif dengan trend teredam (ETS(A,Ad,A)). Semua kombinasi
+    grid di-fit paralel sebagai sumbu tambahan (G, n_products), parameter
+    terbaik per produk dipilih dari SSE one-step in-sample. Produk dengan
+    histori < 2 * season memakai moving average.
+    """
+    n_products, n_days = matrix.shape
+    grid = np.array(list(itertools.product(alphas, betas, gammas)), dtype=np.float64)
+    alpha, beta, gamma = (grid[:, i, np.newaxis] for i in range(3))
+    n_grid = len(grid)
+
+    enough = available_days(matrix, first_idx) >= 2 * season
+    forecast = moving_average(matrix, first_idx, steps)
+    if not enough.any():
+        return forecast
+
+    # inisialisasi dari season pertama tiap produk: level = rata-rata, musiman = selisihnya
+    first = np.minimum(first_idx, n_days - season)
+    init_cols = first[:, np.newaxis] + np.arange(season)
+    init = np.take_along_axis(matrix, init_cols, axis=1)
+    level0 = init.mean(axis=1)
+    seasonal0 = np.zeros((n_products, season))
+    # fase musiman mengikuti kalender bersama (t % season), bukan hari ke-n produk
+    np.put_along_axis(seasonal0, init_cols % season, init - level0[:, np.newaxis], axis=1)
+
+    level = np.broadcast_to(level0, (n_grid, n_products)).copy()
+    trend = np.zeros((n_grid, n_products))
+    seasonal = np.broadcast_to(seasonal0, (n_grid, n_products, season)).copy()
+    sse = np.zeros((n_grid, n_products))
+
+    start = first_idx + season
+    for t in range(int(start[enough].min()), n_days):
+        active = enough & (t >= start)
+        if not active.any():
+            continue
+        phase = t % season
+        y = matrix[:, t]
+        s_prev = seasonal[:, :, phase]
+        predicted = level + phi * trend + s_prev
+        error = y - predicted
+
+        new_level = alpha * (y - s_prev) + (1 - alpha) * (level + phi * trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        new_seasonal = gamma * (y - new_level) + (1 - gamma) * s_prev
+
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        seasonal[:, :, phase] = np.where(active, new_seasonal, s_prev)
+        sse += np.where(active, error * error, 0.0)
+
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n_products)
+    level, trend, seasonal = level[best, cols], trend[best, cols], seasonal[best, cols]
+
+    damped = np.cumsum(phi ** np.arange(1, steps + 1))
+    phases = (n_days + np.arange(steps)) % season
+    hw = level[:, np.newaxis] + damped * trend[:, np.newaxis] + seasonal[:, phases]
+    forecast[enough] = hw[enough]
+    return np.clip(forecast, 0, None)
+
+
+FORECASTERS = {
+    SEASONAL_NAIVE: seasonal_naive,
+    MOVING_AVERAGE: moving_average,
+    HOLT_WINTERS: holt_winters,
+}
+
+
+def forecast_all(matrix, first_idx, steps, methods=METHODS):
+    """Forecast semua metode: {metode: (n_products, steps)}"""
+    return {method: FORECASTERS[method](matrix, first_idx, steps) for method in methods}
+
+
+def holdout_errors(matrix, first_idx, steps, methods=METHODS):
+    """
+    Backtest holdout: fit tanpa `steps` hari terakhir, MAE terhadap hari-hari itu.
+    return {metode: MAE (n_products,)}, NaN untuk produk tanpa histori cukup
+    """
+    n_days = matrix.shape[1]
+    train, actual = matrix[:, :n_days - steps], matrix[:, n_days - steps:]
+    train_first = np.minimum(first_idx, n_days - steps)
+    valid = available_days(train, train_first) > 0
+
+    errors = {}
+    for method, forecast in forecast_all(train, train_first, steps, methods).items():
+        errors[method] = np.where(valid, np.abs(forecast - actual).mean(axis=1), np.nan)
+    return errors
+
+
+def select_baseline(matrix, first_idx, steps, methods=METHODS):
+    """
+    Pilih metode baseline terbaik per produk dari backtest holdout lalu
+    forecast dengan data penuh.
+    return (method_idx (n,), forecast (n, steps), best_mae (n,) NaN kalau tidak bisa di-backtest)
+    """
+    n_products, n_days = matrix.shape
+    # tanpa histori untuk holdout: moving average (paling aman)
+    fallback = methods.index(MOVING_AVERAGE) if MOVING_AVERAGE in methods else 0
+    if n_days > steps:
+        errors = holdout_errors(matrix, first_idx, steps, methods)
+        stacked = np.stack([np.nan_to_num(errors[m], nan=np.inf) for m in methods])
+    else:
+        stacked = np.full((len(methods), n_products), np.inf)
+    method_idx = np.where(np.isfinite(stacked).any(axis=0), np.argmin(stacked, axis=0), fallback)
+
+    forecasts = np.stack(list(forecast_all(matrix, first_idx, steps, methods).values()))
+    cols = np.arange(n_products)
+    best_mae = stacked[method_idx, cols]
+    return method_idx, forecasts[method_idx, cols], np.where(np.isfinite(best_mae), best_mae, np.nan)
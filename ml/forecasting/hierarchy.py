@@ -0,0 +1,147 @@
+"""
+Forecast hierarki dua level (kategori -> produk) dan rekonsiliasi, NumPy saja.
+Semua fungsi bekerja untuk semua kategori sekaligus (tanpa loop per kategori):
+agregasi lewat reduceat per kategori, index category_idx untuk broadcast balik.
+"""
+import numpy as np
+
+BOTTOM_UP = "bottom_up"
+TOP_DOWN = "top_down"
+MINT = "mint"
+METHODS = (BOTTOM_UP, TOP_DOWN, MINT)
+
+
+def daily_matrix(history, product_ids, end_date, lookback_days=None):
+    """
+    Histori produk di kalender bersama sampai end_date: matrix (n_products, n_days)
+    float64, hari tanpa baris sales = 0. first_idx: index hari sales pertama per
+    produk (n_days kalau tidak ada sales di rentang).
+    """
+    product_ids = np.asarray(product_ids, dtype=np.int64)
+    end = np.datetime64(end_date, "D")
+    start = history.dates.min() if len(history.dates) else end
+    if lookback_days is not None:
+        start = max(start, end - lookback_days + 1)
+    n_days = int((end - start).astype(int)) + 1
+
+    # baris histori -> baris matrix (produk yang tidak diminta dibuang)
+    counts = np.diff(history.offsets)
+    lookup = np.full(len(history.product_ids), -1, dtype=np.int64)
+    pos = np.searchsorted(product_ids, history.product_ids)
+    found = (pos < len(product_ids)) & (product_ids[np.minimum(pos, len(product_ids) - 1)] == history.product_ids)
+    lookup[found] = pos[found]
+
+    rows = np.repeat(lookup, counts)
+    days = (history.dates - start).astype(np.int64)
+    keep = (rows >= 0) & (days >= 0) & (days < n_days)
+
+    matrix = np.zeros((len(product_ids), n_days), dtype=np.float64)
+    matrix[rows[keep], days[keep]] = history.sales[keep]
+
+    first_idx = np.full(len(product_ids), n_days, dtype=np.int64)
+    np.minimum.at(first_idx, rows[keep], days[keep])
+
+    return matrix, first_idx
+
+
+def aggregate(values, category_idx, n_categories):
+    """Jumlah baris per kategori: (n_products, ...) -> (n_categories, ...)"""
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.bincount(category_idx, minlength=n_categories)
+    out = np.zeros((n_categories,) + values.shape[1:], dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        order = np.argsort(category_idx, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        out[nonempty] = np.add.reduceat(values[order], starts[nonempty], axis=0)
+    return out
+
+
+def historical_shares(matrix, first_idx, category_idx, n_categories, window=90):
+    """
+    Porsi sales produk terhadap total kategorinya, di `window` hari terakhir
+    yang sama-sama tercakup (produk baru: sejak sales pertamanya). Tidak
+    dinormalisasi: produk histori pendek tetap dibandingkan dengan total
+    kategori di hari-hari yang sama.
+    """
+    n_days = matrix.shape[1]
+    category_matrix = aggregate(matrix, category_idx, n_categories)
+    # suffix sum: total kategori dari hari t sampai akhir
+    category_tail = np.concatenate(
+        [np.cumsum(category_matrix[:, ::-1], axis=1)[:, ::-1], np.zeros((n_categories, 1))], axis=1
+    )
+    start = np.maximum(np.minimum(first_idx, n_days), n_days - window)
+
+    product_tail = np.cumsum(matrix[:, ::-1], axis=1)[:, ::-1]
+    product_sum = np.where(start < n_days, product_tail[np.arange(len(matrix)), np.minimum(start, n_days - 1)], 0.0)
+    category_sum = category_tail[category_idx, start]
+
+    return np.divide(product_sum, category_sum, out=np.zeros(len(matrix)), where=category_sum > 0)
+
+
+def normalize_shares(shares, category_idx, n_categories):
+    """Porsi per kategori dijumlah 1, kategori tanpa sales dibagi rata"""
+    totals = aggregate(shares, category_idx, n_categories)
+    counts = np.bincount(category_idx, minlength=n_categories)
+    equal = 1.0 / np.maximum(counts, 1)
+    return np.where(totals[category_idx] > 0, shares / np.where(totals > 0, totals, 1)[category_idx], equal[category_idx])
+
+
+def residual_variance(matrix, first_idx, season=7, window=90, floor=1e-6):
+    """
+    Varians error seasonal naive (y_t - y_{t-season}) di `window` hari terakhir,
+    proxy varians error forecast untuk bobot MinT (W diagonal).
+    """
+    n_days = matrix.shape[1]
+    if n_days <= season:
+        return np.full(len(matrix), floor)
+
+    errors = matrix[:, season:] - matrix[:, :-season]
+    t = np.arange(season, n_days)
+    valid = (t[np.newaxis, :] - season >= first_idx[:, np.newaxis]) & (t[np.newaxis, :] >= n_days - window)
+    count = valid.sum(axis=1)
+    sq = np.where(valid, errors * errors, 0.0).sum(axis=1)
+    variance = np.divide(sq, count, out=np.zeros(len(matrix)), where=count > 0)
+    return np.maximum(variance, floor)
+
+
+def bottom_up(product_fc, category_idx, n_categories):
+    return aggregate(product_fc, category_idx, n_categories), product_fc
+
+
+def top_down(category_fc, shares, category_idx, n_categories):
+    product_fc = normalize_shares(shares, category_idx, n_categories)[:, np.newaxis] * category_fc[category_idx]
+    return category_fc, product_fc
+
+
+def mint(category_fc, product_fc, category_idx, n_categories, category_var, product_var):
+    """
+    MinT dengan W diagonal (WLS varians): b~ = (S' W^-1 S)^-1 S' W^-1 y^.
+    Satu level agregat per kategori, jadi S' W^-1 S = D + 1 1' / w_c dan
+    inversnya tertutup (Sherman-Morrison): selisih (forecast kategori - jumlah
+    forecast produk) dibagi ke produk sebanding varians errornya.
+    """
+    incoherence = category_fc - aggregate(product_fc, category_idx, n_categories)
+    denom = category_var + aggregate(product_var, category_idx, n_categories)
+    weight = product_var / denom[category_idx]
+    product_fc = product_fc + weight[:, np.newaxis] * incoherence[category_idx]
+    return aggregate(product_fc, category_idx, n_categories), product_fc
+
+
+def reconcile(method, category_fc, product_fc, category_idx, n_categories,
+              shares=None, category_var=None, product_var=None):
+    """
+    Forecast koheren (kategori = jumlah produk) dari base forecast dua level.
+    return (category_fc, product_fc), produk di-clip >= 0 lalu kategori dijumlah ulang.
+    """
+    if method == BOTTOM_UP:
+        _, product_fc = bottom_up(product_fc, category_idx, n_categories)
+    elif method == TOP_DOWN:
+        _, product_fc = top_down(category_fc, shares, category_idx, n_categories)
+    elif method == MINT:
+        _, product_fc = mint(category_fc, product_fc, category_idx, n_categories, category_var, product_var)
+    else:
+        raise ValueError(f"metode rekonsiliasi tidak dikenal: {method}")
+
+    product_fc = np.clip(product_fc, 0, None)
+    return aggregate(product_fc, category_idx, n_categories), product_fc
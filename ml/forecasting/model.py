@@ -0,0 +1,88 @@
+import os
+
+from ml.common.base_model import BaseModelRegistry
+from utils.lazy import lazy_import
+
+# TensorFlow ikut ter-load saat keras pertama dipakai (build / load model)
+keras = lazy_import("keras")
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+GLOBAL_MODEL_NAME = "global"
+
+
+def build_lstm(timesteps: int):
+    """Arsitektur LSTM per produk (input: sequence univariat)"""
+    layers = keras.layers
+    model = keras.Sequential([
+        keras.Input(shape=(timesteps, 1)),
+        layers.LSTM(32, return_sequences=True),
+        layers.Dropout(0.2),
+        layers.LSTM(16),
+        layers.Dense(1) # prediksi single value
+    ])
+    model.compile(optimizer='adam', loss='mse')
+
+    return model
+
+
+def build_global_lstm(timesteps: int, n_products: int, n_categories: int,
+                      product_dim: int = 8, category_dim: int = 4):
+    """
+    Satu LSTM untuk semua produk. Selain sequence, model dapat embedding
+    produk dan kategori supaya tetap bisa membedakan pola antar SKU.
+    """
+    layers = keras.layers
+    seq_in = keras.Input(shape=(timesteps, 1), name="sequence")
+    product_in = keras.Input(shape=(1,), dtype="int32", name="product")
+    category_in = keras.Input(shape=(1,), dtype="int32", name="category")
+
+    x = layers.LSTM(64, return_sequences=True)(seq_in)
+    x = layers.Dropout(0.2)(x)
+    x = layers.LSTM(32)(x)
+
+    product_emb = layers.Flatten()(layers.Embedding(n_products, product_dim)(product_in))
+    category_emb = layers.Flatten()(layers.Embedding(n_categories, category_dim)(category_in))
+
+    x = layers.Concatenate()([x, product_emb, category_emb])
+    x = layers.Dense(16, activation="relu")(x)
+    out = layers.Dense(1)(x) # prediksi single value
+
+    model = keras.Model(inputs=[seq_in, product_in, category_in], outputs=out)
+    model.compile(optimizer='adam', loss='mse')
+
+    return model
+
+
+def product_model_name(product_id: int) -> str:
+    return f"product_{product_id}"
+
+
+class ForecastModelRegistry(BaseModelRegistry):
+    """Registry model forecast Keras (per produk atau global)"""
+
+    def save_model(self, name: str, model, extras=None, metadata=None) -> int:
+        """Simpan arsitektur + weight model, extras (mis. scaler) di-pickle"""
+        return self.save_artifact(
+            name,
+            model.to_json(),
+            model.get_weights(),
+            extras=extras,
+            metadata={"keras_version": keras.__version__, **(metadata or {})},
+        )
+
+    def load_model(self, name: str, version=None):
+        """Return (model, extras, metadata), None kalau model belum ada"""
+        artifact = self.load_artifact(name, version)
+        if artifact is None:
+            return None
+        config, weights, extras, metadata = artifact
+
+        model = keras.models.model_from_json(config)
+        # weight disalin dari file mmap ke variable TF (memori model = variable TF)
+        model.set_weights(weights)
+        model.compile(optimizer='adam', loss='mse')
+
+        return model, extras, metadata
+
+
+registry = ForecastModelRegistry(MODEL_DIR)
@@ -0,0 +1,164 @@
+import os
+import threading
+
+import numpy as np
+
+from ml.common.base_model import LRUModelCache
+from ml.forecasting.model import GLOBAL_MODEL_NAME, product_model_name, registry
+from utils.lazy import lazy_import
+
+tf = lazy_import("tensorflow")
+keras = lazy_import("keras")
+
+
+class BatchForecaster:
+    """
+    Engine inference autoregressive.
+
+    Semua sequence milik satu model di-step bareng dalam satu batch, jadi
+    horizon `steps` cukup `steps` kali forward pass (bukan produk x steps
+    kali `model.predict`). Window geser disimpan di ring buffer NumPy yang
+    dialokasikan sekali di awal.
+    """
+
+    def __init__(self, model, compile: bool = True):
+        self.model = model
+        if compile:
+            # satu trace per shape batch, step berikutnya pakai graph yang sama
+            self._call = tf.function(
+                lambda inputs: model(inputs, training=False),
+                reduce_retracing=True,
+            )
+        else:
+            self._call = lambda inputs: model(inputs, training=False)
+
+    def forecast(self, last_sequences, steps: int = 30, static_inputs=None) -> np.ndarray:
+        """
+        last_sequences: array (n, timesteps) atau (timesteps,), sudah di-scale
+        static_inputs: list input tambahan yang tetap tiap step
+            (mis. index produk & kategori untuk model global)
+        return: array (n, steps) prediksi (masih skala model)
+        """
+        seqs = np.asarray(last_sequences, dtype=np.float32)
+        if seqs.ndim == 1:
+            seqs = seqs[np.newaxis, :]
+        n, timesteps = seqs.shape
+
+        # ring buffer "double write": tiap nilai ditulis di posisi p dan
+        # p + timesteps, jadi ring[:, head:head + timesteps] selalu window
+        # yang urut (lama -> baru) tanpa perlu copy / np.append
+        ring = np.empty((n, 2 * timesteps, 1), dtype=np.float32)
+        ring[:, :timesteps, 0] = seqs
+        ring[:, timesteps:, 0] = seqs
+
+        static = [np.asarray(x).reshape(n, -1) for x in (static_inputs or [])]
+
+        out = np.empty((n, steps), dtype=np.float32)
+        head = 0
+        for step in range(steps):
+            window = ring[:, head:head + timesteps]
+            inputs = [window, *static] if static else window
+            pred = np.asarray(self._call(inputs)).reshape(n)
+            out[:, step] = pred
+
+            # buang nilai terlama, masukkan prediksi sebagai nilai terbaru
+            ring[:, head, 0] = pred
+            ring[:, head + timesteps, 0] = pred
+            head = (head + 1) % timesteps
+
+        return out
+
+
+# Model per produk: satu graph per arsitektur per thread. Template tidak dibagi
+# antar thread, jadi set_weights + forecast tidak perlu lock dan caller paralel
+# (refresher, thread pool API) tidak saling menunggu
+_templates = threading.local()
+
+
+def forecast_with_template(model, last_sequences, steps: int = 30, static_inputs=None) -> np.ndarray:
+    """
+    BatchForecaster.forecast untuk model yang dibuat ulang tiap produk
+    (train_lstm, load_product_model). tf.function di-trace per objek model,
+    jadi BatchForecaster baru per produk = trace ulang per produk. Di sini
+    weight model disalin ke model template per arsitektur (kunci: shape input
+    + shape weight) yang forecaster-nya sudah ter-trace, jadi trace cukup sekali
+    per thread.
+    """
+    key = (str(model.input_shape), tuple(tuple(w.shape) for w in model.weights))
+    templates = getattr(_templates, "forecasters", None)
+    if templates is None:
+        templates = _templates.forecasters = {}
+    forecaster = templates.get(key)
+    if forecaster is None:
+        forecaster = templates[key] = BatchForecaster(keras.models.clone_model(model))
+    forecaster.model.set_weights(model.get_weights())
+    return forecaster.forecast(last_sequences, steps=steps, static_inputs=static_inputs)
+
+
+# Serving dari model tersimpan
+MODEL_CACHE_BYTES = int(os.getenv("MODEL_CACHE_MB", "512")) * 1024 * 1024
+
+
+def _load_forecaster(key):
+    name, version = key
+    loaded = registry.load_model(name, version)
+    if loaded is None:
+        return None
+    model, extras, metadata = loaded
+    # versi baru ter-load (disimpan proses lain): versi lama tidak dipakai lagi
+    invalidate_model(name, keep_version=version)
+    # weight sudah disalin ke variable TF, mmap tidak ditahan: 1x ukuran weight
+    return (BatchForecaster(model), extras, metadata), metadata["nbytes"]
+
+
+# key (nama, versi): versi baru yang disimpan proses lain langsung terbaca,
+# versi lama tidak pernah dilayani lagi
+model_cache = LRUModelCache(_load_forecaster, MODEL_CACHE_BYTES)
+
+
+def invalidate_model(name: str, keep_version=None) -> None:
+    """Buang versi model `name` dari cache (kecuali keep_version)"""
+    model_cache.invalidate_where(lambda key: key[0] == name and key[1] != keep_version)
+
+
+def _cached_forecaster(name: str):
+    version = registry.latest_version(name)
+    if version is None:
+        return None
+    return model_cache.get((name, version))
+
+
+def predict_product(product_id: int, sales, steps: int = 30):
+    """
+    Forecast satu produk dari model tersimpan tanpa training ulang.
+    Pakai model produk kalau ada, fallback ke model global.
+    sales: histori sales produk (urut tanggal, skala asli)
+    return: array (steps,) skala asli, None kalau tidak ada model yang cocok
+    """
+    sales = np.asarray(sales, dtype=np.float64)
+
+    cached = _cached_forecaster(product_model_name(product_id))
+    if cached is not None:
+        forecaster, scaler, metadata = cached
+        timesteps = metadata["timesteps"]
+        if len(sales) < timesteps:
+            return None
+        window = scaler.transform(sales[-timesteps:].reshape(-1, 1))[:, 0]
+        preds = forecaster.forecast(window, steps=steps)
+        return scaler.inverse_transform(preds.reshape(-1, 1)).flatten()
+
+    cached = _cached_forecaster(GLOBAL_MODEL_NAME)
+    if cached is None:
+        return None
+    forecaster, extras, metadata = cached
+    idx = extras["product_index"].get(int(product_id))
+    timesteps = metadata["timesteps"]
+    if idx is None or len(sales) < timesteps:
+        return None
+
+    window = extras["scaler"].transform(idx, sales[-timesteps:])
+    preds = forecaster.forecast(
+        window, steps=steps,
+        static_inputs=[np.array([idx], dtype=np.int32), extras["category_idx"][[idx]]],
+    )
+    return extras["scaler"].inverse_transform(preds, [idx])[0]
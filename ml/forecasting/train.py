@@ -0,0 +1,25 @@
+SKIP = "skip"
+FINETUNE = "finetune"
+RETRAIN = "retrain"
+
+
+def refresh_action(row_count, last_sale_date, watermark, drift_threshold=0.1, has_model=True):
+    """
+    Tentukan aksi forecast incremental satu produk dari watermark terakhir:
+    - skip: tidak ada sales baru sejak model terakhir
+    - finetune: ada hari baru, total data baru sejak full retrain
+      masih <= drift_threshold (rasio terhadap trained_rows)
+    - retrain: belum ada model/watermark, data dikoreksi, atau drift lewat batas
+    """
+    if watermark is None or not has_model:
+        return RETRAIN
+
+    if row_count == watermark.row_count and last_sale_date == watermark.last_sale_date:
+        return SKIP
+
+    # baris berkurang / tanggal mundur: histori diubah, model lama tidak valid
+    if row_count <= watermark.row_count or last_sale_date <= watermark.last_sale_date:
+        return RETRAIN
+
+    drift = (row_count - watermark.trained_rows) / max(watermark.trained_rows, 1)
+    return FINETUNE if drift <= drift_threshold else RETRAIN
@@ -0,0 +1,48 @@
+import os
+
+from ml.forecasting.model import GLOBAL_MODEL_NAME, product_model_name, registry
+from ml.forecasting.predict import invalidate_model
+
+# versi lama yang tetap disimpan per model
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "3"))
+
+
+def has_product_model(product_id: int) -> bool:
+    return registry.exists(product_model_name(product_id))
+
+
+def save_product_model(product_id: int, model, scaler, **metadata) -> int:
+    """Simpan model + scaler produk sebagai versi baru di registry"""
+    name = product_model_name(product_id)
+    version = registry.save_model(
+        name, model, extras=scaler,
+        metadata={"product_id": product_id, **metadata},
+    )
+    registry.prune(name, keep=MODEL_KEEP_VERSIONS)
+    invalidate_model(name, keep_version=version)
+    return version
+
+
+def load_product_model(product_id: int):
+    """Return (model, scaler) versi terbaru, None kalau belum ada"""
+    loaded = registry.load_model(product_model_name(product_id))
+    if loaded is None:
+        return None
+    model, scaler, _ = loaded
+    return model, scaler
+
+
+def save_global_model(model, scaler, product_ids, category_idx, **metadata) -> int:
+    """
+    Simpan model global beserta mapping produk -> index embedding, supaya
+    bisa dipakai predict tanpa training ulang
+    """
+    extras = {
+        "scaler": scaler,
+        "product_index": {int(pid): i for i, pid in enumerate(product_ids)},
+        "category_idx": category_idx,
+    }
+    version = registry.save_model(GLOBAL_MODEL_NAME, model, extras=extras, metadata=metadata)
+    registry.prune(GLOBAL_MODEL_NAME, keep=MODEL_KEEP_VERSIONS)
+    invalidate_model(GLOBAL_MODEL_NAME, keep_version=version)
+    return version
@@ -0,0 +1,186 @@
+"""
+Load test endpoint forecast: handler sync (def + Session psycopg2, jalan di
+threadpool anyio, default 40 thread) vs native async (async def + AsyncSession
+asyncpg). Server uvicorn dijalankan di subprocess per mode, cache response
+dimatikan supaya tiap request benar-benar ke database (--cache untuk menyalakan).
+
+Contoh:
+	python scripts/bench_api.py --concurrency 64 --duration 20
+	python scripts/bench_api.py --batch 50 --modes async
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+from fastapi import APIRouter, Depends, FastAPI, Request
+from sqlalchemy.orm import Session
+
+from api.deps import get_db
+from api.routes import forecast
+from db.models import Forecast
+from db.session import SessionLocal
+from domains.forecast import services
+from domains.forecast.schemas import ForecastQuery
+from utils.exceptions import NotFoundException
+from utils.response import etag_response
+
+MODES = ("sync", "async")
+MODE_ENV = "BENCH_API_MODE"
+CACHE_ENV = "BENCH_API_CACHE"
+
+# padanan sync dari api/routes/forecast.py, hanya untuk pembanding
+sync_router = APIRouter(prefix="/forecast")
+
+@sync_router.get("/{product_id}")
+def get_forecast_sync(
+	product_id: int,
+	request: Request,
+	start_date: Optional[datetime.date] = None,
+	end_date: Optional[datetime.date] = None,
+	db: Session = Depends(get_db),
+):
+	entry = services.get_product_forecast(db, product_id, start_date, end_date)
+	if entry.empty:
+		raise NotFoundException(f"Forecast produk {product_id} tidak ditemukan")
+	return etag_response(request, entry.etag, lambda: services.render_product(entry))
+
+@sync_router.post("/query")
+def query_forecast_sync(query: ForecastQuery, request: Request, db: Session = Depends(get_db)):
+	entries = services.get_cached_forecasts(db, query.product_ids, query.start_date, query.end_date)
+	return etag_response(request, services.combined_etag(entries), lambda: services.render_many(entries))
+
+def create_app() -> FastAPI:
+	"""Factory uvicorn di subprocess, mode dari env BENCH_API_MODE"""
+	if os.getenv(CACHE_ENV) != "1":
+		services.forecast_cache.max_entries = 0
+
+	app = FastAPI()
+	app.include_router(forecast.router if os.getenv(MODE_ENV) == "async" else sync_router)
+	return app
+
+def start_server(mode, port, cache=False) -> subprocess.Popen:
+	env = dict(os.environ, **{MODE_ENV: mode, CACHE_ENV: "1" if cache else "0"})
+	return subprocess.Popen(
+		[
+			sys.executable, "-m", "uvicorn", "bench_api:create_app", "--factory",
+			"--app-dir", os.path.dirname(os.path.abspath(__file__)),
+			"--port", str(port), "--log-level", "warning", "--no-access-log",
+		],
+		env=env,
+	)
+
+def wait_ready(base_url, timeout=30.0) -> None:
+	deadline = time.perf_counter() + timeout
+	while time.perf_counter() < deadline:
+		try:
+			if httpx.get(f"{base_url}/openapi.json").status_code == 200:
+				return
+		except httpx.TransportError:
+			pass
+		time.sleep(0.2)
+	raise RuntimeError(f"Server {base_url} tidak siap dalam {timeout}s")
+
+async def load(base_url, product_ids, concurrency, duration, batch=0, seed=42) -> dict:
+	latencies = []
+	errors = 0
+	limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+	async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+		deadline = time.perf_counter() + duration
+
+		async def worker(worker_id):
+			nonlocal errors
+			rng = random.Random(seed + worker_id)
+			while time.perf_counter() < deadline:
+				start = time.perf_counter()
+				if batch:
+					response = await client.post("/forecast/query", json={"product_ids": rng.sample(product_ids, batch)})
+				else:
+					response = await client.get(f"/forecast/{rng.choice(product_ids)}")
+				latencies.append(time.perf_counter() - start)
+				if response.status_code != 200:
+					errors += 1
+
+		start = time.perf_counter()
+		await asyncio.gather(*(worker(i) for i in range(concurrency)))
+		elapsed = time.perf_counter() - start
+
+	ms = np.array(latencies) * 1000
+	return {
+		"requests": len(latencies),
+		"errors": errors,
+		"rps": len(latencies) / elapsed,
+		"p50_ms": float(np.percentile(ms, 50)),
+		"p95_ms": float(np.percentile(ms, 95)),
+		"p99_ms": float(np.percentile(ms, 99)),
+	}
+
+def load_product_ids(limit) -> list:
+	db = SessionLocal()
+	try:
+		rows = db.query(Forecast.product_id).distinct().limit(limit).all()
+	finally:
+		db.close()
+	return [row[0] for row in rows]
+
+def run(modes=MODES, concurrency=64, duration=20.0, warmup=3.0, batch=0, port=8100, cache=False, products=10_000, output=None):
+	product_ids = load_product_ids(products)
+	if not product_ids or len(product_ids) < batch:
+		raise SystemExit("Tabel forecast kosong / produk kurang, jalankan forecast atau seed dulu")
+
+	endpoint = f"POST /forecast/query (batch={batch})" if batch else "GET /forecast/{product_id}"
+	print(f"{endpoint}, concurrency={concurrency}, duration={duration}s, products={len(product_ids)}, cache={cache}")
+
+	report = {}
+	for mode in modes:
+		base_url = f"http://127.0.0.1:{port}"
+		server = start_server(mode, port, cache)
+		try:
+			wait_ready(base_url)
+			asyncio.run(load(base_url, product_ids, concurrency, warmup, batch))
+			report[mode] = asyncio.run(load(base_url, product_ids, concurrency, duration, batch))
+		finally:
+			server.terminate()
+			server.wait()
+		print(f"✓ {mode} selesai")
+
+	print(f"\n{'mode':<6} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+	for mode, r in report.items():
+		print(
+			f"{mode:<6} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+			f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+		)
+
+	if output:
+		with open(output, "w") as f:
+			json.dump({"endpoint": endpoint, "concurrency": concurrency, "duration": duration, "results": report}, f, indent=2)
+		print(f"✓ Hasil disimpan ke {output}")
+
+	return report
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--modes", default=",".join(MODES), help="Subset dari sync,async")
+	parser.add_argument("--concurrency", type=int, default=64)
+	parser.add_argument("--duration", type=float, default=20.0)
+	parser.add_argument("--warmup", type=float, default=3.0)
+	parser.add_argument("--batch", type=int, default=0, help="Jumlah produk per POST /forecast/query, 0 = GET per produk")
+	parser.add_argument("--port", type=int, default=8100)
+	parser.add_argument("--products", type=int, default=10_000, help="Jumlah product_id yang dipakai request")
+	parser.add_argument("--cache", action="store_true", help="Nyalakan cache response")
+	parser.add_argument("--output", help="Simpan hasil ke file JSON")
+	args = parser.parse_args()
+
+	run(
+		tuple(args.modes.split(",")), args.concurrency, args.duration, args.warmup,
+		args.batch, args.port, args.cache, args.products, args.output,
+	)
@@ -0,0 +1,101 @@
+"""
+Benchmark inference autoregressive: loop lama (model.predict per step +
+np.append) vs BatchForecaster, lalu model berbeda per produk (path
+run_forecast): BatchForecaster baru per produk (trace ulang) vs
+forecast_with_template (set_weights ke graph template).
+
+Contoh:
+    python scripts/bench_inference.py --products 20 --horizons 7,30,90
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ml.forecasting.model import build_lstm
+from ml.forecasting.predict import BatchForecaster, forecast_with_template
+
+
+def legacy_forecast(model, last_sequence, steps):
+    """Implementasi lama generate_forecast (tanpa inverse scaling)"""
+    forecast = []
+    current_seq = last_sequence.copy()
+    for _ in range(steps):
+        pred = model.predict(
+            current_seq.reshape(1, current_seq.shape[0], 1),
+            verbose=0
+        )
+        forecast.append(pred[0, 0])
+        current_seq = np.append(current_seq[1:], pred[0, 0])
+    return np.array(forecast)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(products=20, horizons=(7, 30, 90), timesteps=30):
+    rng = np.random.default_rng(42)
+    model = build_lstm(timesteps)
+    sequences = rng.random((products, timesteps), dtype=np.float32)
+
+    print(f"products={products}, timesteps={timesteps}")
+    print(f"{'horizon':>8} {'legacy':>10} {'compiled':>10} {'batched':>10} {'x comp':>8} {'x batch':>8}")
+
+    for steps in horizons:
+        # legacy: satu model.predict per produk per hari
+        legacy, t_legacy = timed(lambda: np.stack([
+            legacy_forecast(model, seq, steps) for seq in sequences
+        ]))
+
+        # per produk, tf.function (path run_forecast: graph template per arsitektur)
+        compiled, t_compiled = timed(lambda: np.concatenate([
+            forecast_with_template(model, seq, steps) for seq in sequences
+        ]))
+
+        # semua sequence di-step bareng (satu model untuk semua produk)
+        batched, t_batched = timed(lambda: BatchForecaster(model).forecast(sequences, steps))
+
+        np.testing.assert_allclose(compiled, legacy, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(batched, legacy, rtol=1e-4, atol=1e-5)
+
+        print(
+            f"{steps:>8} {t_legacy:>9.2f}s {t_compiled:>9.2f}s {t_batched:>9.2f}s "
+            f"{t_legacy / t_compiled:>7.1f}x {t_legacy / t_batched:>7.1f}x"
+        )
+
+    # model berbeda per produk, seperti run_forecast (train / load per produk)
+    models = [build_lstm(timesteps) for _ in range(products)]
+    print(f"\nper-product models={products}")
+    print(f"{'horizon':>8} {'retrace':>10} {'template':>10} {'x templ':>8}")
+
+    for steps in horizons:
+        # BatchForecaster baru per produk: tf.function di-trace ulang tiap model
+        retrace, t_retrace = timed(lambda: np.concatenate([
+            BatchForecaster(m).forecast(seq, steps) for m, seq in zip(models, sequences)
+        ]))
+
+        # weight tiap produk disalin ke template yang sudah ter-trace
+        template, t_template = timed(lambda: np.concatenate([
+            forecast_with_template(m, seq, steps) for m, seq in zip(models, sequences)
+        ]))
+
+        np.testing.assert_allclose(template, retrace, rtol=1e-4, atol=1e-5)
+
+        print(f"{steps:>8} {t_retrace:>9.2f}s {t_template:>9.2f}s {t_retrace / t_template:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--horizons", type=str, default="7,30,90")
+    parser.add_argument("--timesteps", type=int, default=30)
+    args = parser.parse_args()
+
+    run(
+        products=args.products,
+        horizons=[int(h) for h in args.horizons.split(",")],
+        timesteps=args.timesteps,
+    )
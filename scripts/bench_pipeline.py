@@ -0,0 +1,292 @@
+"""
+Benchmark pipeline forecast (scripts/lstm_forecast.py) per tahap dengan data
+sintetis products x days, di SQLite (default, file sementara) atau Postgres
+lokal (skema terpisah bench_pipeline, tabel asli tidak disentuh).
+
+Tahap yang diukur:
+	fetch             : load_sales_history semua produk (satu query streaming)
+	prepare_sequences : scaling + sliding window per produk
+	train_lstm        : training per produk (subset --train-products)
+	generate_forecast : forecast autoregressive model hasil train_lstm
+	write             : upsert_forecasts ke tabel forecast kosong (insert)
+	rewrite           : upsert_forecasts ulang baris yang sama (jalur conflict/update)
+
+Tiap tahap dilaporkan durasi, throughput (produk/detik, baris/detik) dan peak
+RSS. Hasil ditulis ke JSON, --baseline membandingkan dengan JSON commit lain.
+
+Contoh:
+	python scripts/bench_pipeline.py --products 200 --days 365
+	python scripts/bench_pipeline.py --postgres --products 2000
+	python scripts/bench_pipeline.py --output results/bench_new.json --baseline results/bench_old.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from db.models import Forecast, Product, Sale
+from db.partitions import ensure_month_partitions, is_partitioned
+from db.session import Base
+from domains.forecast.repository import upsert_forecasts
+from domains.sales.repository import load_sales_history
+from scripts.lstm_forecast import forecast_rows, generate_forecast, prepare_sequences, train_lstm
+from scripts.seed_sales import generate_sales_matrix
+
+SCHEMA = "bench_pipeline"
+START_DATE = datetime.date(2024, 1, 1)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@dataclass
+class StageResult:
+	seconds: float
+	products: int
+	rows: int
+	peak_rss_mb: Optional[float]
+
+	@property
+	def products_per_second(self) -> float:
+		return self.products / self.seconds if self.seconds else 0.0
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.rows / self.seconds if self.seconds else 0.0
+
+	def as_dict(self) -> Dict:
+		return {
+			**asdict(self),
+			"seconds": round(self.seconds, 4),
+			"products_per_second": round(self.products_per_second, 2),
+			"rows_per_second": round(self.rows_per_second, 1),
+		}
+
+def reset_peak_rss() -> bool:
+	"""Reset VmHWM (Linux, /proc/self/clear_refs), supaya peak RSS terukur per tahap"""
+	try:
+		with open("/proc/self/clear_refs", "w") as f:
+			f.write("5")
+		return True
+	except OSError:
+		return False
+
+def peak_rss_mb() -> Optional[float]:
+	"""Peak RSS proses sejak reset terakhir (VmHWM), fallback ru_maxrss sejak proses mulai"""
+	try:
+		with open("/proc/self/status") as f:
+			for line in f:
+				if line.startswith("VmHWM:"):
+					return int(line.split()[1]) / 1024
+	except OSError:
+		pass
+	# ru_maxrss: KB di Linux, byte di macOS
+	maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return maxrss / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+def timed_stage(name, fn, products, rows=None):
+	"""Jalankan satu tahap; rows boleh callable dari hasil fn (jumlah baris baru diketahui setelah jalan)"""
+	reset_peak_rss()
+	start = time.perf_counter()
+	result = fn()
+	seconds = time.perf_counter() - start
+	n_rows = rows(result) if callable(rows) else (rows or 0)
+	stage = StageResult(seconds=seconds, products=products, rows=n_rows, peak_rss_mb=peak_rss_mb())
+	print(f"✓ {name:<18} {seconds:9.3f} s  {stage.products_per_second:10.1f} produk/s  "
+		  f"{stage.rows_per_second:12.0f} baris/s  peak RSS {stage.peak_rss_mb or 0:.0f} MB")
+	return result, stage
+
+def create_bench_engine(database_url: Optional[str]):
+	"""
+	SQLite: file sementara baru tiap run. Postgres: skema bench_pipeline
+	di-drop & dibuat ulang, search_path diarahkan ke sana.
+	"""
+	if database_url is None:
+		path = os.path.join(tempfile.mkdtemp(prefix="bench_pipeline_"), "bench.db")
+		database_url = f"sqlite:///{path}"
+
+	if database_url.startswith("sqlite"):
+		engine = create_engine(database_url)
+	else:
+		with create_engine(database_url).begin() as conn:
+			conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+			conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+		engine = create_engine(database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+
+	tables = [Product.__table__, Sale.__table__, Forecast.__table__]
+	Base.metadata.create_all(engine, tables=tables)
+
+	if engine.dialect.name == "postgresql":
+		with engine.begin() as conn:
+			for table in ("sales", "forecast"):
+				if is_partitioned(conn, table):
+					ensure_month_partitions(conn, table, START_DATE, datetime.date.today() + datetime.timedelta(days=366))
+
+	return engine, database_url
+
+def seed(engine, products: int, days: int, seed: int, chunk_products: int = 200) -> int:
+	"""Produk + sales sintetis (generator yang sama dengan seed_sales), insert per chunk produk"""
+	rng = np.random.default_rng(seed)
+	categories = [f"cat-{i}" for i in range(max(1, products // 50))]
+	dates = [START_DATE + datetime.timedelta(days=d) for d in range(days)]
+
+	with engine.begin() as conn:
+		conn.execute(insert(Product), [
+			{"id": pid, "name": f"bench-{pid}", "category": categories[pid % len(categories)]}
+			for pid in range(1, products + 1)
+		])
+
+	total = 0
+	for start in range(1, products + 1, chunk_products):
+		chunk = range(start, min(start + chunk_products, products + 1))
+		matrix = generate_sales_matrix(rng, len(chunk), days, START_DATE)
+		with engine.begin() as conn:
+			conn.execute(insert(Sale), [
+				{"product_id": pid, "date": date, "sales": int(value)}
+				for pid, row in zip(chunk, matrix.tolist())
+				for date, value in zip(dates, row)
+			])
+		total += len(chunk) * days
+	return total
+
+def git_revision() -> Optional[str]:
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "--short", "HEAD"],
+			cwd=ROOT, capture_output=True, text=True, check=True,
+		).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+def run(database_url=None, products=200, days=365, train_products=10, timesteps=30,
+		forecast_days=30, epochs=10, seed_value=42):
+	engine, database_url = create_bench_engine(database_url)
+	SessionBench = sessionmaker(bind=engine)
+	print(f"➜ Database: {engine.dialect.name} ({engine.url.render_as_string(hide_password=True)})")
+
+	start = time.perf_counter()
+	seeded = seed(engine, products, days, seed_value)
+	print(f"✓ Seed {products} produk x {days} hari ({seeded} baris) dalam {time.perf_counter() - start:.1f} detik")
+
+	stages: Dict[str, StageResult] = {}
+	with SessionBench() as db:
+		history, stages["fetch"] = timed_stage(
+			"fetch", lambda: load_sales_history(db), products, rows=lambda h: len(h.sales),
+		)
+
+		# warm-up: import sklearn (lazy) tidak ikut dihitung
+		prepare_sequences(history.sales[:timesteps + 1], timesteps=timesteps)
+		prepared, stages["prepare_sequences"] = timed_stage(
+			"prepare_sequences",
+			lambda: {pid: prepare_sequences(sales, timesteps=timesteps) for pid, _, sales in history.items()},
+			products, rows=len(history.sales),
+		)
+
+		# warm-up: import TensorFlow + trace graph pertama juga tidak dihitung
+		train_ids = list(prepared)[:train_products]
+		X, y, _ = prepared[train_ids[0]]
+		train_lstm(X, y, epochs=1)
+
+		models, stages["train_lstm"] = timed_stage(
+			"train_lstm",
+			lambda: {pid: train_lstm(prepared[pid][0], prepared[pid][1], epochs=epochs) for pid in train_ids},
+			len(train_ids), rows=sum(len(prepared[pid][1]) for pid in train_ids),
+		)
+
+		forecasts, stages["generate_forecast"] = timed_stage(
+			"generate_forecast",
+			lambda: {
+				pid: generate_forecast(model, prepared[pid][0][-1, :, 0], prepared[pid][2], steps=forecast_days)
+				for pid, model in models.items()
+			},
+			len(models), rows=len(models) * forecast_days,
+		)
+
+		# produk yang tidak di-train: naive forecast (nilai terakhir) supaya volume write penuh
+		rows = []
+		for pid, dates, sales in history.items():
+			preds = forecasts.get(pid, np.full(forecast_days, sales[-1]))
+			rows.extend(forecast_rows(pid, dates[-1], preds))
+
+		_, stages["write"] = timed_stage("write", lambda: upsert_forecasts(db, rows), products, rows=len(rows))
+		_, stages["rewrite"] = timed_stage("rewrite", lambda: upsert_forecasts(db, rows), products, rows=len(rows))
+
+	engine.dispose()
+	return {
+		"meta": {
+			"revision": git_revision(),
+			"created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+			"dialect": engine.dialect.name,
+			"partitioned": settings.PARTITION_TIME_SERIES and engine.dialect.name == "postgresql",
+			"products": products,
+			"days": days,
+			"train_products": len(train_ids),
+			"timesteps": timesteps,
+			"forecast_days": forecast_days,
+			"epochs": epochs,
+			"seed": seed_value,
+			"python": platform.python_version(),
+			"cpu_count": os.cpu_count(),
+		},
+		"stages": {name: stage.as_dict() for name, stage in stages.items()},
+	}
+
+def compare(report, baseline_path):
+	"""Cetak perubahan durasi per tahap terhadap JSON baseline (positif = lebih lambat)"""
+	with open(baseline_path) as f:
+		baseline = json.load(f)
+	base_rev = baseline["meta"].get("revision") or baseline_path
+	print(f"\n===== vs {base_rev} =====")
+	for name, stage in report["stages"].items():
+		base = baseline["stages"].get(name)
+		if not base or not base["seconds"]:
+			print(f"{name:<18} (tidak ada di baseline)")
+			continue
+		change = (stage["seconds"] / base["seconds"] - 1) * 100
+		print(f"{name:<18} {base['seconds']:9.3f} s → {stage['seconds']:9.3f} s  ({change:+.1f}%)")
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark tahap pipeline forecast")
+	parser.add_argument("--database-url", default=None, help="Default SQLite file sementara")
+	parser.add_argument("--postgres", action="store_true", help="Pakai database dari settings (skema bench_pipeline)")
+	parser.add_argument("--products", type=int, default=200)
+	parser.add_argument("--days", type=int, default=365)
+	parser.add_argument("--train-products", type=int, default=10, help="Jumlah produk untuk tahap train/forecast")
+	parser.add_argument("--timesteps", type=int, default=30)
+	parser.add_argument("--forecast-days", type=int, default=30)
+	parser.add_argument("--epochs", type=int, default=10)
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--output", default="results/bench_pipeline.json")
+	parser.add_argument("--baseline", default=None, help="JSON hasil run sebelumnya untuk dibandingkan")
+	args = parser.parse_args()
+
+	if args.days <= args.timesteps:
+		parser.error("--days harus lebih besar dari --timesteps")
+
+	database_url = settings.SQLALCHEMY_DATABASE_URI if args.postgres else args.database_url
+	report = run(
+		database_url=database_url, products=args.products, days=args.days,
+		train_products=max(1, min(args.train_products, args.products)),
+		timesteps=args.timesteps, forecast_days=args.forecast_days,
+		epochs=args.epochs, seed_value=args.seed,
+	)
+
+	os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+	with open(args.output, "w") as f:
+		json.dump(report, f, indent=2)
+	print(f"✓ Hasil ditulis ke {args.output}")
+
+	if args.baseline:
+		compare(report, args.baseline)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,198 @@
+"""
+Benchmark query plan tabel sales di skema terpisah (bench_plan) dengan tiga layout:
+	baseline    : index product_id dan date terpisah (skema lama)
+	composite   : index (product_id, date) INCLUDE (sales)
+	partitioned : composite + partisi bulanan RANGE (date)
+
+Tiap query di-EXPLAIN (ANALYZE, BUFFERS) beberapa kali dengan produk acak,
+dilaporkan median waktu eksekusi, shared buffers, dan jenis scan.
+
+Contoh:
+	python scripts/bench_query_plan.py --rows 100000000 --products 50000
+	python scripts/bench_query_plan.py --rows 1000000 --layouts composite,partitioned
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from db.partitions import ensure_month_partitions
+from db.session import engine
+
+SCHEMA = "bench_plan"
+LAYOUTS = ("baseline", "composite", "partitioned")
+START_DATE = datetime.date(2020, 1, 1)
+
+QUERIES = {
+	# load_sales_history / forecast per produk
+	"history": "SELECT date, sales FROM {table} WHERE product_id = :pid ORDER BY date",
+	# backtest / eval: satu produk, rentang tanggal
+	"range": "SELECT date, sales FROM {table} WHERE product_id = :pid AND date BETWEEN :start AND :end",
+	# watermark: tanggal sales terakhir per produk
+	"last_date": "SELECT max(date) FROM {table} WHERE product_id = :pid",
+	# agregat semua produk di satu bulan (partition pruning)
+	"month_total": (
+		"SELECT product_id, sum(sales) FROM {table} "
+		"WHERE date BETWEEN :start AND :end GROUP BY product_id"
+	),
+}
+
+CREATE_SQL = {
+	"baseline": "CREATE TABLE {table} (id bigserial PRIMARY KEY, product_id integer NOT NULL, date date NOT NULL, sales integer NOT NULL)",
+	"composite": "CREATE TABLE {table} (id bigserial PRIMARY KEY, product_id integer NOT NULL, date date NOT NULL, sales integer NOT NULL)",
+	"partitioned": (
+		"CREATE TABLE {table} (id bigserial, product_id integer NOT NULL, date date NOT NULL, sales integer NOT NULL, "
+		"PRIMARY KEY (id, date)) PARTITION BY RANGE (date)"
+	),
+}
+
+INDEX_SQL = {
+	"baseline": [
+		"CREATE INDEX ON {table} (product_id)",
+		"CREATE INDEX ON {table} (date)",
+	],
+	"composite": [
+		"CREATE INDEX ON {table} (product_id, date) INCLUDE (sales)",
+		"CREATE INDEX ON {table} (date)",
+	],
+	"partitioned": [
+		"CREATE INDEX ON {table} (product_id, date) INCLUDE (sales)",
+		"CREATE INDEX ON {table} (date)",
+	],
+}
+
+def _table(layout):
+	return f"{SCHEMA}.sales_{layout}"
+
+def load_layout(conn, layout, products, days, source=None):
+	"""Buat tabel layout dan isi data; layout berikutnya copy dari tabel pertama"""
+	table = _table(layout)
+	conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+	conn.execute(text(CREATE_SQL[layout].format(table=table)))
+
+	if layout == "partitioned":
+		end_date = START_DATE + datetime.timedelta(days=days - 1)
+		ensure_month_partitions(conn, table, START_DATE, end_date)
+
+	start = time.perf_counter()
+	if source:
+		conn.execute(text(f"INSERT INTO {table} (product_id, date, sales) SELECT product_id, date, sales FROM {source}"))
+	else:
+		conn.execute(text(
+			f"INSERT INTO {table} (product_id, date, sales) "
+			f"SELECT p, :start + d, (random() * 100)::int "
+			f"FROM generate_series(1, :products) p, generate_series(0, :days - 1) d"
+		), {"start": START_DATE, "products": products, "days": days})
+	load_time = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for sql in INDEX_SQL[layout]:
+		conn.execute(text(sql.format(table=table)))
+	index_time = time.perf_counter() - start
+
+	# visibility map harus terisi supaya index-only scan tidak balik ke heap
+	conn.execute(text(f"VACUUM ANALYZE {table}"))
+	size = conn.execute(text(f"SELECT pg_size_pretty(pg_total_relation_size('{table}'))")).scalar()
+	if layout == "partitioned":
+		size = conn.execute(text(
+			f"SELECT pg_size_pretty(sum(pg_total_relation_size(inhrelid))) "
+			f"FROM pg_inherits WHERE inhparent = '{table}'::regclass"
+		)).scalar()
+
+	print(f"✓ {layout}: load {load_time:.1f}s, index {index_time:.1f}s, size {size}")
+	return table
+
+def _scan_nodes(plan, found=None):
+	found = set() if found is None else found
+	if "Scan" in plan["Node Type"]:
+		found.add(plan["Node Type"])
+	for child in plan.get("Plans", []):
+		_scan_nodes(child, found)
+	return found
+
+def explain(conn, sql, params):
+	row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+	result = row[0] if isinstance(row, list) else json.loads(row)[0]
+	plan = result["Plan"]
+	return {
+		"execution_ms": result["Execution Time"],
+		"planning_ms": result["Planning Time"],
+		"buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+		"scans": _scan_nodes(plan),
+	}
+
+def run_queries(conn, layout, products, days, repeats, seed=42):
+	rng = random.Random(seed)
+	table = _table(layout)
+	results = {}
+
+	for name, sql in QUERIES.items():
+		runs = []
+		for _ in range(repeats):
+			month = START_DATE + datetime.timedelta(days=rng.randrange(max(days - 31, 1)))
+			params = {
+				"pid": rng.randint(1, products),
+				"start": month,
+				"end": month + datetime.timedelta(days=30),
+			}
+			runs.append(explain(conn, sql.format(table=table), params))
+
+		results[name] = {
+			"execution_ms": statistics.median(r["execution_ms"] for r in runs),
+			"planning_ms": statistics.median(r["planning_ms"] for r in runs),
+			"buffers": statistics.median(r["buffers"] for r in runs),
+			"scans": sorted(set().union(*(r["scans"] for r in runs))),
+		}
+
+	return results
+
+def run(rows=100_000_000, products=50_000, layouts=LAYOUTS, repeats=20, keep=False, output=None):
+	days = max(rows // products, 1)
+	print(f"rows={products * days:,}, products={products:,}, days={days}")
+
+	report = {}
+	with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+		conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+
+		source = None
+		for layout in layouts:
+			table = load_layout(conn, layout, products, days, source)
+			source = source or table
+
+		for layout in layouts:
+			report[layout] = run_queries(conn, layout, products, days, repeats)
+
+		if not keep:
+			conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+	print(f"\n{'query':<12} {'layout':<12} {'exec ms':>10} {'plan ms':>9} {'buffers':>9}  scans")
+	for name in QUERIES:
+		for layout in layouts:
+			r = report[layout][name]
+			print(
+				f"{name:<12} {layout:<12} {r['execution_ms']:>10.2f} {r['planning_ms']:>9.2f} "
+				f"{r['buffers']:>9.0f}  {', '.join(r['scans'])}"
+			)
+
+	if output:
+		with open(output, "w") as f:
+			json.dump({"rows": products * days, "products": products, "days": days, "results": report}, f, indent=2)
+		print(f"✓ Hasil disimpan ke {output}")
+
+	return report
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--rows", type=int, default=100_000_000)
+	parser.add_argument("--products", type=int, default=50_000)
+	parser.add_argument("--layouts", default=",".join(LAYOUTS), help="Subset dari baseline,composite,partitioned")
+	parser.add_argument("--repeats", type=int, default=20)
+	parser.add_argument("--keep", action="store_true", help="Jangan drop skema bench_plan setelah selesai")
+	parser.add_argument("--output", help="Simpan hasil ke file JSON")
+	args = parser.parse_args()
+
+	run(args.rows, args.products, tuple(args.layouts.split(",")), args.repeats, args.keep, args.output)
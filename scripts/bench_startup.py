@@ -0,0 +1,125 @@
+"""
+Benchmark waktu startup berbasis `python -X importtime`. Tiap target dijalankan
+di subprocess beberapa kali, diambil run tercepat, lalu dibandingkan dengan
+budget (ms). Exit code 1 kalau budget terlampaui atau ada modul berat
+(TensorFlow, Keras, sklearn) yang ikut ter-import padahal belum dipakai.
+
+Contoh:
+	python scripts/bench_startup.py
+	python scripts/bench_startup.py --runs 5 --top 15 --output startup.json
+	python scripts/bench_startup.py --targets api --scale 1.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modul yang hanya boleh ter-load saat training / inference benar-benar jalan
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn")
+
+@dataclass
+class Target:
+	args: List[str]
+	budget_ms: float
+	forbidden: Tuple[str, ...] = HEAVY_MODULES
+
+TARGETS: Dict[str, Target] = {
+	"api": Target(["-c", "import main"], budget_ms=2500),
+	"lstm_forecast": Target(["scripts/lstm_forecast.py", "--help"], budget_ms=1500),
+	"eval_forecast": Target(["scripts/eval_forecast.py", "--help"], budget_ms=1500),
+	"consumer": Target(["-c", "import events.consumer"], budget_ms=1000),
+}
+
+@dataclass
+class ImportRun:
+	total_ms: float
+	modules: Dict[str, float] = field(default_factory=dict) # cumulative ms per modul
+
+def parse_importtime(stderr: str) -> ImportRun:
+	"""
+	Format baris: `import time: self [us] | cumulative | imported package`.
+	Indentasi nama menandakan kedalaman, total = jumlah cumulative top-level.
+	"""
+	modules: Dict[str, float] = {}
+	total_us = 0
+	for line in stderr.splitlines():
+		if not line.startswith("import time:") or "self [us]" in line:
+			continue
+		_, cumulative, name = line[len("import time:"):].split("|", 2)
+		us = int(cumulative)
+		if not name.startswith("  "):
+			total_us += us
+		modules[name.strip()] = us / 1000
+	return ImportRun(total_ms=total_us / 1000, modules=modules)
+
+def measure(target: Target) -> ImportRun:
+	env = {**os.environ, "PYTHONPATH": ROOT}
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", *target.args],
+		cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+	)
+	if proc.returncode != 0:
+		tail = "\n".join(proc.stderr.splitlines()[-5:])
+		raise RuntimeError(f"{' '.join(target.args)} gagal (exit {proc.returncode}):\n{tail}")
+	return parse_importtime(proc.stderr)
+
+def is_forbidden(module: str, forbidden: Tuple[str, ...]) -> bool:
+	return any(module == name or module.startswith(name + ".") for name in forbidden)
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark import time startup")
+	parser.add_argument("--targets", default=",".join(TARGETS), help=f"Subset dari: {','.join(TARGETS)}")
+	parser.add_argument("--runs", type=int, default=3, help="Jumlah run per target, diambil yang tercepat")
+	parser.add_argument("--top", type=int, default=10, help="Jumlah import terlambat yang ditampilkan")
+	parser.add_argument("--scale", type=float, default=1.0, help="Pengali budget (mesin lambat / CI)")
+	parser.add_argument("--output", default=None, help="Tulis hasil ke file JSON")
+	args = parser.parse_args()
+
+	names = [n.strip() for n in args.targets.split(",") if n.strip()]
+	unknown = [n for n in names if n not in TARGETS]
+	if unknown:
+		parser.error(f"target tidak dikenal: {', '.join(unknown)}")
+
+	results = {}
+	failed = False
+	for name in names:
+		target = TARGETS[name]
+		budget = target.budget_ms * args.scale
+		print(f"➜ {name}: python -X importtime {' '.join(target.args)}")
+		best = min((measure(target) for _ in range(args.runs)), key=lambda r: r.total_ms)
+		heavy = sorted({m.split(".")[0] for m in best.modules if is_forbidden(m, target.forbidden)})
+
+		slowest = sorted(best.modules.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+		for module, ms in slowest:
+			print(f"    {ms:9.1f} ms  {module}")
+
+		ok = best.total_ms <= budget and not heavy
+		failed |= not ok
+		status = "✓" if ok else "✗"
+		print(f"{status} {name}: {best.total_ms:.1f} ms (budget {budget:.0f} ms)")
+		if heavy:
+			print(f"✗ {name}: modul berat ter-import saat startup: {', '.join(heavy)}")
+
+		results[name] = {
+			"args": target.args,
+			"total_ms": round(best.total_ms, 1),
+			"budget_ms": budget,
+			"heavy_modules": heavy,
+			"slowest": [{"module": m, "cumulative_ms": round(ms, 1)} for m, ms in slowest],
+			"ok": ok,
+		}
+
+	if args.output:
+		with open(args.output, "w") as f:
+			json.dump({"runs": args.runs, "targets": results}, f, indent=2)
+		print(f"✓ Hasil ditulis ke {args.output}")
+
+	sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,33 @@
+"""
+Buat partisi bulanan ke depan untuk sales & forecast (kalau tabelnya partitioned).
+Jalankan berkala (cron) supaya data bulan baru tidak jatuh ke partisi DEFAULT.
+
+Contoh:
+	python scripts/create_partitions.py --months-ahead 3
+"""
+import argparse
+import datetime
+
+from db.partitions import ensure_month_partitions, is_partitioned
+from db.session import engine
+
+TABLES = ("sales", "forecast")
+
+def create_partitions(months_ahead=3):
+	today = datetime.date.today()
+	end = today + datetime.timedelta(days=31 * months_ahead)
+
+	with engine.begin() as conn:
+		for table in TABLES:
+			if not is_partitioned(conn, table):
+				print(f"➜ {table} tidak partitioned, dilewati")
+				continue
+			created = ensure_month_partitions(conn, table, today, end)
+			print(f"✓ {table}: {created[0]} .. {created[-1]}")
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--months-ahead", type=int, default=3)
+	args = parser.parse_args()
+
+	create_partitions(args.months_ahead)
@@ -1,50 +1,37 @@
+import argparse
 import pandas as pd
 import os
 import numpy as np
-from sqlalchemy import func, cast, Date
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects import postgresql
-from sklearn.metrics import mean_squared_error, mean_absolute_error
 
 from db.session import SessionLocal
 from db.models import Sale, Forecast
+from domains.sales.history_cache import sync_history_cache
+from domains.sales.repository import SalesHistory
 
-def evaluate_forecast(db: Session, days=30):
-	# Cari rentang tanggal overlap antara sales dan forecast
-	sales_min, sales_max = db.query(func.min(Sale.date), func.max(Sale.date)).first()
-	print(sales_min, sales_max)
-	forecast_min, forecast_max = db.query(func.min(Forecast.date), func.max(Forecast.date)).first()
-	print(forecast_min, forecast_max)
-
-	if not sales_min or not forecast_min:
-		print("Data sales/forecast kosong")
-		return
+METRIC_COLUMNS = ["product_id", "MAE", "RMSE", "MAPE"]
 
-	start_date = max(sales_min, forecast_min)
-	end_date = min(sales_max, forecast_max)
-	print(start_date, end_date)
+def _join_condition():
+	# kolom date dua tabel sama-sama DATE: tanpa cast supaya index (product_id, date) kepakai
+	return (Sale.product_id == Forecast.product_id) & (Sale.date == Forecast.date)
 
-	if start_date > end_date:
-		print("Tidak ada tanggal yang overlap antara sales dan forecast")
-		return
-
-	print(f"Evaluasi dari {start_date} sampai {end_date}")
-
-	# Ambil sales & forecast dengan join
+def _sql_metrics(db: Session, start_date, end_date) -> pd.DataFrame:
+	"""MAE/RMSE/MAPE per produk dihitung database dalam satu query agregat"""
+	error = Sale.sales - Forecast.predicted_sales
 	query = (
 		db.query(
 			Sale.product_id,
-			Sale.date.label("sales_date"),
-			Sale.sales.label("actual"),
-			Forecast.predicted_sales.label("forecast"),
-		)
-		.join(
-			Forecast,
-			(Sale.product_id == Forecast.product_id) &
-			(cast(Sale.date, Date) == cast(Forecast.date, Date))
+			func.avg(func.abs(error)).label("MAE"),
+			func.sqrt(func.avg(error * error)).label("RMSE"),
+			# actual = 0 tidak bisa dihitung persentasenya, dikeluarkan dari MAPE
+			(func.avg(func.abs(error) / func.nullif(Sale.sales, 0)) * 100).label("MAPE"),
 		)
+		.join(Forecast, _join_condition())
 		.filter(Sale.date.between(start_date, end_date))
-		.order_by(Sale.product_id, Sale.date)
+		.group_by(Sale.product_id)
+		.order_by(Sale.product_id)
 	)
 
 	# Print SQL lengkap dengan value
@@ -54,33 +41,133 @@ def evaluate_forecast(db: Session, days=30):
 		compile_kwargs={"literal_binds": True}
 	))
 
-	df = pd.DataFrame(query.all(), columns=["product_id", "sales_date", "actual", "forecast"])
+	return pd.DataFrame(query.all(), columns=METRIC_COLUMNS)
+
+def _stream_metrics(db: Session, start_date, end_date, chunk_size=100_000) -> pd.DataFrame:
+	"""
+	Fallback: baca hasil join per chunk lewat server-side cursor, reduksi
+	tiap chunk dengan NumPy (bincount per produk). Memori tidak ikut
+	membesar dengan panjang histori.
+	"""
+	stmt = (
+		select(Sale.product_id, Sale.sales, Forecast.predicted_sales)
+		.join(Forecast, _join_condition())
+		.where(Sale.date.between(start_date, end_date))
+	)
+	result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+
+	partials = []
+	for rows in result.partitions():
+		data = np.array(rows, dtype=np.float64)
+		partials.append(_partial_metrics(data[:, 0].astype(np.int64), data[:, 1], data[:, 2]))
+
+	return _combine_metrics(partials)
+
+def _partial_metrics(product_ids, actual, predicted) -> np.ndarray:
+	"""Reduksi satu chunk per produk: [product_id, n, sum |e|, sum e^2, sum |e|/actual, n actual != 0]"""
+	product_ids, inverse = np.unique(product_ids, return_inverse=True)
+	error = actual - predicted
+	nonzero = actual != 0
+	size = len(product_ids)
+
+	return np.column_stack([
+		product_ids,
+		np.bincount(inverse, minlength=size),
+		np.bincount(inverse, weights=np.abs(error), minlength=size),
+		np.bincount(inverse, weights=error * error, minlength=size),
+		np.bincount(inverse[nonzero], weights=np.abs(error[nonzero] / actual[nonzero]), minlength=size),
+		np.bincount(inverse[nonzero], minlength=size),
+	])
+
+def _combine_metrics(partials) -> pd.DataFrame:
+	if not partials:
+		return pd.DataFrame(columns=METRIC_COLUMNS)
+
+	# gabung partial antar chunk (satu produk bisa muncul di beberapa chunk)
+	partials = np.concatenate(partials)
+	product_ids, inverse = np.unique(partials[:, 0].astype(np.int64), return_inverse=True)
+	totals = np.stack([
+		np.bincount(inverse, weights=partials[:, col], minlength=len(product_ids))
+		for col in range(1, partials.shape[1])
+	], axis=1)
+	count, abs_sum, sq_sum, ape_sum, ape_count = totals.T
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		mape = np.where(ape_count > 0, ape_sum / ape_count * 100, np.nan)
+
+	return pd.DataFrame({
+		"product_id": product_ids,
+		"MAE": abs_sum / count,
+		"RMSE": np.sqrt(sq_sum / count),
+		"MAPE": mape,
+	})
+
+def _cache_metrics(db: Session, history: SalesHistory, start_date, end_date, chunk_size=100_000) -> pd.DataFrame:
+	"""
+	Actual dari history cache (memory-mapped), hanya forecast yang dibaca dari
+	database, per chunk lewat server-side cursor seperti _stream_metrics. Join
+	(product_id, date) lewat SalesHistory.lookup, jadi hanya halaman memmap
+	yang disentuh yang terbaca.
+	"""
+	stmt = (
+		select(Forecast.product_id, Forecast.date, Forecast.predicted_sales)
+		.where(Forecast.date.between(start_date, end_date))
+	)
+	result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
 
-	if df.empty:
-		print("Tidak ada data hasil join. Skip evaluasi.")
-		return pd.DataFrame()
+	partials = []
+	for rows in result.partitions():
+		product_ids, dates, predicted = zip(*rows)
+		product_ids = np.fromiter(product_ids, dtype=np.int64, count=len(rows))
+		dates = np.array(dates, dtype="datetime64[D]")
+		predicted = np.fromiter(predicted, dtype=np.float64, count=len(rows))
 
-	results = []
-	for product_id, group in df.groupby("product_id"):
-		actual = group["actual"].values
-		forecast = group["forecast"].values
+		found, actual = history.lookup(product_ids, dates)
+		partials.append(_partial_metrics(product_ids[found], actual[found], predicted[found]))
 
-		if len(actual) == 0:
-			continue
+	return _combine_metrics(partials)
 
-		mae = mean_absolute_error(actual, forecast)
-		rmse = np.sqrt(mean_squared_error(actual, forecast))
-		#rmse = mean_squared_error(actual, forecast, squared=False)
-		mape = (abs((actual - forecast) / actual).mean()) * 100
+def evaluate_forecast(db: Session, days=30, method="sql", history_cache=None):
+	"""history_cache: direktori history cache, actual sales dibaca dari sana (sync dulu)"""
+	history = None
+	if history_cache:
+		history = sync_history_cache(db, history_cache).open()
+		method = "cache"
 
-		results.append({
-			"product_id": product_id,
-			"MAE": mae,
-			"RMSE": rmse,
-			"MAPE": mape
-		})
+	# Cari rentang tanggal overlap antara sales dan forecast
+	if history is not None:
+		sales_min, sales_max = (history.dates.min().item(), history.dates.max().item()) if len(history.dates) else (None, None)
+	else:
+		sales_min, sales_max = db.query(func.min(Sale.date), func.max(Sale.date)).first()
+	print(sales_min, sales_max)
+	forecast_min, forecast_max = db.query(func.min(Forecast.date), func.max(Forecast.date)).first()
+	print(forecast_min, forecast_max)
+
+	if not sales_min or not forecast_min:
+		print("Data sales/forecast kosong")
+		return
+
+	start_date = max(sales_min, forecast_min)
+	end_date = min(sales_max, forecast_max)
+	print(start_date, end_date)
+
+	if start_date > end_date:
+		print("Tidak ada tanggal yang overlap antara sales dan forecast")
+		return
+
+	print(f"Evaluasi dari {start_date} sampai {end_date} (method: {method})")
+
+	if method == "cache":
+		results_df = _cache_metrics(db, history, start_date, end_date)
+	elif method == "stream":
+		results_df = _stream_metrics(db, start_date, end_date)
+	else:
+		results_df = _sql_metrics(db, start_date, end_date)
+
+	if results_df.empty:
+		print("Tidak ada data hasil join. Skip evaluasi.")
+		return pd.DataFrame()
 
-	results_df = pd.DataFrame(results)
 	print(results_df)
 
 	os.makedirs("results", exist_ok=True)
@@ -90,6 +177,17 @@ def evaluate_forecast(db: Session, days=30):
 	return results_df
 
 if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument(
+		"--method", choices=["sql", "stream"], default="sql",
+		help="sql: agregasi di database, stream: agregasi NumPy per chunk cursor"
+	)
+	parser.add_argument(
+		"--history-cache", type=str, default=None,
+		help="Baca actual sales dari history cache lokal (direktori), bukan join di database"
+	)
+	args = parser.parse_args()
+
 	db = SessionLocal()
-	evaluate_forecast(db, days=30)
-	db.close()
\ No newline at end of file
+	evaluate_forecast(db, days=30, method=args.method, history_cache=args.history_cache)
+	db.close()
@@ -0,0 +1,29 @@
+"""
+Bulk load file sales (CSV / NDJSON / Parquet) ke tabel sales lewat COPY.
+
+Contoh:
+	python scripts/load_sales.py data/sales.csv
+	python scripts/load_sales.py data/pos.parquet --on-conflict skip --chunk-size 200000
+"""
+import argparse
+from pathlib import Path
+
+from domains.sales.services import bulk_load_sales
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("path")
+	parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], help="Default dari ekstensi file")
+	parser.add_argument("--on-conflict", choices=["error", "skip", "update"], default="update")
+	parser.add_argument("--chunk-size", type=int, default=100_000)
+	args = parser.parse_args()
+
+	fmt = args.format or FORMATS.get(Path(args.path).suffix.lower(), "csv")
+	print(f"➜ Load {args.path} ({fmt}, on_conflict={args.on_conflict})")
+
+	report = bulk_load_sales(args.path, fmt, args.on_conflict, args.chunk_size)
+	for key, value in report.as_dict().items():
+		print(f"  {key}: {value}")
+	print(f"✓ {report.received} rows dalam {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
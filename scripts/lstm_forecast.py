@@ -1,5 +1,9 @@
 import argparse
+import atexit
+import multiprocessing
 import os
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
@@ -7,46 +11,57 @@ import time
 from sqlalchemy.orm import Session
 
 from db.session import SessionLocal
-from db.models.sales import Sale
 from db.models.products import Product
-from db.models.forecast import Forecast
+from domains.forecast.repository import (
+    get_watermarks, upsert_category_forecasts, upsert_forecasts, upsert_watermarks,
+)
+from domains.sales.history_cache import HistoryCache, sync_history_cache
+from domains.sales.repository import load_sales_history
+from utils.file import read_parquet_dir, write_parquet_part
+from utils.lazy import lazy_import
+from utils.metrics import RunReport, stage_timer
+from utils.profiling import profiled, should_profile
 
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
-from tensorflow.keras.callbacks import EarlyStopping
+from ml.common.preprocessing import SeriesMinMaxScaler, sliding_windows, window_dataset
+from ml.forecasting import baseline, hierarchy
+from ml.forecasting.model import build_global_lstm, build_lstm
+from ml.forecasting.predict import BatchForecaster, forecast_with_template, predict_product
+from ml.forecasting.train import FINETUNE, RETRAIN, SKIP, refresh_action
+from ml.forecasting.utils import (
+    has_product_model, load_product_model, save_global_model, save_product_model,
+)
 
-# Data Preparation
-def prepare_sequences(sales_df, timesteps=30):
-    """Siapkan data sequence untuk LSTM"""
-    scaler = MinMaxScaler()
-    scaled = scaler.fit_transform(sales_df[['sales']])
+# lokasi hasil default, relatif terhadap working directory (sama dengan eval_forecast)
+BACKTEST_OUTPUT = "results/backtest.csv"
+WALKFORWARD_OUTPUT = "results/walkforward"
+MODEL_SELECTION_OUTPUT = "results/model_selection.csv"
 
-    X, y = [], []
-    for i in range(timesteps, len(scaled)):
-        X.append(scaled[i-timesteps:i, 0])
-        y.append(scaled[i, 0])
+# dependency berat baru di-load saat training / backtest benar-benar jalan
+keras = lazy_import("keras")
+sklearn_metrics = lazy_import("sklearn.metrics")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing")
 
-    X, y = np.array(X), np.array(y)
-    X = X.reshape(X.shape[0], X.shape[1], 1)
+# Data Preparation
+def prepare_sequences(sales, timesteps=30):
+    """Siapkan data sequence untuk LSTM dari array sales (urut tanggal)"""
+    scaler = sklearn_preprocessing.MinMaxScaler()
+    scaled = scaler.fit_transform(np.asarray(sales, dtype=np.float64).reshape(-1, 1))
+    X, y = make_windows(scaled, timesteps=timesteps)
 
     return X, y, scaler
 
+def make_windows(scaled, timesteps=30):
+    """Window (X, y) float32 dari series yang sudah di-scale, X berupa view (n, timesteps, 1)"""
+    X, y = sliding_windows(scaled[:, 0], timesteps=timesteps)
+
+    return X[..., np.newaxis], y
+
 # Model Training
 def train_lstm(X, y, epochs=10, batch_size=16):
     """Latih model LSTM dengan input sequence"""
-    model = Sequential([
-        Input(shape=(X.shape[1], 1)),
-        LSTM(32, return_sequences=True),
-        Dropout(0.2),
-        LSTM(16),
-        Dense(1) # prediksi single value
-    ])
-
-    model.compile(optimizer='adam', loss='mse')
+    model = build_lstm(X.shape[1])
 
-    early_stop = EarlyStopping(
+    early_stop = keras.callbacks.EarlyStopping(
         monitor='loss', patience=3, restore_best_weights=True
     )
     model.fit(
@@ -59,160 +74,518 @@ def train_lstm(X, y, epochs=10, batch_size=16):
 
     return model
 
+def fine_tune_lstm(model, X, y, epochs=3, batch_size=16):
+    """Lanjutkan training model tersimpan dengan window data baru saja"""
+    model.fit(
+        X, y,
+        epochs=epochs,
+        batch_size=min(batch_size, len(X)),
+        verbose=0,
+    )
+
+    return model
+
+# Global model (satu model untuk semua produk)
+def encode_categories(products):
+    """Mapping kategori produk ke index embedding (None jadi kategori sendiri)"""
+    categories = sorted({p.category or "" for p in products})
+    lookup = {c: i for i, c in enumerate(categories)}
+    category_idx = np.array([lookup[p.category or ""] for p in products], dtype=np.int32)
+
+    return category_idx, len(categories)
+
+def prepare_global_sequences(series_list, category_idx, timesteps=30, batch_size=256):
+    """
+    Dataset window gabungan semua produk (scaling per produk). Window dibentuk
+    per batch oleh tf.data, tidak dimaterialisasi sekaligus.
+    """
+    scaler = SeriesMinMaxScaler().fit(series_list)
+    scaled = [scaler.transform(i, series) for i, series in enumerate(series_list)]
+
+    dataset = window_dataset(
+        scaled, timesteps=timesteps, batch_size=batch_size,
+        static_inputs=[np.arange(len(series_list), dtype=np.int32), category_idx],
+    )
+    n_windows = sum(max(0, len(series) - timesteps) for series in series_list)
+
+    return dataset, n_windows, scaler
+
+def train_global_lstm(dataset, timesteps, n_products, n_categories, epochs=10):
+    """Latih satu LSTM dari window gabungan semua produk"""
+    model = build_global_lstm(timesteps, n_products, n_categories)
+
+    early_stop = keras.callbacks.EarlyStopping(
+        monitor='loss', patience=3, restore_best_weights=True
+    )
+    model.fit(
+        dataset,
+        epochs=epochs,
+        shuffle=False,  # dataset sudah di-shuffle per epoch
+        verbose=0,
+        callbacks=[early_stop]
+    )
+
+    return model
+
+def fit_global_forecast(products, series_list, timesteps=30, steps=30, save=False):
+    """Latih model global lalu forecast semua produk dalam satu batch"""
+    category_idx, n_categories = encode_categories(products)
+    dataset, n_windows, scaler = prepare_global_sequences(
+        series_list, category_idx, timesteps=timesteps
+    )
+
+    print(f"   ➜ Training model global (window: {n_windows}, produk: {len(products)}, kategori: {n_categories})")
+    start_time = time.time()
+    model = train_global_lstm(
+        dataset, timesteps,
+        n_products=len(products), n_categories=n_categories,
+    )
+    print(f"   ✓ Training selesai dalam {time.time() - start_time:.2f} detik")
+
+    if save:
+        version = save_global_model(
+            model, scaler, [p.id for p in products], category_idx,
+            timesteps=timesteps, trained_rows=int(sum(len(s) for s in series_list)),
+        )
+        print(f"   ✓ Model global disimpan (versi {version})")
+
+    last_seqs = np.stack([
+        scaler.transform(i, series[-timesteps:]) for i, series in enumerate(series_list)
+    ])
+    preds = BatchForecaster(model).forecast(
+        last_seqs, steps=steps,
+        static_inputs=[np.arange(len(products), dtype=np.int32), category_idx],
+    )
+
+    # balik ke skala asli masing-masing produk
+    return scaler.inverse_transform(preds)
+
 # Forecasting
 def generate_forecast(model, last_sequence, scaler, steps=30):
     """Generate prediksi ke depan secara autoregressive"""
-    forecast = []
-    current_seq = last_sequence.copy()
-
-    for _ in range(steps):
-        pred = model.predict(
-            current_seq.reshape(1, current_seq.shape[0], 1),
-            verbose=0
-        )
-        forecast.append(pred[0, 0])
-        # geser sequence
-        current_seq = np.append(current_seq[1:], pred[0, 0])
+    # model baru tiap produk: pakai graph template yang sudah ter-trace
+    forecast = forecast_with_template(model, last_sequence, steps=steps)[0]
 
     # balik ke skala asli
-    forecast = scaler.inverse_transform(np.array(forecast).reshape(-1, 1))
+    forecast = scaler.inverse_transform(forecast.reshape(-1, 1))
 
     return forecast.flatten()
 
-# Main Pipeline
-def run_forecast(db: Session, timesteps=30, forecast_days=30):
-    products = db.query(Product).all()
-    print(f"Total produk: {len(products)}")
+def load_history(db: Session, product_ids=None, history_cache=None):
+    """
+    Ambil histori sales semua produk sekaligus (satu query), atau dari
+    history cache lokal (memory-mapped, product_ids tidak perlu difilter:
+    history.get per produk tetap view tanpa copy)
+    """
+    start_time = time.time()
+    if history_cache:
+        history = HistoryCache(history_cache).open()
+        source = f"history cache {history_cache}"
+    else:
+        history = load_sales_history(db, product_ids=product_ids)
+        source = "database"
+    print(f"   ✓ Load {len(history.sales)} baris sales ({len(history)} produk) dari {source} "
+          f"dalam {time.time() - start_time:.2f} detik")
+    return history
 
-    total_start = time.time()
+def prepare_history_cache(db: Session, history_cache, workers=1):
+    """
+    Sync history cache dengan sales baru sebelum dibaca. Untuk worker paralel
+    cache di-compact jadi satu segment supaya semua worker mem-mmap file yang
+    sama (page cache dibagi, tanpa copy per worker).
+    """
+    cache = sync_history_cache(db, history_cache)
+    if workers > 1 and len(cache.manifest()["segments"]) > 1:
+        rows = cache.compact()
+        print(f"   ✓ History cache di-compact ({rows} baris) untuk {workers} worker")
 
-    for idx, product in enumerate(products, start=1):
-        print(f"\n[{idx}/{len(products)}] Mulai proses: {product.name} (id={product.id})")
-        # Ambil data sales per produk
-        sales_records = (
-            db.query(Sale)
-            .filter(Sale.product_id == product.id)
-            .order_by(Sale.date)
-            .all()
-        )
+def forecast_rows(product_id, last_date, preds):
+    """Baris forecast mulai H+1 dari tanggal sales terakhir"""
+    forecast_dates = last_date + np.arange(1, len(preds) + 1)
+    return [
+        {"product_id": product_id, "date": d, "predicted_sales": float(p)}
+        for d, p in zip(forecast_dates.tolist(), preds)
+    ]
 
-        if len(sales_records) < timesteps:
-            print(f"   ➜ Skip {product.name}, data kurang dari {timesteps}")
-            continue
+def split_backtest(dates, sales, test_days=30, cutoff_date=None):
+    """Pisah train/test: sebelum-sesudah cutoff, atau test_days terakhir"""
+    if cutoff_date is not None:
+        cutoff = np.datetime64(cutoff_date, "D")
+        train = sales[dates <= cutoff]
+        test = sales[dates > cutoff][:test_days]
+    else:
+        train = sales[:-test_days]
+        test = sales[-test_days:]
+    return train, test
+
+# Main Pipeline
+def forecast_product(product, dates, sales, timesteps=30, forecast_days=30,
+                     watermark=None, incremental=False, drift_threshold=0.1):
+    """
+    Train + forecast satu produk.
+    return dict {product_id, action, rows, watermark, timings}, None kalau data kurang
+    timings: durasi (detik) per tahap preprocess/train/save_model/predict
+    """
+    if len(sales) < timesteps:
+        print(f"   ➜ Skip {product.name}, data kurang dari {timesteps}")
+        return None
 
-        print(f"   ➜ Data sales ditemukan: {len(sales_records)} records")
+    print(f"   ➜ Data sales ditemukan: {len(sales)} records")
 
-        # Buat dataframe untuk preprocessing
-        df = pd.DataFrame(
-            [(s.date, s.sales) for s in sales_records],
-            columns=['date', 'sales']
+    last_sale_date = dates[-1].item()
+    action = RETRAIN
+    if incremental:
+        action = refresh_action(
+            len(sales), last_sale_date, watermark,
+            drift_threshold=drift_threshold,
+            has_model=has_product_model(product.id),
         )
 
+    if action == SKIP:
+        print(f"   ➜ Skip {product.name}, tidak ada sales baru sejak training terakhir")
+        return {"product_id": product.id, "action": SKIP, "rows": [], "watermark": None, "timings": {}}
+
+    timings = {}
+    if action == FINETUNE:
+        # cukup window yang berakhir di hari-hari baru
+        with stage_timer(timings, "load_model"):
+            model, scaler = load_product_model(product.id)
+        new_rows = len(sales) - watermark.row_count
+        with stage_timer(timings, "preprocess"):
+            recent = np.asarray(sales[-(new_rows + timesteps):], dtype=np.float64)
+            X, y = make_windows(scaler.transform(recent.reshape(-1, 1)), timesteps=timesteps)
+
+        print(f"   ➜ Fine-tune model ({new_rows} hari baru)")
+        with stage_timer(timings, "train"):
+            model = fine_tune_lstm(model, X, y)
+        trained_rows = watermark.trained_rows
+    else:
         # Preprocess
-        X, y, scaler = prepare_sequences(df, timesteps=timesteps)
+        with stage_timer(timings, "preprocess"):
+            X, y, scaler = prepare_sequences(sales, timesteps=timesteps)
 
         # Train model
         print(f"   ➜ Training model (X shape: {X.shape}, y shape: {y.shape})")
-        start_time = time.time()
-        model = train_lstm(X, y, epochs=10, batch_size=16)
-        duration = time.time() - start_time
-        print(f"   ✓ Training selesai untuk {product.name}")
-        print(f"   ✓ Training selesai dalam {duration:.2f} detik (data: {len(sales_records)} records)")
+        with stage_timer(timings, "train"):
+            model = train_lstm(X, y, epochs=10, batch_size=16)
+        trained_rows = len(sales)
+    print(f"   ✓ Training selesai untuk {product.name}")
+    print(f"   ✓ Training selesai dalam {timings['train']:.2f} detik (data: {len(sales)} records)")
 
-        # Forecast ke depan
-        last_seq = X[-1, :, 0]
+    with stage_timer(timings, "save_model"):
+        save_product_model(
+            product.id, model, scaler,
+            timesteps=timesteps, trained_rows=trained_rows,
+            row_count=len(sales), last_sale_date=last_sale_date,
+        )
+
+    # Forecast ke depan
+    last_seq = X[-1, :, 0]
+    with stage_timer(timings, "predict"):
         preds = generate_forecast(model, last_seq, scaler, steps=forecast_days)
 
-        # Simpan hasil ke DB
-        forecast_dates = pd.date_range(
-            start=df['date'].iloc[-1] + pd.Timedelta(days=1),
-            periods=forecast_days
+    print(f"   ✓ Forecast {forecast_days} hari selesai untuk {product.name}")
+
+    return {
+        "product_id": product.id,
+        "action": action,
+        "rows": forecast_rows(product.id, dates[-1], preds),
+        "watermark": {
+            "product_id": product.id,
+            "last_sale_date": last_sale_date,
+            "row_count": len(sales),
+            "trained_rows": trained_rows,
+        },
+        "timings": timings,
+    }
+
+def forecast_one(product, history, watermarks, profile=None, profile_ids=None,
+                 profile_dir="results/profiles", **options):
+    """forecast_product dengan histori/watermark batch, opsional di-profile per produk"""
+    dates, sales = history.get(product.id)
+    mode = profile if should_profile(product.id, profile, profile_ids) else None
+    with profiled(f"product_{product.id}", mode, profile_dir):
+        return forecast_product(product, dates, sales, watermark=watermarks.get(product.id), **options)
+
+def save_forecasts(db: Session, rows):
+    """Simpan semua hasil forecast (COPY + upsert, commit per chunk)"""
+    start_time = time.time()
+    written = upsert_forecasts(db, rows)
+    print(f"   ✓ {written} baris forecast disimpan dalam {time.time() - start_time:.2f} detik")
+    return written
+
+def run_forecast(db: Session, timesteps=30, forecast_days=30, workers=1,
+                 incremental=False, drift_threshold=0.1, product_ids=None,
+                 profile=None, profile_ids=None, profile_dir="results/profiles", report_path=None,
+                 history_cache=None):
+    """
+    product_ids: hanya produk ini (refresh dari event), default semua produk
+    profile: cprofile / pyinstrument per produk (profile_ids: subset produk)
+    report_path: tulis RunReport JSON (durasi per tahap & produk terlambat)
+    history_cache: direktori history cache, histori dibaca dari sana (sync dulu), bukan database
+    """
+    report = RunReport("forecast")
+    query = db.query(Product)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        query = query.filter(Product.id.in_(product_ids))
+    products = query.all()
+    print(f"Total produk: {len(products)}")
+
+    total_start = time.time()
+
+    if history_cache:
+        with report.stage("sync_cache"):
+            prepare_history_cache(db, history_cache, workers)
+
+    options = dict(
+        timesteps=timesteps, forecast_days=forecast_days,
+        incremental=incremental, drift_threshold=drift_threshold,
+        profile=profile, profile_ids=profile_ids, profile_dir=profile_dir,
+    )
+    if workers > 1:
+        results = run_parallel(
+            _forecast_chunk, products, workers, report=report, history_cache=history_cache, **options,
         )
+    else:
+        with report.stage("fetch"):
+            history = load_history(db, product_ids, history_cache)
+            watermarks = get_watermarks(db, product_ids) if incremental else {}
+        results = []
+        for idx, product in enumerate(products, start=1):
+            print(f"\n[{idx}/{len(products)}] Mulai proses: {product.name} (id={product.id})")
+            result = forecast_one(product, history, watermarks, **options)
+            if result is not None:
+                results.append(result)
+
+    # Simpan hasil ke DB, watermark baru diupdate setelah forecast ter-commit
+    with report.stage("write"):
+        written = save_forecasts(db, [row for result in results for row in result["rows"]])
+        upsert_watermarks(db, [result["watermark"] for result in results if result["watermark"]])
+
+    for result in results:
+        report.add_product(result["product_id"], result["timings"])
+        report.count("products", help="Produk yang diproses per action", action=result["action"])
+    report.count("products", len(products) - len(results), action="insufficient")
+    report.count("rows_written", written, help="Baris forecast yang ditulis")
+    report.finish()
+
+    actions = Counter(result["action"] for result in results)
+    print(f"Forecast selesai (retrain: {actions[RETRAIN]}, fine-tune: {actions[FINETUNE]}, "
+          f"skip: {actions[SKIP]}) dalam {time.time() - total_start:.2f} detik")
+    print(report.summary())
 
-        for d, p in zip(forecast_dates, preds):
-            db.add(Forecast(
-                product_id = product.id,
-                date = d.date(),
-                predicted_sales = float(p)
-            ))
+    if report_path:
+        report.write(report_path)
+        print(f"✓ Run report disimpan ke {report_path}")
 
-        print(f"   ✓ Forecast {forecast_days} hari disimpan untuk {product.name}")
+    return report
+
+# Forecast dari model tersimpan (--mode predict)
+def run_predict(db: Session, forecast_days=30, product_ids=None, history_cache=None):
+    """
+    Forecast ulang dari model di registry (model produk, fallback model global)
+    dengan histori terbaru, tanpa training. Produk tanpa model dilewati.
+    """
+    query = db.query(Product).order_by(Product.id)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        query = query.filter(Product.id.in_(product_ids))
+    products = query.all()
+    print(f"Total produk: {len(products)}")
+
+    total_start = time.time()
+    if history_cache:
+        prepare_history_cache(db, history_cache)
+    history = load_history(db, product_ids, history_cache)
+
+    rows, missing = [], 0
+    for product in products:
+        dates, sales = history.get(product.id)
+        preds = predict_product(product.id, sales, steps=forecast_days) if len(sales) else None
+        if preds is None:
+            missing += 1
+            continue
+        rows.extend(forecast_rows(product.id, dates[-1], preds))
 
-    db.commit()
-    print("Forecast selesai")
+    save_forecasts(db, rows)
+    print(f"Forecast {forecast_days} hari dari model tersimpan untuk {len(products) - missing} produk "
+          f"(tanpa model / data kurang: {missing}) dalam {time.time() - total_start:.2f} detik")
 
 # Backtest pipeline
-def run_backtest(db: Session, timesteps=30, test_days=30, cutoff_date=None):
+def backtest_product(product, dates, sales, timesteps=30, test_days=30, cutoff_date=None):
+    """Backtest satu produk, return dict metrik (None kalau skip)"""
+    if len(sales) < timesteps + test_days:
+        print(f"   ➜ Skip {product.name}, data kurang dari {timesteps + test_days}")
+        return None
+
+    train, test = split_backtest(dates, sales, test_days, cutoff_date)
+
+    if len(train) <= timesteps or len(test) == 0:
+        print(f"   ➜ Skip {product.name}, train/test data terlalu sedikit")
+        return None
+
+    X, y, scaler = prepare_sequences(train, timesteps=timesteps)
+    model = train_lstm(X, y, epochs=10, batch_size=16)
+
+    last_seq = X[-1, :, 0]
+    preds = generate_forecast(model, last_seq, scaler, steps=len(test))
+
+    # hitung metrik error
+    actual = test[:len(preds)]
+    return backtest_result(product, actual, preds)
+
+def run_backtest(db: Session, timesteps=30, test_days=30, cutoff_date=None, workers=1,
+                 history_cache=None, output=BACKTEST_OUTPUT):
     products = db.query(Product).all()
-    results = []
     print(f"Total produk: {len(products)}")
 
-    for idx, product in enumerate(products, start=1):
-        print(f"\n[{idx}/{len(products)}] Backtest: {product.name} (id={product.id})")
-        sales_records = (
-            db.query(Sale)
-            .filter(Sale.product_id == product.id)
-            .order_by(Sale.date)
-            .all()
+    if history_cache:
+        prepare_history_cache(db, history_cache, workers)
+
+    if workers > 1:
+        results = run_parallel(
+            _backtest_chunk, products, workers,
+            timesteps=timesteps, test_days=test_days, cutoff_date=cutoff_date,
+            history_cache=history_cache,
         )
+    else:
+        history = load_history(db, history_cache=history_cache)
+        results = []
+        for idx, product in enumerate(products, start=1):
+            print(f"\n[{idx}/{len(products)}] Backtest: {product.name} (id={product.id})")
+            dates, sales = history.get(product.id)
+            result = backtest_product(product, dates, sales, timesteps, test_days, cutoff_date)
+            if result is not None:
+                results.append(result)
 
-        if len(sales_records) < timesteps + test_days:
-            print(f"   ➜ Skip {product.name}, data kurang dari {timesteps + test_days}")
-            continue
+    save_backtest_results(results, output)
 
-        df = pd.DataFrame(
-            [(s.date, s.sales) for s in sales_records],
-            columns=['date', 'sales']
-        )
+# Parallel (--workers N)
+_worker_db = None
 
-        if cutoff_date:
-            df_train = df[df['date'] <= cutoff_date]
-            df_test = df[df['date'] > cutoff_date].head(test_days)
-        else:
-            df_train = df.iloc[:-test_days]
-            df_test = df.iloc[-test_days:]
+def _limit_tf_threads(tf_threads):
+    import tensorflow as tf
 
-        if len(df_train) < timesteps:
-            print(f"   ➜ Skip {product.name}, train data terlalu sedikit")
-            continue
+    # harus dipanggil sebelum runtime TF jalan (op pertama)
+    tf.config.threading.set_intra_op_parallelism_threads(tf_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
 
-        X, y, scaler = prepare_sequences(df_train, timesteps=timesteps)
-        model = train_lstm(X, y, epochs=10, batch_size=16)
+def _init_worker(tf_threads):
+    """Initializer tiap worker: koneksi DB sendiri + batasi thread TensorFlow"""
+    global _worker_db
+    _limit_tf_threads(tf_threads)
 
-        last_seq = X[-1, :, 0]
-        preds = generate_forecast(model, last_seq, scaler, steps=len(df_test))
+    _worker_db = SessionLocal()
+    atexit.register(_worker_db.close)
 
-        # hitung metrik error
-        actual = df_test['sales'].values[:len(preds)]
-        mae = mean_absolute_error(actual, preds)
-        rmse = np.sqrt(mean_squared_error(actual, preds))
-        # rmse = mean_squared_error(actual, preds, squared=False)
-        mape = (abs((actual - preds) / actual).mean()) * 100
+def _load_products(product_ids):
+    return (
+        _worker_db.query(Product)
+        .filter(Product.id.in_(product_ids))
+        .order_by(Product.id)
+        .all()
+    )
 
-        results.append({
-            "product_id": product.id,
-            "product_name": product.name,
-            "MAE": mae,
-            "RMSE": rmse,
-            "MAPE": mape,
-        })
+def _load_chunk_history(product_ids, history_cache=None):
+    """Histori chunk worker: mmap history cache (dibagi antar worker) atau query sendiri"""
+    if history_cache:
+        return HistoryCache(history_cache).open()
+    return load_sales_history(_worker_db, product_ids=product_ids)
 
-        print(f"[Backtest] {product.name}" 
-              f"(id={product.id} → "
-              f"MAE={mae:.2f}, RMSE={rmse:.2f}, MAPE={mape:.2f}%"
-        )
+def _forecast_chunk(product_ids, incremental=False, history_cache=None, **options):
+    start = time.time()
+    timings = {}
+    with stage_timer(timings, "fetch"):
+        products = _load_products(product_ids)
+        history = _load_chunk_history(product_ids, history_cache)
+        watermarks = get_watermarks(_worker_db, product_ids) if incremental else {}
+    results = []
+    for product in products:
+        result = forecast_one(product, history, watermarks, incremental=incremental, **options)
+        if result is not None:
+            results.append(result)
+    return results, (os.getpid(), len(products), time.time() - start, timings)
+
+def _backtest_chunk(product_ids, timesteps=30, test_days=30, cutoff_date=None, history_cache=None):
+    start = time.time()
+    products = _load_products(product_ids)
+    history = _load_chunk_history(product_ids, history_cache)
+    results = []
+    for product in products:
+        dates, sales = history.get(product.id)
+        result = backtest_product(product, dates, sales, timesteps, test_days, cutoff_date)
+        if result is not None:
+            results.append(result)
+    return results, (os.getpid(), len(products), time.time() - start, {})
+
+def run_parallel(job, products, workers, chunk_size=None, report=None, **kwargs):
+    """
+    Bagi produk ke process pool. Tiap worker punya koneksi DB sendiri,
+    hasilnya dikumpulkan di parent supaya ditulis sekali.
+    report: RunReport yang menerima timing level chunk (mis. fetch) dari worker
+    """
+    product_ids = [p.id for p in products]
+    # chunk kecil supaya beban antar worker rata
+    chunk_size = chunk_size or max(1, len(product_ids) // (workers * 4))
+    chunks = [product_ids[i:i + chunk_size] for i in range(0, len(product_ids), chunk_size)]
+
+    # bagi core rata ke semua worker, jangan oversubscribe
+    tf_threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Parallel: {workers} worker, {len(chunks)} chunk, {tf_threads} thread TF/worker")
+
+    results = []
+    throughput = defaultdict(lambda: [0, 0.0])  # pid -> [produk, detik]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(tf_threads,),
+    ) as pool:
+        futures = [pool.submit(job, chunk, **kwargs) for chunk in chunks]
+        for future in as_completed(futures):
+            chunk_results, (pid, n_products, seconds, timings) = future.result()
+            results.extend(chunk_results)
+            if report is not None:
+                for stage, stage_seconds in timings.items():
+                    report.observe(stage, stage_seconds)
+            throughput[pid][0] += n_products
+            throughput[pid][1] += seconds
+            print(f"   ✓ Worker {pid}: {n_products} produk dalam {seconds:.2f} detik "
+                  f"({n_products / max(seconds, 1e-9):.2f} produk/detik)")
+
+    print("\n===== Throughput per Worker =====")
+    for pid, (n_products, seconds) in sorted(throughput.items()):
+        print(f"Worker {pid}: {n_products} produk, {seconds:.2f} detik, "
+              f"{n_products / max(seconds, 1e-9):.2f} produk/detik")
 
-        #df_result = pd.DataFrame({
-        #    "date": df_test['date'].values,
-        #    "actual": df_test['sales'].values,
-        #    "predicted": preds
-        #})
-        #print(df_result.head())
+    return results
 
+def backtest_result(product, actual, preds):
+    """Hitung metrik error backtest satu produk"""
+    mae = sklearn_metrics.mean_absolute_error(actual, preds)
+    rmse = np.sqrt(sklearn_metrics.mean_squared_error(actual, preds))
+    # rmse = mean_squared_error(actual, preds, squared=False)
+    mape = (abs((actual - preds) / actual).mean()) * 100
+
+    print(f"[Backtest] {product.name}" 
+          f"(id={product.id} → "
+          f"MAE={mae:.2f}, RMSE={rmse:.2f}, MAPE={mape:.2f}%"
+    )
+
+    return {
+        "product_id": product.id,
+        "product_name": product.name,
+        "MAE": mae,
+        "RMSE": rmse,
+        "MAPE": mape,
+    }
+
+def save_backtest_results(results, output=BACKTEST_OUTPUT):
     results_df = pd.DataFrame(results)
-    os.makedirs("../results", exist_ok=True)
-    results_df.to_csv("../results/backtest.csv", index=False)
-    print("Backtest selesai & hasil disimpan ke results/backtest.csv")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    results_df.to_csv(output, index=False)
+    print(f"Backtest selesai & hasil disimpan ke {output}")
 
     if not results_df.empty:
         avg_mae = results_df["MAE"].mean()
@@ -225,17 +598,511 @@ def run_backtest(db: Session, timesteps=30, test_days=30, cutoff_date=None):
     else:
         print("Tidak ada hasil backtest yang valid")
 
+# Walk-forward backtest (--mode walkforward)
+ProductRef = namedtuple("ProductRef", ["id", "name"])
+
+_worker_history = None
+
+def rolling_cutoffs(last_date, folds=4, step_days=7, test_days=30):
+    """Cutoff mundur dari data terakhir: fold terbaru masih punya test_days penuh"""
+    last_cutoff = np.datetime64(last_date, "D") - test_days
+    return [last_cutoff - k * step_days for k in range(folds)][::-1]
+
+def _init_walkforward_worker(tf_threads, history):
+    """Initializer worker walk-forward: histori dikirim sekali per worker, dipakai semua cutoff"""
+    global _worker_history
+    _limit_tf_threads(tf_threads)
+    _worker_history = history
+
+def _walkforward_job(product, cutoff, timesteps=30, test_days=30, history=None):
+    start = time.time()
+    dates, sales = (history or _worker_history).get(product.id)
+    result = backtest_product(product, dates, sales, timesteps, test_days, cutoff)
+
+    row = {
+        "product_id": product.id,
+        "product_name": product.name,
+        "cutoff": str(cutoff),
+        "status": "ok" if result else "skip",
+        "MAE": None, "RMSE": None, "MAPE": None,
+        "seconds": time.time() - start,
+        "worker": os.getpid(),
+    }
+    if result:
+        row.update(MAE=float(result["MAE"]), RMSE=float(result["RMSE"]), MAPE=float(result["MAPE"]))
+    return row
+
+def run_walkforward(db: Session, cutoffs=None, folds=4, step_days=7, timesteps=30, test_days=30,
+                    workers=1, output=WALKFORWARD_OUTPUT, flush_every=50):
+    """
+    Backtest beberapa cutoff sekaligus. Job (produk, cutoff) dibagi ke process
+    pool, metrik tiap job ditulis bertahap ke part Parquet di `output`, jadi
+    kalau crash/interrupt hasil yang sudah selesai tetap ada. Run ulang dengan
+    output yang sama melanjutkan job yang belum selesai.
+    """
+    products = [ProductRef(p.id, p.name) for p in db.query(Product).order_by(Product.id).all()]
+    history = load_history(db)
+
+    if cutoffs:
+        cutoffs = [np.datetime64(c, "D") for c in cutoffs]
+    elif len(history.dates):
+        cutoffs = rolling_cutoffs(history.dates.max(), folds, step_days, test_days)
+    else:
+        cutoffs = []
+    print(f"Total produk: {len(products)}, cutoff: {', '.join(str(c) for c in cutoffs)}")
+
+    done = {(row["product_id"], row["cutoff"]) for row in read_parquet_dir(output)} \
+        if os.path.isdir(output) else set()
+    jobs = [
+        (product, cutoff) for cutoff in cutoffs for product in products
+        if (product.id, str(cutoff)) not in done
+    ]
+    print(f"Job: {len(jobs)} (sudah selesai sebelumnya: {len(done)})")
+
+    buffer = []
+    def collect(row):
+        buffer.append(row)
+        if len(buffer) >= flush_every:
+            write_parquet_part(output, buffer)
+            buffer.clear()
+
+    try:
+        if workers > 1:
+            tf_threads = max(1, (os.cpu_count() or 1) // workers)
+            print(f"Parallel: {workers} worker, {tf_threads} thread TF/worker")
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_walkforward_worker,
+                initargs=(tf_threads, history),
+            )
+            try:
+                futures = [
+                    pool.submit(_walkforward_job, product, cutoff, timesteps, test_days)
+                    for product, cutoff in jobs
+                ]
+                for future in as_completed(futures):
+                    collect(future.result())
+            finally:
+                # interrupt: batalkan job yang belum jalan, jangan tunggu semuanya
+                pool.shutdown(wait=True, cancel_futures=True)
+        else:
+            for product, cutoff in jobs:
+                collect(_walkforward_job(product, cutoff, timesteps, test_days, history=history))
+    finally:
+        write_parquet_part(output, buffer)
+
+    results_df = pd.DataFrame(read_parquet_dir(output))
+    print(f"Walk-forward selesai & hasil disimpan ke {output}/")
+
+    ok = results_df[results_df["status"] == "ok"] if not results_df.empty else results_df
+    if ok.empty:
+        print("Tidak ada hasil backtest yang valid")
+        return
+
+    print("\n===== Summary Walk-forward per Cutoff =====")
+    print(ok.groupby("cutoff")[["MAE", "RMSE", "MAPE"]].mean().to_string(float_format="%.2f"))
+
+# Global pipeline (--model-scope=global)
+def run_forecast_global(db: Session, timesteps=30, forecast_days=30):
+    products = db.query(Product).all()
+    print(f"Total produk: {len(products)}")
+
+    total_start = time.time()
+    history = load_history(db)
+
+    selected, series_list, last_dates = [], [], []
+    for product in products:
+        dates, sales = history.get(product.id)
+
+        if len(sales) <= timesteps:
+            print(f"   ➜ Skip {product.name}, data kurang dari {timesteps + 1}")
+            continue
+
+        selected.append(product)
+        series_list.append(sales)
+        last_dates.append(dates[-1])
+
+    if not selected:
+        print("Tidak ada produk dengan data cukup")
+        return
+
+    preds = fit_global_forecast(
+        selected, series_list,
+        timesteps=timesteps, steps=forecast_days, save=True,
+    )
+
+    rows = []
+    for product, last_date, product_preds in zip(selected, last_dates, preds):
+        rows.extend(forecast_rows(product.id, last_date, product_preds))
+
+    save_forecasts(db, rows)
+    print(f"Forecast {forecast_days} hari disimpan untuk {len(selected)} produk "
+          f"({time.time() - total_start:.2f} detik)")
+
+def run_backtest_global(db: Session, timesteps=30, test_days=30, cutoff_date=None, output=BACKTEST_OUTPUT):
+    products = db.query(Product).all()
+    print(f"Total produk: {len(products)}")
+
+    history = load_history(db)
+
+    selected, train_series, test_series = [], [], []
+    for product in products:
+        dates, sales = history.get(product.id)
+
+        if len(sales) < timesteps + test_days:
+            print(f"   ➜ Skip {product.name}, data kurang dari {timesteps + test_days}")
+            continue
+
+        train, test = split_backtest(dates, sales, test_days, cutoff_date)
+
+        if len(train) <= timesteps or len(test) == 0:
+            print(f"   ➜ Skip {product.name}, train/test data terlalu sedikit")
+            continue
+
+        selected.append(product)
+        train_series.append(train)
+        test_series.append(test)
+
+    if not selected:
+        print("Tidak ada hasil backtest yang valid")
+        return
+
+    preds = fit_global_forecast(selected, train_series, timesteps=timesteps, steps=test_days)
+
+    results = [
+        backtest_result(product, actual, product_preds[:len(actual)])
+        for product, actual, product_preds in zip(selected, test_series, preds)
+    ]
+    save_backtest_results(results, output)
+
+# Hierarchical pipeline (--model-scope=hierarchical)
+def run_forecast_hierarchical(db: Session, timesteps=30, forecast_days=30,
+                              method=hierarchy.MINT, lookback_days=730, share_window=90):
+    """
+    Forecast dua level lalu direkonsiliasi supaya total kategori = jumlah produk:
+    - kategori: satu LSTM per kategori dari total sales harian kategori
+    - produk (histori > timesteps): model global, satu model untuk semua produk
+    - produk histori pendek: porsi historis x forecast kategori (tanpa training)
+    Semua seri memakai kalender bersama, forecast mulai H+1 dari tanggal sales
+    terakhir di database. Hasil ditulis ke forecast dan category_forecast.
+    """
+    products = db.query(Product).order_by(Product.id).all()
+    print(f"Total produk: {len(products)}, rekonsiliasi: {method}")
+
+    total_start = time.time()
+    history = load_history(db)
+    if not len(history.dates):
+        print("Tidak ada data sales")
+        return
+
+    end_date = history.dates.max()
+    matrix, first_idx = hierarchy.daily_matrix(
+        history, [p.id for p in products], end_date, lookback_days=lookback_days,
+    )
+    n_days = matrix.shape[1]
+    category_idx, n_categories = encode_categories(products)
+    categories = sorted({p.category or "" for p in products})
+
+    active = first_idx < n_days
+    long_history = active & (n_days - first_idx > timesteps)
+    short_history = active & ~long_history
+
+    # base forecast kategori, mulai dari sales pertama produk mana pun di kategori itu
+    category_matrix = hierarchy.aggregate(matrix, category_idx, n_categories)
+    category_first = np.full(n_categories, n_days)
+    np.minimum.at(category_first, category_idx, first_idx)
+    category_fc = np.zeros((n_categories, forecast_days))
+    for c, name in enumerate(categories):
+        series = category_matrix[c, category_first[c]:]
+        if len(series) <= timesteps:
+            print(f"   ➜ Skip kategori '{name}', data kurang dari {timesteps + 1} hari")
+            continue
+        print(f"   ➜ Training kategori '{name}' ({len(series)} hari)")
+        X, y, scaler = prepare_sequences(series, timesteps=timesteps)
+        model = train_lstm(X, y, epochs=10, batch_size=16)
+        category_fc[c] = generate_forecast(model, X[-1, :, 0], scaler, steps=forecast_days)
+
+    # base forecast produk
+    product_fc = np.zeros((len(products), forecast_days))
+    long_idx = np.flatnonzero(long_history)
+    if len(long_idx):
+        product_fc[long_idx] = fit_global_forecast(
+            [products[i] for i in long_idx],
+            [matrix[i, first_idx[i]:] for i in long_idx],
+            timesteps=timesteps, steps=forecast_days,
+        )
+    shares = hierarchy.historical_shares(matrix, first_idx, category_idx, n_categories, window=share_window)
+    product_fc[short_history] = shares[short_history, np.newaxis] * category_fc[category_idx[short_history]]
+    print(f"   ✓ Base forecast: {len(long_idx)} produk model global, "
+          f"{int(short_history.sum())} produk histori pendek (share-based)")
+
+    incoherence = np.abs(category_fc - hierarchy.aggregate(product_fc, category_idx, n_categories)).mean()
+    category_fc, product_fc = hierarchy.reconcile(
+        method, category_fc, product_fc, category_idx, n_categories,
+        shares=shares,
+        category_var=hierarchy.residual_variance(category_matrix, category_first),
+        product_var=hierarchy.residual_variance(matrix, first_idx),
+    )
+    print(f"   ✓ Rekonsiliasi {method} (selisih rata-rata kategori vs jumlah produk sebelumnya: {incoherence:.2f})")
+
+    rows = []
+    for i in np.flatnonzero(active):
+        rows.extend(forecast_rows(products[i].id, end_date, product_fc[i]))
+    save_forecasts(db, rows)
+
+    forecast_dates = (end_date + np.arange(1, forecast_days + 1)).tolist()
+    category_rows = [
+        {"category": name, "date": d, "predicted_sales": float(p), "method": method}
+        for name, preds in zip(categories, category_fc)
+        for d, p in zip(forecast_dates, preds)
+    ]
+    upsert_category_forecasts(db, category_rows)
+    print(f"Forecast hierarki {forecast_days} hari disimpan untuk {int(active.sum())} produk "
+          f"dan {n_categories} kategori ({time.time() - total_start:.2f} detik)")
+
+# Baseline / auto pipeline (--model baseline|auto)
+def lstm_holdout_mae(series, timesteps=30, steps=30):
+    """MAE LSTM per produk di `steps` hari terakhir (holdout yang sama dengan baseline)"""
+    train, actual = series[:-steps], series[-steps:]
+    X, y, scaler = prepare_sequences(train, timesteps=timesteps)
+    model = train_lstm(X, y, epochs=10, batch_size=16)
+    preds = generate_forecast(model, X[-1, :, 0], scaler, steps=steps)
+    return float(np.abs(preds - actual).mean())
+
+def run_forecast_baseline(db: Session, timesteps=30, forecast_days=30, model="baseline",
+                          auto_threshold=None, lookback_days=730, report_path=None,
+                          selection_path=MODEL_SELECTION_OUTPUT):
+    """
+    model=baseline: semua produk di-forecast baseline statistik tervektorisasi
+    (seasonal naive / moving average / Holt-Winters, metode terbaik per produk
+    dari holdout `forecast_days` hari terakhir), tanpa training LSTM.
+    model=auto: sama, tapi tiap produk dengan histori cukup dibacktest juga dengan
+    LSTM di holdout yang sama; kalau LSTM lebih baik, produk itu lewat pipeline
+    LSTM biasa (forecast_product: train ulang data penuh, simpan model & watermark).
+    auto_threshold (opsional): hanya produk dengan error relatif baseline
+    (MAE / rata-rata sales holdout) > auto_threshold yang dibacktest LSTM,
+    sisanya langsung baseline.
+    Pilihan per produk ditulis ke selection_path (CSV).
+    """
+    report = RunReport(f"forecast_{model}")
+    products = db.query(Product).order_by(Product.id).all()
+    print(f"Total produk: {len(products)}, model: {model}")
+
+    total_start = time.time()
+    with report.stage("fetch"):
+        history = load_history(db)
+    if not len(history.dates):
+        print("Tidak ada data sales")
+        return report
+
+    end_date = history.dates.max()
+    with report.stage("baseline"):
+        matrix, first_idx = hierarchy.daily_matrix(
+            history, [p.id for p in products], end_date, lookback_days=lookback_days,
+        )
+        method_idx, baseline_fc, baseline_mae = baseline.select_baseline(matrix, first_idx, forecast_days)
+    n_days = matrix.shape[1]
+    active = first_idx < n_days
+    methods = np.array(baseline.METHODS)[method_idx]
+    print(f"   ✓ Baseline {int(active.sum())} produk dalam {report.stages['baseline'][1]:.2f} detik")
+
+    lstm_mae = np.full(len(products), np.nan)
+    lstm_results = {}
+    if model == "auto":
+        eligible = active & (n_days - first_idx > timesteps + forecast_days) & np.isfinite(baseline_mae)
+        if auto_threshold is not None:
+            level = matrix[:, -forecast_days:].mean(axis=1)
+            relative = np.divide(baseline_mae, level, out=np.full(len(products), np.inf), where=level > 0)
+            eligible &= relative > auto_threshold
+        candidates = np.flatnonzero(eligible)
+        if auto_threshold is not None:
+            print(f"   ➜ Kandidat LSTM (error relatif baseline > {auto_threshold:.0%}): {len(candidates)} produk")
+        else:
+            print(f"   ➜ Kandidat LSTM (histori cukup untuk backtest): {len(candidates)} produk")
+
+        for n, i in enumerate(candidates, start=1):
+            product = products[i]
+            print(f"\n[{n}/{len(candidates)}] Backtest LSTM: {product.name} (id={product.id})")
+            with report.stage("lstm_backtest", product.id):
+                lstm_mae[i] = lstm_holdout_mae(matrix[i, first_idx[i]:], timesteps, forecast_days)
+            print(f"   ➜ MAE baseline ({methods[i]}): {baseline_mae[i]:.2f}, LSTM: {lstm_mae[i]:.2f}")
+            if lstm_mae[i] >= baseline_mae[i]:
+                continue
+
+            dates, sales = history.get(product.id)
+            result = forecast_product(product, dates, sales, timesteps=timesteps, forecast_days=forecast_days)
+            if result is not None:
+                lstm_results[i] = result
+                report.add_product(product.id, result["timings"])
+
+    rows, selection = [], []
+    for i in np.flatnonzero(active):
+        product = products[i]
+        if i in lstm_results:
+            chosen = "lstm"
+            rows.extend(lstm_results[i]["rows"])
+        else:
+            chosen = methods[i]
+            rows.extend(forecast_rows(product.id, end_date, baseline_fc[i]))
+        selection.append({
+            "product_id": product.id,
+            "product_name": product.name,
+            "model": chosen,
+            "baseline_method": methods[i],
+            "baseline_MAE": baseline_mae[i],
+            "lstm_MAE": lstm_mae[i],
+        })
+        report.count("products", help="Produk yang diproses per model", model=chosen)
+
+    with report.stage("write"):
+        written = save_forecasts(db, rows)
+        upsert_watermarks(db, [result["watermark"] for result in lstm_results.values()])
+    report.count("rows_written", written, help="Baris forecast yang ditulis")
+    report.finish()
+
+    if selection_path:
+        os.makedirs(os.path.dirname(selection_path) or ".", exist_ok=True)
+        pd.DataFrame(selection).to_csv(selection_path, index=False)
+        print(f"✓ Pilihan model per produk disimpan ke {selection_path}")
+
+    chosen = Counter(row["model"] for row in selection)
+    print(f"Forecast {forecast_days} hari selesai ("
+          + ", ".join(f"{name}: {count}" for name, count in sorted(chosen.items()))
+          + f") dalam {time.time() - total_start:.2f} detik")
+    print(report.summary())
+
+    if report_path:
+        report.write(report_path)
+        print(f"✓ Run report disimpan ke {report_path}")
+
+    return report
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["forecast", "backtest"], required=True)
+    parser.add_argument(
+        "--mode", choices=["forecast", "predict", "backtest", "walkforward"], required=True,
+        help="predict: forecast dari model tersimpan tanpa training"
+    )
     parser.add_argument("--cutoff", type=str, default=None, help="Cutoff date (YYYY-MM-DD untuk backtest")
+    parser.add_argument(
+        "--cutoffs", type=str, default=None,
+        help="Walk-forward: daftar cutoff dipisah koma (YYYY-MM-DD,YYYY-MM-DD)"
+    )
+    parser.add_argument("--folds", type=int, default=4, help="Walk-forward: jumlah cutoff rolling")
+    parser.add_argument("--fold-step", type=int, default=7, help="Walk-forward: jarak antar cutoff (hari)")
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help=f"Backtest: file CSV hasil (default {BACKTEST_OUTPUT}), "
+             f"walk-forward: direktori hasil part Parquet (default {WALKFORWARD_OUTPUT}), "
+             f"forecast --model baseline/auto: CSV pilihan model per produk (default {MODEL_SELECTION_OUTPUT})"
+    )
+    parser.add_argument(
+        "--model-scope", choices=["product", "global", "hierarchical"], default="product",
+        help="product: satu model per produk, global: satu model untuk semua produk, "
+             "hierarchical: forecast kategori + produk yang direkonsiliasi"
+    )
+    parser.add_argument(
+        "--model", choices=["lstm", "baseline", "auto"], default="lstm",
+        help="Forecast per produk: lstm (default), baseline statistik tervektorisasi, "
+             "atau auto (baseline, LSTM hanya untuk produk yang backtest-nya lebih baik)"
+    )
+    parser.add_argument(
+        "--auto-threshold", type=float, default=None,
+        help="Auto: hanya coba LSTM kalau error relatif baseline (MAE / rata-rata sales) "
+             "di atas nilai ini (default: semua produk dibacktest LSTM)"
+    )
+    parser.add_argument(
+        "--reconcile", choices=hierarchy.METHODS, default=hierarchy.MINT,
+        help="Hierarchical: metode rekonsiliasi kategori-produk"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Jumlah process paralel untuk mode per produk (default: 1, serial)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Skip produk tanpa sales baru, fine-tune model tersimpan kalau data baru sedikit"
+    )
+    parser.add_argument(
+        "--drift-threshold", type=float, default=0.1,
+        help="Rasio data baru sejak full retrain terakhir sebelum model dilatih ulang penuh"
+    )
+    parser.add_argument(
+        "--profile", choices=["cprofile", "pyinstrument"], default=None,
+        help="Forecast per produk: simpan profile per produk ke --profile-dir"
+    )
+    parser.add_argument(
+        "--profile-products", type=str, default=None,
+        help="Hanya profile produk ini (id dipisah koma), default semua produk"
+    )
+    parser.add_argument("--profile-dir", type=str, default="results/profiles")
+    parser.add_argument(
+        "--history-cache", type=str, default=None,
+        help="Forecast/backtest per produk: baca histori dari history cache lokal "
+             "(direktori, di-sync incremental dulu) bukan dari database"
+    )
+    parser.add_argument(
+        "--report", type=str, default=None,
+        help="Forecast per produk: tulis run report JSON (durasi per tahap & produk terlambat)"
+    )
     args = parser.parse_args()
+    if args.model_scope == "hierarchical" and args.mode == "backtest":
+        parser.error("--model-scope=hierarchical belum mendukung --mode backtest")
+
+    if args.model_scope != "product" and args.workers > 1:
+        print(f"--workers diabaikan untuk --model-scope={args.model_scope}")
+    if args.model_scope != "product" and args.incremental:
+        print(f"--incremental diabaikan untuk --model-scope={args.model_scope}")
+    if args.model_scope != "product" and args.mode == "walkforward":
+        print(f"--model-scope={args.model_scope} diabaikan untuk walk-forward (per produk)")
+    if args.model != "lstm" and (args.model_scope != "product" or args.mode != "forecast"):
+        print(f"--model={args.model} hanya untuk --mode forecast --model-scope product, dipakai LSTM")
+    if args.model != "lstm" and args.workers > 1:
+        print(f"--workers diabaikan untuk --model={args.model}")
+    if args.history_cache and args.mode != "predict" and (
+        args.model_scope != "product" or args.model != "lstm" or args.mode == "walkforward"
+    ):
+        print("--history-cache hanya untuk forecast/backtest LSTM per produk, histori dibaca dari database")
 
     db = SessionLocal()
     if args.mode == "forecast":
-        run_forecast(db, timesteps=30, forecast_days=30)
+        if args.model_scope == "global":
+            run_forecast_global(db, timesteps=30, forecast_days=30)
+        elif args.model_scope == "hierarchical":
+            run_forecast_hierarchical(db, timesteps=30, forecast_days=30, method=args.reconcile)
+        elif args.model != "lstm":
+            run_forecast_baseline(
+                db, timesteps=30, forecast_days=30, model=args.model,
+                auto_threshold=args.auto_threshold, report_path=args.report,
+                selection_path=args.output or MODEL_SELECTION_OUTPUT,
+            )
+        else:
+            run_forecast(
+                db, timesteps=30, forecast_days=30, workers=args.workers,
+                incremental=args.incremental, drift_threshold=args.drift_threshold,
+                profile=args.profile,
+                profile_ids={int(i) for i in args.profile_products.split(",")} if args.profile_products else None,
+                profile_dir=args.profile_dir, report_path=args.report,
+                history_cache=args.history_cache,
+            )
+    elif args.mode == "predict":
+        run_predict(db, forecast_days=30, history_cache=args.history_cache)
     elif args.mode == "backtest":
         cutoff = pd.to_datetime(args.cutoff) if args.cutoff else None
-        run_backtest(db, cutoff_date=cutoff)
+        if args.model_scope == "global":
+            run_backtest_global(db, cutoff_date=cutoff, output=args.output or BACKTEST_OUTPUT)
+        else:
+            run_backtest(
+                db, cutoff_date=cutoff, workers=args.workers,
+                history_cache=args.history_cache, output=args.output or BACKTEST_OUTPUT,
+            )
+    elif args.mode == "walkforward":
+        run_walkforward(
+            db,
+            cutoffs=args.cutoffs.split(",") if args.cutoffs else None,
+            folds=args.folds, step_days=args.fold_step,
+            workers=args.workers, output=args.output or WALKFORWARD_OUTPUT,
+        )
     db.close()
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+Refresh rollup sales (sales_product_week, sales_category_day, sales_category_week)
+dari high-water mark sales.created_at. Jalankan berkala (cron) kalau consumer
+event tidak jalan; --full membangun ulang semua rollup (setelah produk pindah
+kategori atau sales dihapus).
+
+Contoh:
+	python scripts/refresh_rollups.py
+	python scripts/refresh_rollups.py --full
+"""
+import argparse
+
+from domains.sales.services import refresh_rollups
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--full", action="store_true", help="Bangun ulang semua rollup")
+	args = parser.parse_args()
+
+	report = refresh_rollups(full=args.full)
+	summary = report.as_dict()
+	print(f"✓ Rollup {summary['mode']} ({summary['touched']} produk-hari berubah) dalam {summary['seconds']} detik")
+	print(f"  product-week: {report.product_weeks}, category-day: {report.category_days}, "
+		  f"category-week: {report.category_weeks}, high-water: {summary['high_water']}")
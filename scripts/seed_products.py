@@ -1,28 +1,37 @@
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
-from tqdm import tqdm
 from faker import Faker
 from db.models.products import Product
-import random
-
-fake = Faker()
+import numpy as np
 
 CATEGORIES = ["Laptop", "Smartphone", "Furniture", "Accessory", "Tablet"]
 
-def seed_products(db: Session, num_products: int = 100):
-	products = []
-	for _ in tqdm(range(num_products), desc="Seeding products"):
-		product = Product(
-			name = fake.word().capitalize() + " " + fake.word().capitalize(),
-			category = random.choice(CATEGORIES),
-			price = round(random.uniform(100, 2000), 2),
-			stock = random.randint(0, 100),
-		)
-		db.add(product)
-		products.append(product)
+def seed_products(db: Session, num_products: int = 100, seed: int = 42):
+	"""Insert semua produk dalam satu statement (RETURNING id), tanpa refresh per baris"""
+	fake = Faker()
+	Faker.seed(seed)
+	rng = np.random.default_rng(seed)
+
+	# nama wajib unik: suffix nomor urut lanjut dari id terakhir
+	offset = db.query(func.coalesce(func.max(Product.id), 0)).scalar()
+	words = [fake.word().capitalize() for _ in range(min(num_products, 500) * 2)]
+	first = rng.choice(words, num_products)
+	second = rng.choice(words, num_products)
+	categories = rng.choice(CATEGORIES, num_products)
+	prices = np.round(rng.uniform(100, 2000, num_products), 2)
+	stocks = rng.integers(0, 101, num_products)
 
+	rows = [
+		{
+			"name": f"{first[i]} {second[i]} {offset + i + 1}",
+			"category": str(categories[i]),
+			"price": float(prices[i]),
+			"stock": int(stocks[i]),
+		}
+		for i in range(num_products)
+	]
+	product_ids = list(db.execute(insert(Product).returning(Product.id), rows).scalars())
 	db.commit()
-	for data in products:
-		db.refresh(data)
 
-	print(f"Seeded {len(products)} products")
-	return products
\ No newline at end of file
+	print(f"Seeded {len(product_ids)} products")
+	return product_ids
@@ -1,28 +1,60 @@
+import datetime
+
 import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 from tqdm import tqdm
 from db.models.products import Product
-from db.models.sales import Sale
+from domains.sales.repository import copy_sales
+
+def generate_sales_matrix(rng: np.random.Generator, num_products: int, days: int,
+						  start_date: datetime.date, promo_rate: float = 0.02, promo_days: int = 3) -> np.ndarray:
+	"""
+	Sales sintetis (num_products, days) sekaligus: level dasar x trend x
+	musiman mingguan & tahunan x promo, lalu noise Poisson (integer >= 0).
+	"""
+	t = np.arange(days)
+	day_of_year = (np.datetime64(start_date, "D") + t - np.datetime64(f"{start_date.year}-01-01")).astype(int)
+
+	base = rng.uniform(5, 50, (num_products, 1))
+	# pertumbuhan linear relatif per hari, bisa naik atau turun
+	trend = 1 + rng.normal(0, 0.0005, (num_products, 1)) * t
+	weekly = 1 + rng.uniform(0, 0.3, (num_products, 1)) * np.sin(
+		2 * np.pi * (t + rng.integers(0, 7, (num_products, 1))) / 7
+	)
+	yearly = 1 + rng.uniform(0, 0.4, (num_products, 1)) * np.sin(
+		2 * np.pi * (day_of_year + rng.integers(0, 365, (num_products, 1))) / 365.25
+	)
 
-np.random.seed(42)
+	# promo: mulai acak, berlangsung promo_days hari, lift per produk
+	promo_start = rng.random((num_products, days)) < promo_rate
+	promo = promo_start.copy()
+	for lag in range(1, promo_days):
+		promo[:, lag:] |= promo_start[:, :-lag]
+	lift = np.where(promo, rng.uniform(1.5, 3.0, (num_products, 1)), 1.0)
 
-def seed_sales(db: Session, num_products: int = 300, days: int = 300):
-	products = db.query(Product).limit(num_products).all()
-	dates = pd.date_range(start="2025-01-01", periods=days)
-	#dates = pd.date_range(start="2025-01-01", end="2025-12-15")
+	level = np.clip(base * trend * weekly * yearly * lift, 0, None)
+	return rng.poisson(level).astype(np.int32)
 
-	sales_entries = []
-	for product in tqdm(products, desc="Seeding sales"):
-		base_demand = np.random.randint(5, 20)
-		for date in dates:
-			season = 2 * np.sin(2 * np.pi * date.dayofyear / 30)
-			noise = np.random.randn()
-			sales_value = max(0, base_demand + season + noise)
-			sales_entries.append(
-				Sale(product_id=product.id, date=date.date(), sales=float(sales_value))
-			)
+def sales_frames(product_ids, days, start_date, seed=42, chunk_products=500):
+	"""Yield DataFrame (product_id, date, sales) per chunk produk, memori sebesar satu chunk"""
+	rng = np.random.default_rng(seed)
+	dates = np.datetime64(start_date, "D") + np.arange(days)
+	for start in tqdm(range(0, len(product_ids), chunk_products), desc="Seeding sales", unit="chunk"):
+		chunk = np.asarray(product_ids[start:start + chunk_products], dtype=np.int64)
+		matrix = generate_sales_matrix(rng, len(chunk), days, start_date)
+		yield pd.DataFrame({
+			"product_id": np.repeat(chunk, days),
+			"date": np.tile(dates, len(chunk)),
+			"sales": matrix.ravel(),
+		})
 
-	db.bulk_save_objects(sales_entries)
-	db.commit()
-	print(f"Seeded sales for {len(products)} products ({len(sales_entries)} rows)")
\ No newline at end of file
+def seed_sales(db: Session, num_products: int = 300, days: int = 300, seed: int = 42,
+			   start_date: datetime.date = datetime.date(2025, 1, 1), chunk_products: int = 500,
+			   on_conflict: str = "error", product_ids=None):
+	if product_ids is None:
+		product_ids = [pid for (pid,) in db.query(Product.id).order_by(Product.id).limit(num_products)]
+	report = copy_sales(db, sales_frames(product_ids, days, start_date, seed, chunk_products), on_conflict)
+	print(f"Seeded sales for {len(product_ids)} products ({report.inserted} rows, "
+		  f"{report.seconds:.1f}s, {report.rows_per_second:,.0f} rows/s)")
+	return report
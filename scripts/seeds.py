@@ -1,17 +1,19 @@
-from sqlalchemy.orm import Session
+import argparse
+import datetime
 from db.session import SessionLocal
 from scripts.seed_products import seed_products
 from scripts.seed_sales import seed_sales
 from scripts.seed_forecast import seed_forecast
 
-def main(num_products: int = 100, days: int = 300):
-	#db: Session = SessionLocal()
+def main(num_products: int = 100, days: int = 300, seed: int = 42,
+		 start_date: datetime.date = datetime.date(2025, 1, 1), on_conflict: str = "error"):
 	db = SessionLocal()
 	try:
 		print("Mulai seeding...")
 
-		seed_products(db, num_products=num_products)
-		seed_sales(db, num_products=num_products, days=days)
+		product_ids = seed_products(db, num_products=num_products, seed=seed)
+		seed_sales(db, days=days, seed=seed, start_date=start_date,
+				   on_conflict=on_conflict, product_ids=product_ids)
 		# seed_forecast(db)
 
 		print("Semua seeding selesai")
@@ -19,4 +21,13 @@ def main(num_products: int = 100, days: int = 300):
 		db.close()
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--products", type=int, default=100)
+	parser.add_argument("--days", type=int, default=300)
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--start-date", type=datetime.date.fromisoformat, default=datetime.date(2025, 1, 1))
+	parser.add_argument("--on-conflict", choices=["error", "skip", "update"], default="error",
+						help="error = COPY langsung (paling cepat, DB harus kosong)")
+	args = parser.parse_args()
+
+	main(args.products, args.days, args.seed, args.start_date, args.on_conflict)
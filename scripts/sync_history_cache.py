@@ -0,0 +1,34 @@
+"""
+Sync history cache lokal (domains/sales/history_cache.py) dari tabel sales:
+hanya baris dengan created_at setelah high-water mark yang ditarik dan
+ditambahkan sebagai segment baru. Jalankan berkala (cron) sebelum forecast /
+backtest / evaluasi dengan --history-cache. --full membangun ulang dari semua
+sales (setelah sales dihapus), --compact menggabung semua segment jadi satu.
+
+Contoh:
+	python scripts/sync_history_cache.py
+	python scripts/sync_history_cache.py --full
+	python scripts/sync_history_cache.py --compact --path cache/history
+"""
+import argparse
+
+from core.config import settings
+from db.session import SessionLocal
+from domains.sales.history_cache import sync_history_cache
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--path", default=settings.HISTORY_CACHE_DIR, help="Direktori history cache")
+	parser.add_argument("--full", action="store_true", help="Bangun ulang cache dari semua sales")
+	parser.add_argument("--compact", action="store_true", help="Gabung semua segment jadi satu setelah sync")
+	args = parser.parse_args()
+
+	db = SessionLocal()
+	try:
+		cache = sync_history_cache(db, args.path, full=args.full)
+	finally:
+		db.close()
+
+	if args.compact:
+		rows = cache.compact()
+		print(f"✓ History cache di-compact: {rows} baris dalam 1 segment")
@@ -0,0 +1,5 @@
+"""Unit test tanpa database: core.config butuh setting Postgres, isi dummy kalau belum ada"""
+import os
+
+for name in ("POSTGRES_HOST", "POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"):
+	os.environ.setdefault(name, "test")
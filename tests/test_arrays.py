@@ -0,0 +1,196 @@
+"""Bagian NumPy murni: SalesHistory, history cache merge, sliding window, baseline, rekonsiliasi"""
+import numpy as np
+import pytest
+
+from domains.sales.history_cache import _changed_rows, merge_histories
+from domains.sales.repository import SalesHistory
+from ml.common.preprocessing import sliding_windows
+from ml.forecasting import baseline, hierarchy
+
+def history(rows):
+	"""rows: list (product_id, "YYYY-MM-DD", sales)"""
+	product_ids, dates, sales = zip(*rows) if rows else ((), (), ())
+	return SalesHistory.from_arrays(product_ids, np.array(dates, dtype="datetime64[D]"), sales)
+
+def rows_of(h: SalesHistory):
+	return [
+		(product_id, str(date), float(value))
+		for product_id, dates, sales in h.items()
+		for date, value in zip(dates, sales)
+	]
+
+# SalesHistory
+def test_from_arrays_groups_and_sorts():
+	h = history([(3, "2025-01-02", 5), (1, "2025-01-03", 2), (3, "2025-01-01", 4), (1, "2025-01-01", 1)])
+	assert h.product_ids.tolist() == [1, 3]
+	assert h.offsets.tolist() == [0, 2, 4]
+	assert rows_of(h) == [
+		(1, "2025-01-01", 1.0), (1, "2025-01-03", 2.0),
+		(3, "2025-01-01", 4.0), (3, "2025-01-02", 5.0),
+	]
+
+def test_lookup():
+	h = history([(1, "2025-01-01", 1), (1, "2025-01-03", 3), (2, "2025-01-02", 7), (5, "2025-01-01", 9)])
+	found, sales = h.lookup(
+		[1, 1, 1, 2, 2, 3, 5, 6, 0],
+		np.array(["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-02", "2025-01-03",
+				  "2025-01-01", "2025-01-01", "2025-01-01", "2025-01-01"], dtype="datetime64[D]"),
+	)
+	assert found.tolist() == [True, False, True, True, False, False, True, False, False]
+	assert sales.tolist() == [1, 0, 3, 7, 0, 0, 9, 0, 0]
+
+def test_lookup_empty_history():
+	found, sales = history([]).lookup([1], np.array(["2025-01-01"], dtype="datetime64[D]"))
+	assert found.tolist() == [False]
+	assert sales.tolist() == [0]
+
+def test_lookup_matches_dict():
+	rng = np.random.default_rng(0)
+	rows = {
+		(int(p), str(np.datetime64("2025-01-01") + int(d))): float(rng.integers(0, 50))
+		for p, d in zip(rng.integers(1, 20, 500), rng.integers(0, 60, 500))
+	}
+	h = history([(p, d, s) for (p, d), s in rows.items()])
+	queries = [(int(p), str(np.datetime64("2025-01-01") + int(d)))
+			   for p, d in zip(rng.integers(0, 22, 300), rng.integers(-2, 62, 300))]
+	found, sales = h.lookup([p for p, _ in queries], np.array([d for _, d in queries], dtype="datetime64[D]"))
+	assert found.tolist() == [q in rows for q in queries]
+	assert sales.tolist() == [rows.get(q, 0.0) for q in queries]
+
+# history cache
+def test_merge_histories_newest_wins():
+	old = history([(1, "2025-01-01", 1), (1, "2025-01-02", 2), (2, "2025-01-01", 3)])
+	mid = history([(1, "2025-01-02", 20), (3, "2025-01-01", 5)])
+	new = history([(1, "2025-01-02", 200), (2, "2025-01-02", 4)])
+	assert rows_of(merge_histories([old, mid, new])) == [
+		(1, "2025-01-01", 1.0), (1, "2025-01-02", 200.0),
+		(2, "2025-01-01", 3.0), (2, "2025-01-02", 4.0),
+		(3, "2025-01-01", 5.0),
+	]
+
+def test_merge_histories_with_empty_segment():
+	h = history([(1, "2025-01-01", 1)])
+	assert rows_of(merge_histories([history([]), h, history([])])) == rows_of(h)
+
+def test_changed_rows_drops_unchanged_overlap():
+	cached = history([(1, "2025-01-01", 1), (1, "2025-01-02", 2), (2, "2025-01-01", 3)])
+	fetched = history([(1, "2025-01-02", 2), (2, "2025-01-01", 30), (2, "2025-01-02", 4)])
+	assert rows_of(_changed_rows(cached, fetched)) == [(2, "2025-01-01", 30.0), (2, "2025-01-02", 4.0)]
+
+def test_changed_rows_all_unchanged_or_all_new():
+	cached = history([(1, "2025-01-01", 1)])
+	assert rows_of(_changed_rows(cached, cached)) == []
+	fetched = history([(2, "2025-01-01", 1)])
+	assert _changed_rows(cached, fetched) is fetched
+
+# sliding window
+def test_sliding_windows():
+	X, y = sliding_windows(np.arange(6), timesteps=3)
+	assert X.tolist() == [[0, 1, 2], [1, 2, 3], [2, 3, 4]]
+	assert y.tolist() == [3, 4, 5]
+
+	X, y = sliding_windows(np.arange(8), timesteps=3, stride=2)
+	assert X.tolist() == [[0, 1, 2], [2, 3, 4], [4, 5, 6]]
+	assert y.tolist() == [3, 5, 7]
+
+def test_sliding_windows_is_view_and_short_series():
+	series = np.arange(10, dtype=np.float32)
+	X, y = sliding_windows(series, timesteps=4)
+	assert np.shares_memory(X, series) and np.shares_memory(y, series)
+
+	X, y = sliding_windows(np.arange(3), timesteps=3)
+	assert X.shape == (0, 3) and y.shape == (0,)
+
+# baseline
+def test_moving_average_and_seasonal_naive():
+	matrix = np.array([
+		[0, 0, 0, 0, 0, 4, 8],
+		[1, 2, 3, 4, 5, 6, 7],
+	], dtype=np.float64)
+	first_idx = np.array([5, 0])
+
+	ma = baseline.moving_average(matrix, first_idx, steps=2, window=4)
+	# produk 0: baru punya 2 hari histori dalam window
+	assert ma.tolist() == [[6, 6], [5.5, 5.5]]
+
+	sn = baseline.seasonal_naive(matrix, first_idx, steps=4, season=3)
+	assert sn[1].tolist() == [5, 6, 7, 5]
+	# histori < season: moving average
+	assert sn[0].tolist() == [6, 6, 6, 6]
+
+def test_holt_winters_recovers_seasonal_pattern():
+	pattern = np.array([10, 12, 14, 9, 8, 20, 25], dtype=np.float64)
+	matrix = np.tile(pattern, 12)[np.newaxis, :]
+	forecast = baseline.holt_winters(matrix, np.array([0]), steps=14)
+	np.testing.assert_allclose(forecast[0], np.tile(pattern, 2), atol=0.5)
+
+def test_select_baseline_picks_lowest_holdout_error():
+	rng = np.random.default_rng(1)
+	days = 120
+	seasonal = np.tile([5, 5, 5, 5, 5, 30, 30], days // 7 + 1)[:days].astype(np.float64)
+	flat = np.full(days, 10.0) + rng.normal(0, 0.01, days)
+	matrix = np.stack([seasonal, flat])
+	method_idx, forecast, mae = baseline.select_baseline(matrix, np.array([0, 0]), steps=14)
+
+	errors = baseline.holdout_errors(matrix, np.array([0, 0]), 14)
+	for i in range(2):
+		assert mae[i] == pytest.approx(min(errors[m][i] for m in baseline.METHODS))
+	assert baseline.METHODS[method_idx[0]] != baseline.MOVING_AVERAGE
+	assert forecast.shape == (2, 14)
+
+def test_select_baseline_short_history():
+	matrix = np.ones((2, 5))
+	method_idx, forecast, mae = baseline.select_baseline(matrix, np.array([0, 5]), steps=7)
+	assert [baseline.METHODS[i] for i in method_idx] == [baseline.MOVING_AVERAGE] * 2
+	assert np.isnan(mae).all()
+	assert forecast.tolist() == [[1.0] * 7, [0.0] * 7]
+
+# rekonsiliasi
+CATEGORY_IDX = np.array([0, 0, 1, 1, 1])
+N_CATEGORIES = 2
+
+def test_aggregate():
+	values = np.arange(10, dtype=np.float64).reshape(5, 2)
+	assert hierarchy.aggregate(values, CATEGORY_IDX, N_CATEGORIES).tolist() == [[2, 4], [18, 21]]
+	# kategori tanpa produk: nol
+	assert hierarchy.aggregate(values, CATEGORY_IDX, 3)[2].tolist() == [0, 0]
+
+def test_mint_matches_matrix_formula():
+	rng = np.random.default_rng(2)
+	steps = 3
+	product_fc = rng.uniform(5, 20, (5, steps))
+	category_fc = rng.uniform(20, 60, (N_CATEGORIES, steps))
+	product_var = rng.uniform(0.5, 3, 5)
+	category_var = rng.uniform(0.5, 3, N_CATEGORIES)
+
+	_, reconciled = hierarchy.mint(category_fc, product_fc, CATEGORY_IDX, N_CATEGORIES, category_var, product_var)
+
+	# b~ = (S' W^-1 S)^-1 S' W^-1 y^, y^ = [kategori; produk], W = diag(varians)
+	S = np.vstack([np.eye(N_CATEGORIES)[CATEGORY_IDX].T, np.eye(5)])
+	W_inv = np.diag(1 / np.concatenate([category_var, product_var]))
+	y = np.vstack([category_fc, product_fc])
+	expected = np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv @ y)
+	np.testing.assert_allclose(reconciled, expected)
+
+@pytest.mark.parametrize("method", hierarchy.METHODS)
+def test_reconcile_is_coherent_and_non_negative(method):
+	rng = np.random.default_rng(3)
+	product_fc = rng.uniform(-1, 10, (5, 4))
+	category_fc = rng.uniform(0, 40, (N_CATEGORIES, 4))
+	category_out, product_out = hierarchy.reconcile(
+		method, category_fc, product_fc, CATEGORY_IDX, N_CATEGORIES,
+		shares=rng.uniform(0, 1, 5), category_var=np.ones(N_CATEGORIES), product_var=np.ones(5),
+	)
+	assert (product_out >= 0).all()
+	np.testing.assert_allclose(category_out, hierarchy.aggregate(product_out, CATEGORY_IDX, N_CATEGORIES))
+
+def test_top_down_uses_normalized_shares():
+	category_fc = np.array([[10.0], [30.0]])
+	shares = np.array([1.0, 3.0, 0.0, 0.0, 0.0])
+	_, product_fc = hierarchy.top_down(category_fc, shares, CATEGORY_IDX, N_CATEGORIES)
+	# kategori 1 tanpa porsi: dibagi rata
+	assert product_fc[:, 0].tolist() == [2.5, 7.5, 10.0, 10.0, 10.0]
+
+def test_reconcile_unknown_method():
+	with pytest.raises(ValueError):
+		hierarchy.reconcile("median", np.zeros((1, 1)), np.zeros((1, 1)), np.array([0]), 1)
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+class TTLCache:
+    """
+    Cache in-process LRU + TTL, thread-safe.
+    max_entries: jumlah entry maksimum, yang paling lama tidak dipakai dibuang duluan
+    ttl: umur entry (detik), entry kadaluarsa dianggap miss
+    generation naik tiap invalidate/clear: set() dengan generation lama
+    ditolak, supaya hasil query yang selesai setelah invalidasi tidak masuk cache
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> int:
+        """Buang semua entry yang key-nya cocok, return jumlah yang dibuang"""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._entries if match(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+def parse_etags(header: Optional[str]) -> Iterable[str]:
+    """Pecah header If-None-Match jadi daftar ETag (prefix weak W/ diabaikan)"""
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
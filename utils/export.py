@@ -0,0 +1,45 @@
+from typing import AsyncIterator, Callable, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from utils.file import ArrowStreamWriter, to_ndjson
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ExportFormat = Literal["ndjson", "arrow"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+async def stream_export(
+    session_factory: Callable[[], AsyncSession],
+    stmt: Select,
+    fmt: ExportFormat,
+    arrow_schema=None,
+    chunk_size: int = 10_000,
+) -> AsyncIterator[bytes]:
+    """
+    Baca hasil stmt lewat server-side cursor per chunk_size baris dan
+    yield bytes NDJSON / Arrow IPC per chunk. Session dibuat sendiri di
+    dalam generator karena body StreamingResponse jalan setelah handler selesai.
+    """
+    columns = [column.key for column in stmt.selected_columns]
+    writer = ArrowStreamWriter(arrow_schema) if fmt == "arrow" else None
+    if writer:
+        # header schema langsung dikirim supaya client dapat byte pertama cepat
+        yield writer.header()
+
+    rows_sent = 0
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            rows_sent += len(rows)
+            yield writer.write(rows) if writer else to_ndjson(columns, rows)
+
+    if writer:
+        yield writer.close()
+    logger.info(f"Export {fmt} selesai: {rows_sent} rows")
@@ -1,8 +1,12 @@
 import os
+import io
 import json
 import csv
+import datetime
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 
 def ensure_dir(path: Union[str, Path]) -> None:
     """
@@ -53,4 +57,82 @@ def get_file_size(path: Union[str, Path]) -> int:
     """
     Ambil ukuran file dalam byte.
     """
-    return os.path.getsize(path)
\ No newline at end of file
+    return os.path.getsize(path)
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} tidak bisa di-serialize ke JSON")
+
+def to_ndjson(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Rows (tuple) jadi NDJSON, satu object per baris, tanggal jadi string ISO.
+    """
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+    ).encode()
+
+class ArrowStreamWriter:
+    """
+    Encoder Arrow IPC stream bertahap: header schema dulu, lalu satu record
+    batch per write(), dan end-of-stream saat close(). Tiap method return
+    bytes yang siap dikirim, jadi memori hanya sebesar satu batch.
+    """
+
+    def __init__(self, schema):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.schema = schema
+        self._sink = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._sink, schema)
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def header(self) -> bytes:
+        return self._drain()
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in self.schema]
+        arrays = [self._pa.array(col, type=field.type) for col, field in zip(columns, self.schema)]
+        self._writer.write_batch(self._pa.record_batch(arrays, schema=self.schema))
+        return self._drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+def write_parquet_part(directory: Union[str, Path], rows: List[Dict[str, Any]]) -> Optional[Path]:
+    """
+    Tulis rows sebagai satu file part Parquet baru di direktori.
+    File ditulis ke nama sementara lalu di-rename, jadi part yang sudah ada
+    selalu utuh walaupun proses mati di tengah jalan.
+    """
+    if not rows:
+        return None
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    ensure_dir(directory)
+    name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+    path = Path(directory) / name
+    tmp_path = Path(directory) / f".{name}.tmp"
+    pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+def read_parquet_dir(directory: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Baca semua file part Parquet di direktori, return list of dict.
+    """
+    import pyarrow.parquet as pq
+
+    rows: List[Dict[str, Any]] = []
+    for path in sorted(Path(directory).glob("part-*.parquet")):
+        rows.extend(pq.read_table(path).to_pylist())
+    return rows
@@ -0,0 +1,36 @@
+import importlib
+import sys
+import types
+
+class LazyModule(types.ModuleType):
+    """
+    Proxy modul yang baru benar-benar di-import saat atributnya pertama kali
+    diakses. Dipakai untuk dependency berat (TensorFlow, Keras, sklearn)
+    supaya `--help`, eval, dan worker API tidak ikut menanggung biaya import-nya.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    def _load(self) -> types.ModuleType:
+        module = importlib.import_module(self.__name__)
+        # salin atribut supaya akses berikutnya tidak lewat __getattr__
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if is_loaded(self.__name__) else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Modul asli kalau sudah pernah di-import, selain itu LazyModule"""
+    return sys.modules.get(name) or LazyModule(name)
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
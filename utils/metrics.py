@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+class Metrics:
+    """
+    Registry metrik in-process, thread-safe, tanpa dependency prometheus_client.
+    counter : nilai naik terus (inc)
+    gauge   : nilai terakhir (set)
+    timer   : durasi detik, disimpan sebagai summary count/sum + max
+    Export ke Prometheus text format (render_prometheus) atau dict (snapshot).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, str] = {}
+        self._types: Dict[str, str] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        # timer: name -> label -> [count, sum, max]
+        self._timers: Dict[str, Dict[LabelKey, List[float]]] = defaultdict(dict)
+
+    def _register(self, name: str, kind: str, help: Optional[str]) -> str:
+        registered = self._types.setdefault(name, kind)
+        if registered != kind:
+            raise ValueError(f"metrik {name} sudah terdaftar sebagai {registered}")
+        if help:
+            self._help[name] = help
+        return name
+
+    def inc(self, name: str, value: float = 1, help: Optional[str] = None, **labels) -> None:
+        with self._lock:
+            name = self._register(name, "counter", help)
+            key = _label_key(labels)
+            self._values[name][key] = self._values[name].get(key, 0.0) + value
+
+    def set(self, name: str, value: float, help: Optional[str] = None, **labels) -> None:
+        with self._lock:
+            name = self._register(name, "gauge", help)
+            self._values[name][_label_key(labels)] = float(value)
+
+    def observe(self, name: str, seconds: float, help: Optional[str] = None, **labels) -> None:
+        with self._lock:
+            name = self._register(name, "summary", help)
+            stats = self._timers[name].setdefault(_label_key(labels), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, help: Optional[str] = None, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, help, **labels)
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        with self._lock:
+            metrics = []
+            for name, kind in sorted(self._types.items()):
+                if kind == "summary":
+                    for key, (count, total, peak) in self._timers[name].items():
+                        metrics.append({
+                            "name": name, "type": kind, "labels": dict(key),
+                            "count": int(count), "sum": round(total, 6), "max": round(peak, 6),
+                        })
+                else:
+                    for key, value in self._values[name].items():
+                        metrics.append({"name": name, "type": kind, "labels": dict(key), "value": value})
+            return {"metrics": metrics}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, kind in sorted(self._types.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "summary":
+                    for key, (count, total, peak) in self._timers[name].items():
+                        labels = _format_labels(key)
+                        lines.append(f"{name}_count{labels} {int(count)}")
+                        lines.append(f"{name}_sum{labels} {total!r}")
+                    # max bukan bagian summary Prometheus, diekspor sebagai gauge terpisah
+                    lines.append(f"# TYPE {name}_max gauge")
+                    for key, (_, _, peak) in self._timers[name].items():
+                        lines.append(f"{name}_max{_format_labels(key)} {peak!r}")
+                else:
+                    for key, value in self._values[name].items():
+                        lines.append(f"{name}{_format_labels(key)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Tambahkan durasi blok ke timings[stage] (dict biasa, aman dikirim dari worker process)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+# registry default proses ini (pipeline forecast & API)
+metrics = Metrics()
+
+class RunReport:
+    """
+    Laporan satu run pipeline: durasi per tahap (total & per produk) dan
+    counter. Tiap durasi juga dicatat ke registry metrik sebagai
+    `<prefix>_stage_seconds{stage=...}`, jadi /metrics dan report JSON konsisten.
+    Timing per produk dikirim sebagai dict (add_product), supaya hasil dari
+    worker process bisa digabung di parent.
+    """
+
+    def __init__(self, name: str, registry: Metrics = metrics, prefix: str = "forecast"):
+        self.name = name
+        self.registry = registry
+        self.prefix = prefix
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, List[float]] = {}  # stage -> [count, sum, max]
+        self.products: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self.counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, stage: str, seconds: float, product_id: Optional[int] = None) -> None:
+        stats = self.stages.setdefault(stage, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        if product_id is not None:
+            self.products[product_id][stage] = self.products[product_id].get(stage, 0.0) + seconds
+        self.registry.observe(
+            f"{self.prefix}_stage_seconds", seconds,
+            help="Durasi tahap pipeline forecast (detik)", stage=stage,
+        )
+
+    @contextmanager
+    def stage(self, stage: str, product_id: Optional[int] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, product_id)
+
+    def add_product(self, product_id: int, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds, product_id)
+
+    def count(self, name: str, value: float = 1, help: Optional[str] = None, **labels) -> None:
+        key = ",".join(f"{k}={v}" for k, v in sorted(labels.items())) or "all"
+        self.counters[name][key] += value
+        self.registry.inc(f"{self.prefix}_{name}_total", value, help=help, **labels)
+
+    def finish(self) -> "RunReport":
+        self.finished_at = time.time()
+        seconds = self.finished_at - self.started_at
+        self.registry.set(
+            f"{self.prefix}_last_run_seconds", seconds,
+            help="Durasi run pipeline terakhir (detik)", run=self.name,
+        )
+        self.registry.set(
+            f"{self.prefix}_last_run_timestamp_seconds", self.finished_at,
+            help="Waktu selesai run pipeline terakhir (unix)", run=self.name,
+        )
+        return self
+
+    def as_dict(self, top: int = 20) -> dict:
+        finished_at = self.finished_at or time.time()
+        slowest = sorted(self.products.items(), key=lambda kv: sum(kv[1].values()), reverse=True)[:top]
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "seconds": round(finished_at - self.started_at, 3),
+            "stages": {
+                stage: {"count": int(count), "sum": round(total, 4), "max": round(peak, 4)}
+                for stage, (count, total, peak) in self.stages.items()
+            },
+            "counters": {name: dict(values) for name, values in self.counters.items()},
+            "slowest_products": [
+                {"product_id": pid, "seconds": round(sum(t.values()), 4),
+                 "stages": {k: round(v, 4) for k, v in t.items()}}
+                for pid, t in slowest
+            ],
+        }
+
+    def summary(self) -> str:
+        total = sum(stats[1] for stats in self.stages.values()) or 1.0
+        lines = [f"{'tahap':<12} {'jumlah':>7} {'total (s)':>10} {'max (s)':>9} {'porsi':>6}"]
+        for stage, (count, seconds, peak) in sorted(self.stages.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{stage:<12} {int(count):>7} {seconds:>10.2f} {peak:>9.2f} {seconds / total:>6.1%}")
+        return "\n".join(lines)
+
+    def write(self, path: str, top: int = 20) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.as_dict(top), f, indent=2)
@@ -1,43 +1,113 @@
-from typing import List, Any, Generic, TypeVar
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Generic, List, Literal, Optional, Sequence, TypeVar
+
 from pydantic import BaseModel
-from tortoise.queryset import QuerySet
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from utils.exceptions import BadRequestException
 
 T = TypeVar("T")
 
-class PageMeta(BaseModel):
-    page: int
-    per_page: int
-    total: int
-    total_pages: int
+CountMode = Literal["none", "exact", "estimate"]
+
+ESTIMATE_SQL = text("""
+SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint
+FROM pg_class c
+WHERE c.oid = to_regclass(:table)
+   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))
+""")
+
+class CursorMeta(BaseModel):
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+class CursorPage(BaseModel, Generic[T]):
+    meta: CursorMeta
+    items: List[T]
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Nilai key baris terakhir -> string opaque (base64url JSON)"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime.date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence) -> tuple:
+    """Kebalikan encode_cursor, nilai dikonversi sesuai tipe kolom key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("jumlah key tidak cocok")
+        return tuple(
+            datetime.date.fromisoformat(v) if key.type.python_type is datetime.date else key.type.python_type(v)
+            for key, v in zip(keys, values)
+        )
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise BadRequestException(f"Cursor tidak valid: {e}")
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> int:
+    """
+    Perkiraan jumlah baris dari statistik planner, tanpa scan tabel.
+    Tanpa filter: reltuples pg_class (dijumlah per partisi kalau partitioned),
+    dengan filter: estimasi baris dari EXPLAIN.
+    """
+    if stmt.whereclause is None:
+        table = stmt.get_final_froms()[0].name
+        return int((await db.execute(ESTIMATE_SQL, {"table": table})).scalar())
 
-class PaginatedResponse(BaseModel, Generic[T]):
-    meta: PageMeta
-    items: List[Any]
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
 
-async def paginate(queryset: QuerySet, page: int = 1, per_page: int = 10) -> PaginatedResponse:
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    count: CountMode = "none",
+) -> CursorPage:
     """
-    Async helper untuk pagination dengan Tortoise ORM.
-    queryset: Tortoise QuerySet
-    page: halaman ke berapa
-    per_page: jumlah item per halaman
+    Keyset pagination: WHERE (k1, k2, ...) > cursor ORDER BY k1, k2, ... LIMIT n.
+    Biaya per halaman konstan (tidak ada OFFSET), selama ada index yang cocok dengan keys.
+    stmt: select tanpa ORDER BY/LIMIT, kolom keys harus ikut di-select
+    keys: kolom unik berurutan, mis. (Sale.product_id, Sale.date, Sale.id)
+    count: none (default), exact (COUNT(*)), estimate (statistik planner)
     """
-    if page < 1:
-        page = 1
-    if per_page < 1:
-        per_page = 10
+    total = None
+    if count == "exact":
+        total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+    elif count == "estimate":
+        total = await estimate_count(db, stmt)
 
-    total = await queryset.count()
-    total_pages = (total + per_page - 1) // per_page  # pembulatan ke atas
+    page_stmt = stmt
+    if cursor:
+        page_stmt = page_stmt.where(tuple_(*keys) > tuple_(*decode_cursor(cursor, keys)))
+    # ambil satu baris lebih untuk tahu masih ada halaman berikutnya
+    rows = (await db.execute(page_stmt.order_by(*keys).limit(limit + 1))).all()
 
-    offset = (page - 1) * per_page
-    items = await queryset.offset(offset).limit(per_page)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[key.key] for key in keys])
 
-    return PaginatedResponse(
-        meta=PageMeta(
-            page=page,
-            per_page=per_page,
+    return CursorPage(
+        meta=CursorMeta(
+            limit=limit,
+            has_more=has_more,
+            next_cursor=next_cursor,
             total=total,
-            total_pages=total_pages
+            total_estimated=count == "estimate",
         ),
-        items=items
-    )
\ No newline at end of file
+        items=[dict(row._mapping) for row in rows],
+    )
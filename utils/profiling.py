@@ -0,0 +1,52 @@
+import cProfile
+import os
+from contextlib import contextmanager, nullcontext
+from typing import Container, Iterator, Literal, Optional
+
+ProfileMode = Literal["cprofile", "pyinstrument"]
+
+@contextmanager
+def _cprofile(path: str) -> Iterator[None]:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+@contextmanager
+def _pyinstrument(path: str) -> Iterator[None]:
+    try:
+        from pyinstrument import Profiler
+    except ImportError as e:
+        raise RuntimeError("profiling pyinstrument butuh paket pyinstrument (pip install pyinstrument)") from e
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+
+def profiled(name: str, mode: Optional[ProfileMode], output_dir: str = "results/profiles"):
+    """
+    Context manager profiling satu unit kerja (mis. satu produk).
+    cprofile     : <output_dir>/<name>.prof (buka dengan snakeviz / pstats)
+    pyinstrument : <output_dir>/<name>.html (dependency opsional)
+    mode None = tanpa profiling (nullcontext)
+    """
+    if mode is None:
+        return nullcontext()
+    os.makedirs(output_dir, exist_ok=True)
+    if mode == "cprofile":
+        return _cprofile(os.path.join(output_dir, f"{name}.prof"))
+    if mode == "pyinstrument":
+        return _pyinstrument(os.path.join(output_dir, f"{name}.html"))
+    raise ValueError(f"mode profiling tidak dikenal: {mode}")
+
+def should_profile(product_id: int, mode: Optional[ProfileMode], product_ids: Optional[Container[int]]) -> bool:
+    """product_ids None = profil semua produk"""
+    return mode is not None and (product_ids is None or product_id in product_ids)
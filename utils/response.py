@@ -1,5 +1,7 @@
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+from fastapi import Request, Response, status
 from pydantic import BaseModel
+from utils.cache import parse_etags
 
 class ResponseModel(BaseModel):
     status: str  # "success" / "error"
@@ -10,4 +12,15 @@ def success_response(data: Any = None, message: str = "Success") -> dict:
     return ResponseModel(status="success", message=message, data=data).model_dump()
 
 def error_response(message: str = "Error", data: Any = None) -> dict:
-    return ResponseModel(status="error", message=message, data=data).model_dump()
\ No newline at end of file
+    return ResponseModel(status="error", message=message, data=data).model_dump()
+
+def etag_response(request: Request, etag: str, render: Callable[[], bytes]) -> Response:
+    """
+    304 kalau If-None-Match cocok, body JSON baru dirakit kalau memang dikirim.
+    Cache-Control no-cache: client boleh simpan tapi wajib revalidasi dengan ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    tags = parse_etags(request.headers.get("if-none-match"))
+    if etag in tags or "*" in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=render(), media_type="application/json", headers=headers)
\ No newline at end of file